@@ -0,0 +1,36 @@
+"""Add composite index for ranked matches per job
+
+Revision ID: 3c9e41a7b2d5
+Revises: f8d2b66e0ae7
+Create Date: 2026-10-18 11:02:17.553180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e41a7b2d5'
+down_revision: Union[str, Sequence[str], None] = 'f8d2b66e0ae7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves WHERE job_id = ? ORDER BY final_match_percentage DESC, id DESC LIMIT n
+    # and the (final_match_percentage, id) < (?, ?) keyset predicate
+    op.create_index(
+        'ix_matches_job_score',
+        'matches',
+        ['job_id', sa.text('final_match_percentage DESC'), sa.text('id DESC')],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_matches_job_score', table_name='matches', if_exists=True)
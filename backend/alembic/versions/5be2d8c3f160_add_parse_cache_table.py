@@ -0,0 +1,41 @@
+"""Add parse_cache table for LLM parse results
+
+Revision ID: 5be2d8c3f160
+Revises: a71f0c5e94d3
+Create Date: 2026-10-18 12:21:05.364771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5be2d8c3f160'
+down_revision: Union[str, Sequence[str], None] = 'a71f0c5e94d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'parse_cache',
+        sa.Column('text_hash', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('text_hash', 'kind', 'prompt_version'),
+    )
+    op.create_index('ix_parse_cache_last_used_at', 'parse_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parse_cache_last_used_at', table_name='parse_cache')
+    op.drop_table('parse_cache')
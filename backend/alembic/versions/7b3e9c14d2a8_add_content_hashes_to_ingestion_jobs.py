@@ -0,0 +1,34 @@
+"""Add content_hash and text_hash to ingestion_jobs for upload dedupe
+
+Revision ID: 7b3e9c14d2a8
+Revises: e2c7b5f39a61
+Create Date: 2026-10-18 18:12:07.381542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9c14d2a8'
+down_revision: Union[str, Sequence[str], None] = 'e2c7b5f39a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingestion_jobs', sa.Column('content_hash', sa.String(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('text_hash', sa.String(), nullable=True))
+    op.create_index('ix_ingestion_jobs_content_hash', 'ingestion_jobs', ['content_hash'], unique=False)
+    op.create_index('ix_ingestion_jobs_text_hash', 'ingestion_jobs', ['text_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingestion_jobs_text_hash', table_name='ingestion_jobs')
+    op.drop_index('ix_ingestion_jobs_content_hash', table_name='ingestion_jobs')
+    op.drop_column('ingestion_jobs', 'text_hash')
+    op.drop_column('ingestion_jobs', 'content_hash')
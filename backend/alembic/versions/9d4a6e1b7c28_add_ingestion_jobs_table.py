@@ -0,0 +1,58 @@
+"""Add ingestion_jobs table for the resume ingestion queue
+
+Revision ID: 9d4a6e1b7c28
+Revises: 5be2d8c3f160
+Create Date: 2026-10-18 13:05:48.117290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6e1b7c28'
+down_revision: Union[str, Sequence[str], None] = '5be2d8c3f160'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.String(), nullable=False),
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('raw_text', sa.String(), nullable=True),
+        sa.Column('parsed_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('stored_candidate_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='extracted'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('locked_by', sa.String(), nullable=True),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('candidate_id'),
+    )
+    op.create_index('ix_ingestion_jobs_job_id', 'ingestion_jobs', ['job_id'], unique=False)
+    op.create_index(
+        'ix_ingestion_jobs_claimable',
+        'ingestion_jobs',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text("status NOT IN ('matched', 'failed')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingestion_jobs_claimable', table_name='ingestion_jobs')
+    op.drop_index('ix_ingestion_jobs_job_id', table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
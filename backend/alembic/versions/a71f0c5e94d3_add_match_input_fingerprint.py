@@ -0,0 +1,31 @@
+"""Add embedding similarity and input fingerprint to matches
+
+Revision ID: a71f0c5e94d3
+Revises: 3c9e41a7b2d5
+Create Date: 2026-10-18 11:40:52.918406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71f0c5e94d3'
+down_revision: Union[str, Sequence[str], None] = '3c9e41a7b2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('matches', sa.Column('embedding_similarity', sa.Float(), nullable=True))
+    # NULL for existing rows, so every pair is rescored once on the next run
+    op.add_column('matches', sa.Column('input_fingerprint', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matches', 'input_fingerprint')
+    op.drop_column('matches', 'embedding_similarity')
@@ -0,0 +1,33 @@
+"""Add batch_id and stage_timings to ingestion_jobs
+
+Revision ID: e2c7b5f39a61
+Revises: 9d4a6e1b7c28
+Create Date: 2026-10-18 13:48:30.642915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7b5f39a61'
+down_revision: Union[str, Sequence[str], None] = '9d4a6e1b7c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingestion_jobs', sa.Column('batch_id', sa.String(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('stage_timings', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index('ix_ingestion_jobs_batch_id', 'ingestion_jobs', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingestion_jobs_batch_id', table_name='ingestion_jobs')
+    op.drop_column('ingestion_jobs', 'stage_timings')
+    op.drop_column('ingestion_jobs', 'batch_id')
@@ -0,0 +1,35 @@
+"""Add composite index for latest interview call lookup
+
+Revision ID: f8d2b66e0ae7
+Revises: d83db1bd7f83
+Create Date: 2026-10-18 10:12:41.208913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d2b66e0ae7'
+down_revision: Union[str, Sequence[str], None] = 'd83db1bd7f83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves DISTINCT ON (candidate_id) ... ORDER BY created_at DESC, id DESC per job
+    op.create_index(
+        'ix_interview_calls_job_candidate_latest',
+        'interview_calls',
+        ['job_id', 'candidate_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interview_calls_job_candidate_latest', table_name='interview_calls', if_exists=True)
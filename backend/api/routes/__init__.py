@@ -8,6 +8,8 @@ from api.routes.users import router as users_router
 from api.routes.jd_upload import router as jd_upload_router
 from api.routes.resume_upload import router as resume_upload_router
 from api.routes.candidates import router as candidates_router
+from api.routes.batches import router as batches_router
+from api.routes.storage_events import router as storage_events_router
 
 __all__ = [
     "health_router",
@@ -20,4 +22,6 @@ __all__ = [
     "jd_upload_router",
     "resume_upload_router",
     "candidates_router",
+    "batches_router",
+    "storage_events_router",
 ]
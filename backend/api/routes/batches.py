@@ -0,0 +1,43 @@
+"""Ingestion batches — progress of resume uploads through the background pipeline."""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from log import log_tool
+from schemas import BatchStatusResponse
+from services.batch_progress_service import get_batch_status, stream_batch_events
+
+router = APIRouter(prefix="/batches", tags=["Ingestion Batches"])
+
+
+@router.get("/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch(batch_id: str):
+    """
+    Current stage of every resume in an upload batch, with per-stage timings.
+    """
+    try:
+        status = await asyncio.to_thread(get_batch_status, batch_id)
+    except Exception as e:
+        log_tool.log_exception("Error in get_batch", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch with id=%s not found." % batch_id)
+    return status
+
+
+@router.get("/{batch_id}/events")
+async def stream_batch(batch_id: str):
+    """
+    Server-Sent Events stream of stage transitions for an upload batch
+    (events: stage, progress, complete). Closes once every resume is matched or failed.
+    """
+    status = await asyncio.to_thread(get_batch_status, batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch with id=%s not found." % batch_id)
+    return StreamingResponse(
+        stream_batch_events(batch_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
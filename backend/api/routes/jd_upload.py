@@ -1,15 +1,28 @@
 """JD upload — on upload, create JD workspace (jd_id + folders), store the file, and ingest JD to DB."""
 
+import asyncio
+
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
 from log import log_tool
-from s3_utils.tenant_onboarder import TenantStorageService
-from services.jd_ingest_service import JDIngestService
+from s3_utils.tenant_onboarder import S3_PRESIGNED_URL_TTL
+from services.registry import lazy_service
+from schemas import JDUploadCompleteRequest, JDUploadSessionRequest, JDUploadSessionResponse, UploadSession
 
 router = APIRouter(prefix="/companies", tags=["JD Upload"])
 
-_storage = TenantStorageService()
-_jd_ingest_service = JDIngestService()
+_storage = lazy_service("storage")
+_jd_ingest_service = lazy_service("jd_ingest")
+
+ALLOWED_EXTENSIONS = (".pdf", ".txt")
+
+
+def _validate_filename(filename) -> None:
+    if not filename or not filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Upload .pdf or .txt",
+        )
 
 
 @router.post("/{company_id}/users/{user_id}/jds/upload")
@@ -27,14 +40,11 @@ async def upload_jd(
     - Stores the JD file in the company's S3 workspace
     - Parses the JD and saves a Job row in PostgreSQL (no matching is triggered)
     """
-    if not file.filename or not file.filename.lower().endswith((".pdf", ".txt")):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Upload .pdf or .txt",
-        )
+    _validate_filename(file.filename)
     try:
         # Create JD workspace (jd_id + folder structure)
-        jd_id = _storage.create_jd_workspace(
+        jd_id = await asyncio.to_thread(
+            _storage.create_jd_workspace,
             company_id=company_id,
             user_id=user_id,
             role=role,
@@ -43,24 +53,17 @@ async def upload_jd(
         # Upload the JD file into that workspace
         content = await file.read()
         content_type = file.content_type or "application/octet-stream"
-        s3_key = (
-            f"companies/{company_id}/users/{user_id}/jds/{jd_id}/"
-            f"jd_{file.filename.replace(' ', '_')}"
-        )
-        _storage.upload_file(content, s3_key, content_type)
-
-        # Build a public-ish S3 link (if using standard AWS URL pattern)
-        s3_link = (
-            f"https://{_storage.bucket_name}.s3.{_storage.region_name}.amazonaws.com/{s3_key}"
-        )
+        s3_key = _storage.generate_jd_upload_path(company_id, user_id, jd_id, file.filename)
+        await asyncio.to_thread(_storage.upload_file, content, s3_key, content_type)
 
         # Ingest JD into the DB (parse + save Job, but DO NOT run matching)
-        _jd_ingest_service.run(
+        await asyncio.to_thread(
+            _jd_ingest_service.run,
             content,
             file.filename,
             company_name=company_id,
             client_company=client_company,
-            s3_link=s3_link,
+            s3_link=_storage.object_url(s3_key),
             s3_job_id=jd_id,
         )
 
@@ -74,3 +77,88 @@ async def upload_jd(
     except Exception as e:
         log_tool.log_exception("JD upload failed", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{company_id}/users/{user_id}/jds/upload-sessions", response_model=JDUploadSessionResponse)
+async def create_jd_upload_session(
+    company_id: str,
+    user_id: str,
+    req: JDUploadSessionRequest,
+) -> JDUploadSessionResponse:
+    """
+    Create the JD workspace and a presigned upload (multipart for large files) so
+    the client sends the JD file straight to S3, then call
+    .../jds/{jd_id}/upload-sessions/complete to parse and save it.
+    """
+    _validate_filename(req.filename)
+    if not _storage.supports_presigned_uploads:
+        raise HTTPException(status_code=501, detail="Upload sessions need the S3 storage backend; use /jds/upload")
+    try:
+        jd_id = await asyncio.to_thread(
+            _storage.create_jd_workspace,
+            company_id=company_id,
+            user_id=user_id,
+            role=req.role,
+        )
+        s3_key = _storage.generate_jd_upload_path(company_id, user_id, jd_id, req.filename)
+        session = await asyncio.to_thread(
+            _storage.create_upload_session,
+            s3_key,
+            req.content_type or "application/octet-stream",
+            size=req.size,
+        )
+    except Exception as e:
+        log_tool.log_exception("Creating JD upload session failed", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return JDUploadSessionResponse(
+        jd_id=jd_id,
+        expires_in=S3_PRESIGNED_URL_TTL,
+        session=UploadSession(filename=req.filename, **session),
+    )
+
+
+@router.post("/{company_id}/users/{user_id}/jds/{jd_id}/upload-sessions/complete")
+async def complete_jd_upload_session(
+    company_id: str,
+    user_id: str,
+    jd_id: str,
+    req: JDUploadCompleteRequest,
+):
+    """
+    Finish a JD upload session: complete the multipart upload if any, then parse
+    the JD from S3 and save the Job row (no matching is triggered).
+    """
+    upload = req.upload
+    prefix = f"companies/{company_id}/users/{user_id}/jds/{jd_id}/jd_"
+    if not upload.s3_key.startswith(prefix):
+        raise HTTPException(status_code=400, detail=f"'{upload.s3_key}' is not a JD upload key for this JD")
+    filename = upload.s3_key[len(prefix):]
+    _validate_filename(filename)
+
+    try:
+        if upload.upload_id:
+            await asyncio.to_thread(
+                _storage.complete_upload_session,
+                upload.s3_key, upload.upload_id, [part.model_dump() for part in upload.parts],
+            )
+        content, _ = await asyncio.to_thread(_storage.read_file, upload.s3_key)
+        await asyncio.to_thread(
+            _jd_ingest_service.run,
+            content,
+            filename,
+            company_name=company_id,
+            client_company=req.client_company,
+            s3_link=_storage.object_url(upload.s3_key),
+            s3_job_id=jd_id,
+        )
+        return {
+            "jd_id": jd_id,
+            "s3_key": upload.s3_key,
+            "filename": filename,
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log_tool.log_exception("JD upload completion failed", e)
+        raise HTTPException(status_code=500, detail=str(e))
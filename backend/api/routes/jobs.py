@@ -3,11 +3,11 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
 from log import log_tool
-from services.parse_jd_service import ParseJDService
+from services.registry import lazy_service
 
 router = APIRouter(prefix="/parse-jd", tags=["Jobs"])
 
-_parse_jd_service = ParseJDService()
+_parse_jd_service = lazy_service("parse_jd")
 
 
 @router.post("", response_model=None)
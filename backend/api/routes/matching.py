@@ -5,11 +5,11 @@ from typing import Optional
 
 from log import log_tool
 from schemas import MatchCandidatesToJobRequest, BatchMatchResponse, RankedMatchesResponse
-from services.matching_service import MatchingService
+from services.registry import lazy_service
 
 router = APIRouter(tags=["Matching"])
 
-_matching_service = MatchingService()
+_matching_service = lazy_service("matching")
 
 
 # @router.post("/match/candidates-to-job", response_model=BatchMatchResponse)
@@ -37,17 +37,21 @@ _matching_service = MatchingService()
 def get_matches_for_job(
     job_id: str,
     min_score: Optional[float] = Query(None, description="Minimum final match percentage (e.g., 80.0)"),
-    top_n: Optional[int] = Query(None, description="Return exactly the top N candidates by score"),
+    top_n: Optional[int] = Query(None, description="Return exactly the top N candidates by score (page size when paginating)"),
     status: Optional[str] = Query(None, description="Filter by qualification (e.g., 'Qualified', 'Disqualified')"),
-    refresh: bool = Query(False, description="Set to true to force re-calculation of matching scores")
+    refresh: bool = Query(False, description="Set to true to force re-calculation of every candidate's matching score"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor, to fetch the following page")
 ):
     """
     For the given job_id: runs matching for all candidates against that job (or fetches from cache),
     saves/updates results in the matches table, and returns candidates ranked
     by final_match_percentage (highest first).
+
+    When top_n is set and more candidates remain, the response carries a
+    next_cursor; pass it back as `cursor` to fetch the next page.
     """
     try:
-        return _matching_service.get_ranked_matches_for_job(job_id, min_score, top_n, status, refresh)
+        return _matching_service.get_ranked_matches_for_job(job_id, min_score, top_n, status, refresh, cursor)
     except HTTPException:
         raise
     except Exception as e:
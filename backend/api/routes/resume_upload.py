@@ -45,44 +45,71 @@
 #     except Exception as e:
 #         log_tool.log_exception("Resume upload failed", e)
 #         raise HTTPException(status_code=500, detail=str(e))
+import asyncio
 import os
 import json
 import time
+import uuid
 from typing import List, Optional
 
 from fastapi import APIRouter, File, HTTPException, UploadFile, BackgroundTasks
 from pydantic import BaseModel
 
 from log import log_tool
-from s3_utils.tenant_onboarder import TenantStorageService
-from utils.text_extractor import TextExtractor
-from parsers.resume_parser import ResumeParser
-from db.candidate_job_repository import save_candidate_from_resume
-from services.matching_service import MatchingService
+from s3_utils.tenant_onboarder import S3_PRESIGNED_URL_TTL
+from db.ingestion_repository import get_jobs_by_candidate, requeue_candidates
+from db.models import IngestionStatus
+from services.ingestion_worker import notify_ingestion_workers
+from services.registry import lazy_service
+from services.resume_intake_service import RESUME_UPLOAD_DEDUPE, content_hash
 
 router = APIRouter(prefix="/companies", tags=["Resume Upload"])
 
-_storage = TenantStorageService()
-_matching_service = MatchingService()
+_storage = lazy_service("storage")
+_intake = lazy_service("resume_intake")
+_matching_service = lazy_service("matching")
 
 ALLOWED_EXTENSIONS = (".pdf", ".txt", ".doc", ".docx")
 
 
-from schemas import ResumeUploadResult, ResumeUploadResponse
+from schemas import (
+    ResumeUploadResult, ResumeUploadResponse,
+    ResumeUploadSessionRequest, ResumeUploadSessionResponse, ResumeUploadCompleteRequest, UploadSession,
+)
 
-def _validate_file(file: UploadFile) -> None:
+def _validate_filename(filename: Optional[str]) -> None:
     """Validate a single file's name and extension."""
-    if not file.filename:
+    if not filename:
         raise HTTPException(
             status_code=400, detail="One or more files are missing a filename"
         )
-    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+    if not filename.lower().endswith(ALLOWED_EXTENSIONS):
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type for '{file.filename}'. Upload .pdf, .txt, .doc, or .docx only",
+            detail=f"Invalid file type for '{filename}'. Upload .pdf, .txt, .doc, or .docx only",
         )
 
 
+def _upload_response(batch_id: str, results: list[ResumeUploadResult]) -> ResumeUploadResponse:
+    failed = [r for r in results if r.status == "failed"]
+    if len(failed) == len(results):
+        # All failed – include detailed per-file errors in the response body
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "All uploads failed",
+                "results": [r.model_dump() for r in results],
+            },
+        )
+
+    return ResumeUploadResponse(
+        batch_id=batch_id,
+        uploaded=len(results) - len(failed),
+        failed=len(failed),
+        results=results,
+    )
+
+
 @router.post(
     "/{company_id}/users/{user_id}/jds/{jd_id}/resumes",
     response_model=ResumeUploadResponse,
@@ -95,82 +122,156 @@ async def upload_resumes(
 ) -> ResumeUploadResponse:
     """
     Upload one or more resumes for candidates under a specific JD.
-    Each file gets a unique path and is uploaded to S3.
-    Returns a list of results, including any per-file errors.
+    Each file gets a unique path and is uploaded to S3, and its extracted text is
+    queued for background ingestion (parse → save → embed → match).
+    A resume the company already uploaded (same bytes or same extracted text) is
+    not stored or parsed again: it is reported as "duplicate" and, for a new JD,
+    linked to it so only matching runs.
+    Returns immediately with a list of results, including any per-file errors.
+
+    For large batches prefer the upload-session endpoints below, which send the
+    files straight to S3 instead of through this API.
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
 
     # Validate all files up front before uploading anything
     for file in files:
-        _validate_file(file)
+        _validate_filename(file.filename)
+
+    # Groups this upload's resumes for the /batches progress API
+    batch_id = uuid.uuid4().hex
+
+    contents = await asyncio.gather(*(file.read() for file in files))
+    content_hashes = [content_hash(content) for content in contents]
+    dedupe_keys = content_hashes if RESUME_UPLOAD_DEDUPE else list(range(len(files)))
+
+    # Identical files within this request are processed once; the distinct ones run concurrently
+    first_index: dict = {}
+    for i, key in enumerate(dedupe_keys):
+        first_index.setdefault(key, i)
+    firsts = sorted(first_index.values())
+    outcomes = await asyncio.gather(*(
+        _intake.ingest_upload(
+            company_id, user_id, jd_id, files[i].filename, contents[i],
+            content_type=files[i].content_type, batch_id=batch_id, file_hash=content_hashes[i],
+        )
+        for i in firsts
+    ))
+    first_results = {i: ResumeUploadResult(**outcome) for i, outcome in zip(firsts, outcomes)}
 
     results: list[ResumeUploadResult] = []
-    for file in files:
-        try:
-            content = await file.read()
-            candidate_id, s3_key = _storage.generate_resume_upload_path(
-                company_id=company_id,
-                user_id=user_id,
-                jd_id=jd_id,
-                original_filename=file.filename,
-            )
-            content_type = file.content_type or "application/octet-stream"
-            _storage.upload_file(content, s3_key, content_type)
-            
-            # Extract Text and Store Locally Temporarily
-            raw_text = TextExtractor.extract_text(content, file.filename)
-            
-            if not raw_text.strip():
-                raise ValueError(f"Could not extract any readable text from '{file.filename}'. It may be an unsupported image/scan or corrupted file.")
-                
-            temp_dir = os.path.join(os.getcwd(), "temp_extracted_resumes")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            local_raw_path = os.path.join(temp_dir, f"{candidate_id}_raw.txt")
-            with open(local_raw_path, "w", encoding="utf-8") as f:
-                f.write(raw_text)
-                
-            log_tool.log_info(f"Temporarily saved raw text for '{file.filename}' to {local_raw_path}")
-
-            results.append(
-                ResumeUploadResult(
-                    candidate_id=candidate_id,
-                    s3_key=s3_key,
-                    filename=file.filename,
-                    status="success",
-                )
-            )
-        except Exception as e:
-            log_tool.log_exception(f"Resume upload failed for '{file.filename}'", e)
-            results.append(
-                ResumeUploadResult(
-                    filename=file.filename,
-                    status="failed",
-                    error=str(e),
-                )
-            )
+    for i, file in enumerate(files):
+        first = first_results[first_index[dedupe_keys[i]]]
+        if first_index[dedupe_keys[i]] == i:
+            results.append(first)
+        elif first.status == "failed":
+            results.append(first.model_copy(update={"filename": file.filename}))
+        else:
+            results.append(first.model_copy(update={
+                "filename": file.filename,
+                "status": "duplicate",
+                "duplicate_of": first.duplicate_of or first.candidate_id,
+            }))
 
-    failed = [r for r in results if r.status == "failed"]
-    if len(failed) == len(files):
-        # All failed – include detailed per-file errors in the response body
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "message": "All uploads failed",
-                "results": [r.model_dump() for r in results],
-            },
+    notify_ingestion_workers()
+    return _upload_response(batch_id, results)
+
+
+@router.post(
+    "/{company_id}/users/{user_id}/jds/{jd_id}/resumes/upload-sessions",
+    response_model=ResumeUploadSessionResponse,
+)
+async def create_resume_upload_sessions(
+    company_id: str,
+    user_id: str,
+    jd_id: str,
+    req: ResumeUploadSessionRequest,
+) -> ResumeUploadSessionResponse:
+    """
+    Start a direct-to-S3 upload batch: one presigned PUT URL per file, or
+    presigned part URLs (multipart) for files larger than S3_MULTIPART_PART_SIZE.
+    After uploading, call .../upload-sessions/{batch_id}/complete (or let the S3
+    ObjectCreated event reach /storage/events) to queue the resumes for ingestion.
+    """
+    if not req.files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    for file in req.files:
+        _validate_filename(file.filename)
+    if not _storage.supports_presigned_uploads:
+        raise HTTPException(status_code=501, detail="Upload sessions need the S3 storage backend; upload through /resumes")
+
+    batch_id = uuid.uuid4().hex
+
+    def _create(file) -> UploadSession:
+        candidate_id, s3_key = _storage.generate_resume_upload_path(
+            company_id=company_id,
+            user_id=user_id,
+            jd_id=jd_id,
+            original_filename=file.filename,
         )
+        session = _storage.create_upload_session(
+            s3_key,
+            file.content_type or "application/octet-stream",
+            size=file.size,
+            # Lets the S3 event path attribute the object to this batch
+            metadata={"batch-id": batch_id},
+        )
+        return UploadSession(filename=file.filename, candidate_id=candidate_id, **session)
 
-    return ResumeUploadResponse(
-        uploaded=len(files) - len(failed),
-        failed=len(failed),
-        results=results,
-    )
+    try:
+        sessions = await asyncio.gather(*(asyncio.to_thread(_create, file) for file in req.files))
+    except Exception as e:
+        log_tool.log_exception("Creating resume upload sessions failed", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return ResumeUploadSessionResponse(batch_id=batch_id, expires_in=S3_PRESIGNED_URL_TTL, sessions=list(sessions))
+
+
+@router.post(
+    "/{company_id}/users/{user_id}/jds/{jd_id}/resumes/upload-sessions/{batch_id}/complete",
+    response_model=ResumeUploadResponse,
+)
+async def complete_resume_upload_sessions(
+    company_id: str,
+    user_id: str,
+    jd_id: str,
+    batch_id: str,
+    req: ResumeUploadCompleteRequest,
+) -> ResumeUploadResponse:
+    """
+    Finish the multipart uploads of a batch and queue every uploaded resume for
+    ingestion. Text is extracted from the S3 objects server-side; calling this
+    after the S3 event already queued a file is harmless.
+    """
+    if not req.uploads:
+        raise HTTPException(status_code=400, detail="No uploads provided")
+
+    prefix = f"companies/{company_id}/users/{user_id}/jds/{jd_id}/resumes/"
+    for upload in req.uploads:
+        if not upload.s3_key.startswith(prefix) or _storage.parse_resume_key(upload.s3_key) is None:
+            raise HTTPException(status_code=400, detail=f"'{upload.s3_key}' is not a resume upload key for this JD")
+
+    async def _complete_one(upload) -> ResumeUploadResult:
+        if upload.upload_id:
+            try:
+                await asyncio.to_thread(
+                    _storage.complete_upload_session,
+                    upload.s3_key, upload.upload_id, [part.model_dump() for part in upload.parts],
+                )
+            except Exception as e:
+                log_tool.log_exception(f"Completing upload '{upload.s3_key}' failed", e)
+                return ResumeUploadResult(filename=upload.s3_key.rsplit("/", 1)[-1], status="failed", error=str(e))
+        return ResumeUploadResult(**await _intake.ingest_object(upload.s3_key, batch_id=batch_id))
+
+    results = list(await asyncio.gather(*(_complete_one(upload) for upload in req.uploads)))
+    notify_ingestion_workers()
+    return _upload_response(batch_id, results)
 
 
 from schemas import ProcessResumeRequest, BulkProcessResumeRequest
 
+
 @router.post(
     "/jds/{jd_id}/resumes/process",
 )
@@ -179,75 +280,50 @@ async def process_resume_from_temp(
     req: BulkProcessResumeRequest,
 ):
     """
-    Processes the temporarily stored raw text resumes in bulk.
-    - Parses JSON via LLM for each.
-    - Uploads JSON to S3 for each.
-    - Stores structured candidate in DB linked to jd_id.
-    - Matches all candidates globally after the loop completes.
+    Reports ingestion progress for the given uploaded resumes and re-queues any
+    that failed. Parsing, saving, embedding and matching run in the background
+    ingestion workers as soon as a resume is uploaded; this call never blocks on them.
+    `match_data` holds the ranked match of every candidate that is already matched;
+    while status is "processing", call again for the pending ones.
     """
-    temp_dir = os.path.join(os.getcwd(), "temp_extracted_resumes")
-    
-    processed = []
-    failed = []
-
-    for candidate_req in req.candidates:
-        # Prevent hitting rate limits (especially on free tier)
-        time.sleep(2)
-        local_raw_path = os.path.join(temp_dir, f"{candidate_req.candidate_id}_raw.txt")
-        
-        if not os.path.exists(local_raw_path):
-            failed.append({"candidate_id": candidate_req.candidate_id, "error": "Temporary raw resume not found locally"})
-            continue
-            
-        try:
-            with open(local_raw_path, "r", encoding="utf-8") as f:
-                raw_text = f.read()
-                
-            parser = ResumeParser()
-            parsed_result = parser.parse(raw_text)
-            
-            if not parsed_result:
-                raise ValueError("LLM parsing returned empty data")
-                
-            # 1. Store JSON to S3 (derive path dynamically to decouple endpoint)
-            if "resumes/" in candidate_req.s3_key:
-                json_key = candidate_req.s3_key.split("resumes/")[0] + f"parsed/{candidate_req.candidate_id}_parsed.json"
-                json_bytes = json.dumps(parsed_result).encode('utf-8')
-                _storage.upload_file(json_bytes, json_key, "application/json")
-            
-            # 2. Save candidate to PostgreSQL
-            candidate_obj = save_candidate_from_resume(
-                parsed_resume=parsed_result,
-                s3_link=candidate_req.s3_key,  # URL to original pdf
-                s3_candidate_id=candidate_req.candidate_id,
-                s3_job_id=jd_id
-            )
-            
-            # 3. Clean up temp local document
-            os.remove(local_raw_path)
-            log_tool.log_info(f"Deleted temporary raw text file: {local_raw_path}")
-            
-            processed.append(candidate_obj.s3_candidate_id)
-            
-        except Exception as e:
-            log_tool.log_exception(f"Resume processing failed for candidate '{candidate_req.candidate_id}'", e)
-            failed.append({"candidate_id": candidate_req.candidate_id, "error": str(e)})
+    candidate_ids = [c.candidate_id for c in req.candidates]
+    jobs = await asyncio.to_thread(get_jobs_by_candidate, candidate_ids)
+
+    retry_ids = [cid for cid, job in jobs.items() if job.status == IngestionStatus.failed.value]
+    requeued = set(await asyncio.to_thread(requeue_candidates, retry_ids))
+    if requeued:
+        notify_ingestion_workers()
 
-    # 4. Instantly Match ALL the processed candidates Against the Job Globally
-    rank_data_map = {}
+    processed, pending, failed, unknown = [], [], [], []
+    for candidate_id in candidate_ids:
+        job = jobs.get(candidate_id)
+        if job is None:
+            unknown.append(candidate_id)
+        elif job.status == IngestionStatus.matched.value:
+            processed.append(job.stored_candidate_id or candidate_id)
+        elif candidate_id in requeued or job.status != IngestionStatus.failed.value:
+            pending.append({"candidate_id": candidate_id, "status": job.status if candidate_id not in requeued else "requeued"})
+        else:
+            failed.append({"candidate_id": candidate_id, "error": job.last_error})
+    failed.extend({"candidate_id": cid, "error": "Resume was never uploaded for ingestion"} for cid in unknown)
+
+    match_data = {}
     if processed:
         try:
-            ranked_payload = _matching_service.get_ranked_matches_for_job(jd_id, refresh=True)
+            # Stored matches only (no refresh): the workers already scored these
+            ranked_payload = await asyncio.to_thread(_matching_service.get_ranked_matches_for_job, jd_id)
+            wanted = set(processed)
             for candidate in ranked_payload.get("candidates", []):
-                if candidate.get("candidate_id") in processed:
-                    rank_data_map[candidate.get("candidate_id")] = candidate
-        except Exception as me:
-            log_tool.log_exception("Bulk matching phase failed", me)
+                if candidate.get("candidate_id") in wanted:
+                    match_data[candidate.get("candidate_id")] = candidate
+        except Exception as e:
+            log_tool.log_exception("Loading match data failed", e)
 
     return {
-        "status": "success" if not failed else "partial_success",
-        "message": f"Successfully processed {len(processed)} resumes. Failed {len(failed)}.",
+        "status": "success" if not (pending or failed) else ("processing" if pending else "partial_success"),
+        "message": f"Processed {len(processed)} resumes. In progress {len(pending)}. Failed {len(failed)}.",
         "processed_candidates": processed,
+        "pending_candidates": pending,
         "failed_candidates": failed,
-        "match_data": rank_data_map
-    }
\ No newline at end of file
+        "match_data": match_data,
+    }
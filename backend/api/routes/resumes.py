@@ -3,11 +3,11 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
 from log import log_tool
-from services.parse_resume_service import ParseResumeService
+from services.registry import lazy_service
 
 router = APIRouter(prefix="/parse-resume", tags=["Resumes"])
 
-_parse_resume_service = ParseResumeService()
+_parse_resume_service = lazy_service("parse_resume")
 
 
 @router.post("", response_model=None)
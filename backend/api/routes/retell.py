@@ -7,7 +7,7 @@ from dotenv import set_key
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
 from db.models import Role, User, Company, Candidate, Job, InterviewCall, RetellAgent
-from services.retell_service import RetellService
+from services.registry import lazy_service
 from log import log_tool
 from schemas import (
     UpdateLlmPayload,
@@ -33,7 +33,7 @@ def get_db():
     finally:
         db.close()
 
-retell_service = RetellService()
+retell_service = lazy_service("retell")
 
 def update_env_id(key: str, value: str):
     """Updates a specific key in the .env file."""
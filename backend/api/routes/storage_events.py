@@ -0,0 +1,76 @@
+"""
+Storage events — S3 ObjectCreated notifications that queue presigned resume uploads for ingestion.
+
+Config:
+  STORAGE_EVENTS_TOKEN : shared secret the event forwarder sends as X-Storage-Event-Token.
+                         Required: while unset the endpoint rejects every event (503).
+"""
+
+import asyncio
+import hmac
+import os
+from typing import Optional
+from urllib.parse import unquote_plus
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from log import log_tool
+from services.ingestion_worker import notify_ingestion_workers
+from services.registry import lazy_service
+
+router = APIRouter(prefix="/storage", tags=["Storage Events"])
+
+_storage = lazy_service("storage")
+_intake = lazy_service("resume_intake")
+
+STORAGE_EVENTS_TOKEN = os.getenv("STORAGE_EVENTS_TOKEN")
+
+
+def _created_keys(payload: dict) -> list[str]:
+    """Object keys from an S3 notification ({"Records": [...]}) or an EventBridge "Object Created" event."""
+    keys = []
+    for record in payload.get("Records") or []:
+        if str(record.get("eventName", "")).startswith("ObjectCreated") and record.get("s3"):
+            # S3 notifications URL-encode keys
+            keys.append(unquote_plus(record["s3"]["object"]["key"]))
+    detail = payload.get("detail") or {}
+    if payload.get("detail-type") == "Object Created" and detail.get("object"):
+        keys.append(detail["object"]["key"])
+    return keys
+
+
+@router.post("/events")
+async def handle_storage_event(
+    request: Request,
+    x_storage_event_token: Optional[str] = Header(None),
+):
+    """
+    Queue resumes uploaded straight to S3 (presigned upload sessions) for ingestion.
+    Keys outside .../resumes/ (parsed JSON, JD files, folders) are ignored, and an
+    object that was already queued is not queued twice, so redelivered events are safe.
+    """
+    # Fail closed: without a token anyone could queue arbitrary resume keys
+    if not STORAGE_EVENTS_TOKEN:
+        raise HTTPException(status_code=503, detail="Storage events are disabled (STORAGE_EVENTS_TOKEN is not set)")
+    if not x_storage_event_token or not hmac.compare_digest(x_storage_event_token, STORAGE_EVENTS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid storage event token")
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Event body must be JSON")
+
+    keys = [key for key in _created_keys(payload) if _storage.parse_resume_key(key)]
+    if not keys:
+        return {"queued": 0, "results": []}
+
+    results = await asyncio.gather(*(_intake.ingest_object(key) for key in keys))
+    notify_ingestion_workers()
+
+    failed = [r for r in results if r["status"] == "failed"]
+    for result in failed:
+        log_tool.log_error("Storage event ingestion failed for '%s': %s" % (result["filename"], result.get("error")))
+    if len(failed) == len(results):
+        # Let the event source retry
+        raise HTTPException(status_code=500, detail={"message": "Ingestion failed", "results": results})
+    return {"queued": len(results) - len(failed), "results": results}
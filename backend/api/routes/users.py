@@ -7,11 +7,11 @@ from db.database import get_db
 from db.models import Role, User, Company
 from log import log_tool
 from pydantic import BaseModel
-from s3_utils.tenant_onboarder import TenantStorageService
+from services.registry import lazy_service
 
 router = APIRouter(prefix="/companies", tags=["Users"])
 
-_storage = TenantStorageService()
+_storage = lazy_service("storage")
 
 
 from schemas import UserCreateRequest, UserCreateResponse
@@ -10,12 +10,12 @@ Usage:
 
 from typing import Optional
 
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from log import log_tool
 from db.database import SessionLocal
-from db.models import Candidate, Job
-from services.embedding_service import upsert_candidate_vector, upsert_job_vector
+from db.models import Candidate, Job, Match
 
 
 # ---------------------------------------------------------------------------
@@ -27,13 +27,16 @@ def save_candidate_from_resume(
     parsed_resume: dict,
     s3_link: Optional[str] = None,
     s3_candidate_id: Optional[str] = None,
-    s3_job_id: Optional[str] = None
+    s3_job_id: Optional[str] = None,
+    embed: bool = True,
 ) -> Candidate:
     """
     Create a Candidate row from parsed resume JSON and persist it.
 
     Args:
         parsed_resume: Full parsed resume dict (top-level dict containing "candidate").
+        embed: Also upsert the Qdrant vectors and skill vocabulary. The ingestion
+               queue passes False and runs `embed_candidate` as its own stage.
 
     Returns:
         The persisted Candidate ORM object.
@@ -137,11 +140,8 @@ def save_candidate_from_resume(
         if not existing_candidate:
             log_tool.log_info("Inserted new candidate id=%s email=%s" % (candidate.s3_candidate_id, candidate.email))
 
-        # Store candidate's skills/profile as a vector in Qdrant (always do this to ensure cloud is in sync)
-        try:
-            upsert_candidate_vector(candidate.s3_candidate_id, candidate)
-        except Exception as emb_err:
-            log_tool.log_warning("Embedding upsert skipped for candidate id=%s: %s" % (candidate.s3_candidate_id, emb_err))
+        if embed:
+            _index_candidate(candidate)
 
         return candidate
     except SQLAlchemyError as exc:
@@ -152,6 +152,80 @@ def save_candidate_from_resume(
         db.close()
 
 
+def _index_candidate(candidate: Candidate) -> None:
+    # Imported here: qdrant-client / numpy load on first indexing, not with the API
+    from services.embedding_service import upsert_candidate_vector
+    from services.skill_vocabulary import flatten_skills, register_skills
+
+    # Store candidate's skills/profile as a vector in Qdrant (always do this to ensure cloud is in sync)
+    try:
+        upsert_candidate_vector(candidate.s3_candidate_id, candidate)
+    except Exception as emb_err:
+        log_tool.log_warning("Embedding upsert skipped for candidate id=%s: %s" % (candidate.s3_candidate_id, emb_err))
+
+    # Keep the matcher's skill vocabulary in sync
+    try:
+        register_skills(flatten_skills(candidate.skills))
+    except Exception as vocab_err:
+        log_tool.log_warning("Skill vocabulary update skipped for candidate id=%s: %s" % (candidate.s3_candidate_id, vocab_err))
+
+
+def embed_candidate(s3_candidate_id: str) -> Candidate:
+    """
+    Upsert the Qdrant vectors and skill vocabulary for an already saved candidate.
+
+    Raises:
+        ValueError: If the candidate does not exist.
+    """
+    db = SessionLocal()
+    try:
+        candidate = db.query(Candidate).filter(Candidate.s3_candidate_id == s3_candidate_id).first()
+        if candidate is None:
+            raise ValueError("Candidate id=%s not found." % s3_candidate_id)
+        _index_candidate(candidate)
+        return candidate
+    finally:
+        db.close()
+
+
+def attach_candidates_to_job(s3_candidate_ids: list[str], s3_job_id: str) -> int:
+    """
+    Map already saved candidates to a job, as save_candidate_from_resume does for
+    a re-uploaded resume. Used when a duplicate upload for another JD reuses the
+    stored candidate instead of persisting it again. Returns rows changed.
+    """
+    if not s3_candidate_ids:
+        return 0
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(Candidate)
+            .where(Candidate.s3_candidate_id.in_(s3_candidate_ids), Candidate.s3_job_id.is_distinct_from(s3_job_id))
+            .values(s3_job_id=s3_job_id)
+        )
+        db.commit()
+        return result.rowcount
+    except SQLAlchemyError as exc:
+        db.rollback()
+        log_tool.log_error("DB error attaching candidates to job id=%s: %s" % (s3_job_id, exc))
+        raise
+    finally:
+        db.close()
+
+
+def matched_candidate_ids(s3_job_id: str, s3_candidate_ids: list[str]) -> set[str]:
+    """The subset of `s3_candidate_ids` that have a stored match against the job."""
+    if not s3_candidate_ids:
+        return set()
+    db = SessionLocal()
+    try:
+        return set(db.execute(
+            select(Match.candidate_id).where(Match.job_id == s3_job_id, Match.candidate_id.in_(s3_candidate_ids))
+        ).scalars())
+    finally:
+        db.close()
+
+
 # ---------------------------------------------------------------------------
 # Job Description
 # ---------------------------------------------------------------------------
@@ -208,12 +282,21 @@ def save_job_from_jd(
         db.refresh(job)
         log_tool.log_info("Inserted job id=%s title=%s" % (job.s3_job_id, job.title))
 
+        from services.embedding_service import upsert_job_vector
+        from services.skill_vocabulary import flatten_skills, register_skills
+
         # Store job's skills/description as a vector in Qdrant
         try:
             upsert_job_vector(job.s3_job_id, job)
         except Exception as emb_err:
             log_tool.log_warning("Embedding upsert skipped for job id=%s: %s" % (job.s3_job_id, emb_err))
 
+        # Keep the matcher's skill vocabulary in sync
+        try:
+            register_skills(flatten_skills(job.required_skills) + flatten_skills(job.preferred_skills))
+        except Exception as vocab_err:
+            log_tool.log_warning("Skill vocabulary update skipped for job id=%s: %s" % (job.s3_job_id, vocab_err))
+
         return job
     except SQLAlchemyError as exc:
         db.rollback()
@@ -0,0 +1,391 @@
+"""
+ingestion_repository.py — PostgreSQL-backed resume ingestion queue (`ingestion_jobs`).
+
+Each uploaded resume is one row that moves through
+    extracted → parsed → persisted → embedded → matched
+with `failed` as the give-up state. Workers claim rows with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of API processes or
+standalone workers can drain the queue without double-processing; a claim
+whose lease is older than INGESTION_LOCK_TIMEOUT is considered abandoned
+(crashed worker) and can be claimed again.
+
+Usage:
+    from db.ingestion_repository import enqueue_resume, claim_jobs, advance_job
+
+    enqueue_resume(candidate_id, job_id, raw_text, s3_key=..., filename=...)
+
+Uploads are deduplicated on content_hash (file bytes) and text_hash (normalized
+extracted text): `find_duplicate` returns an earlier job for the same resume and
+`link_duplicate` queues it for another JD, reusing whatever stages it already has.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+
+from log import log_tool
+from db.database import SessionLocal
+from db.models import IngestionJob, IngestionStatus
+
+INGESTION_LOCK_TIMEOUT = int(os.getenv("INGESTION_LOCK_TIMEOUT", "600"))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+
+TERMINAL_STATUSES = (IngestionStatus.matched.value, IngestionStatus.failed.value)
+
+
+def enqueue_resume(
+    candidate_id: str,
+    job_id: str,
+    raw_text: str,
+    s3_key: Optional[str] = None,
+    filename: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    extract_ms: Optional[float] = None,
+    content_hash: Optional[str] = None,
+    text_hash: Optional[str] = None,
+) -> bool:
+    """
+    Queue an extracted resume. Returns False if the candidate_id was already queued
+    (a retried upload), in which case the existing job is left untouched.
+    """
+    now = datetime.now(timezone.utc)
+    timings = {IngestionStatus.extracted.value: _timing(now, extract_ms)}
+    stmt = (
+        pg_insert(IngestionJob)
+        .values(
+            candidate_id=candidate_id,
+            job_id=job_id,
+            s3_key=s3_key,
+            filename=filename,
+            raw_text=raw_text,
+            batch_id=batch_id,
+            content_hash=content_hash,
+            text_hash=text_hash,
+            stage_timings=timings,
+            status=IngestionStatus.extracted.value,
+            attempts=0,
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["candidate_id"])
+        .returning(IngestionJob.id)
+    )
+    db = SessionLocal()
+    try:
+        inserted = db.execute(stmt).first() is not None
+        db.commit()
+        if not inserted:
+            log_tool.log_info("Ingestion: candidate id=%s already queued, skipping duplicate." % candidate_id)
+        return inserted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def find_duplicate(
+    key_prefix: str,
+    content_hash: Optional[str] = None,
+    text_hash: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Earlier upload of the same resume under `key_prefix` (the tenant's storage
+    prefix), matched on file bytes or extracted text; failed jobs don't count.
+    Prefers the job furthest along, so a link reuses as much work as possible.
+    """
+    conditions = []
+    if content_hash:
+        conditions.append(IngestionJob.content_hash == content_hash)
+    if text_hash:
+        conditions.append(IngestionJob.text_hash == text_hash)
+    if not conditions:
+        return None
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            select(
+                IngestionJob.id,
+                IngestionJob.candidate_id,
+                IngestionJob.job_id,
+                IngestionJob.s3_key,
+                IngestionJob.stored_candidate_id,
+                IngestionJob.status,
+            )
+            .where(
+                or_(*conditions),
+                IngestionJob.status != IngestionStatus.failed.value,
+                IngestionJob.s3_key.startswith(key_prefix, autoescape=True),
+            )
+            .order_by(IngestionJob.stored_candidate_id.is_(None), IngestionJob.id)
+            .limit(1)
+        ).mappings().first()
+        return dict(row) if row else None
+    finally:
+        db.close()
+
+
+def link_duplicate(
+    source_id: int,
+    candidate_id: str,
+    job_id: str,
+    filename: Optional[str] = None,
+    batch_id: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Queue a copy of job `source_id` for another JD under a new `candidate_id`.
+    The copy shares the source's S3 object, text and hashes and starts at the
+    source's last completed stage (at most `embedded`, so only matching reruns;
+    the match stage maps the stored candidate to `job_id` before scoring).
+    Returns the starting status, or None if the source no longer exists.
+    """
+    now = datetime.now(timezone.utc)
+    timings = literal({"linked": _timing(now, None)}, type_=JSONB)
+    columns = {
+        "candidate_id": literal(candidate_id),
+        "job_id": literal(job_id),
+        "s3_key": IngestionJob.s3_key,
+        "filename": literal(filename),
+        "batch_id": literal(batch_id),
+        "content_hash": IngestionJob.content_hash,
+        "text_hash": IngestionJob.text_hash,
+        "raw_text": IngestionJob.raw_text,
+        "parsed_json": IngestionJob.parsed_json,
+        "stored_candidate_id": IngestionJob.stored_candidate_id,
+        "status": _linked_status(),
+        "attempts": literal(0),
+        "stage_timings": timings,
+        "created_at": literal(now),
+        "updated_at": literal(now),
+    }
+    stmt = (
+        pg_insert(IngestionJob)
+        .from_select(list(columns), select(*columns.values()).where(IngestionJob.id == source_id))
+        .returning(IngestionJob.status)
+    )
+    db = SessionLocal()
+    try:
+        status = db.execute(stmt).scalar()
+        db.commit()
+        return status
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def claim_jobs(worker_id: str, limit: int) -> list[dict]:
+    """
+    Lease up to `limit` unfinished jobs for this worker (oldest first).
+    Rows locked by another live transaction are skipped, not waited on.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=INGESTION_LOCK_TIMEOUT)
+    db = SessionLocal()
+    try:
+        ids = db.execute(
+            select(IngestionJob.id)
+            .where(
+                IngestionJob.status.notin_(TERMINAL_STATUSES),
+                or_(IngestionJob.locked_at.is_(None), IngestionJob.locked_at < stale_before),
+            )
+            .order_by(IngestionJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            db.commit()
+            return []
+
+        rows = db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id.in_(ids))
+            .values(locked_by=worker_id, locked_at=now)
+            .returning(
+                IngestionJob.id,
+                IngestionJob.candidate_id,
+                IngestionJob.job_id,
+                IngestionJob.s3_key,
+                IngestionJob.filename,
+                IngestionJob.raw_text,
+                IngestionJob.parsed_json,
+                IngestionJob.stored_candidate_id,
+                IngestionJob.status,
+                IngestionJob.attempts,
+            )
+        ).mappings().all()
+        db.commit()
+        return sorted((dict(row) for row in rows), key=lambda row: row["id"])
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def advance_job(job_id: int, worker_id: str, status: str, elapsed_ms: Optional[float] = None, **fields) -> bool:
+    """
+    Record a completed stage (and its outputs and timing) and refresh the lease.
+    Returns False if the lease was lost to another worker, in which case nothing is written.
+    """
+    now = datetime.now(timezone.utc)
+    timing = literal({status: _timing(now, elapsed_ms)}, type_=JSONB)
+    values = dict(
+        fields,
+        status=status,
+        stage_timings=func.coalesce(IngestionJob.stage_timings, literal({}, type_=JSONB)).op("||")(timing),
+        updated_at=now,
+        locked_at=now,
+        last_error=None,
+    )
+    if status in TERMINAL_STATUSES:
+        values.update(locked_by=None, locked_at=None)
+    return _update_owned(job_id, worker_id, values)
+
+
+def fail_job(job_id: int, worker_id: str, error: str, attempts: int) -> bool:
+    """
+    Record a failed attempt and release the lease so the job is retried,
+    or mark it failed once INGESTION_MAX_ATTEMPTS is reached.
+    """
+    attempts += 1
+    values = {
+        "attempts": attempts,
+        "last_error": error[:2000],
+        "updated_at": datetime.now(timezone.utc),
+        "locked_by": None,
+        "locked_at": None,
+    }
+    if attempts >= INGESTION_MAX_ATTEMPTS:
+        values["status"] = IngestionStatus.failed.value
+    return _update_owned(job_id, worker_id, values)
+
+
+def release_jobs(job_ids: list[int], worker_id: str) -> None:
+    """Give up the lease on jobs this worker still holds (e.g. on shutdown)."""
+    if not job_ids:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id.in_(job_ids), IngestionJob.locked_by == worker_id)
+            .values(locked_by=None, locked_at=None)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def requeue_candidates(candidate_ids: list[str]) -> list[str]:
+    """Reset failed jobs for these candidates so workers pick them up again. Returns the ids re-armed."""
+    if not candidate_ids:
+        return []
+    db = SessionLocal()
+    try:
+        rearmed = db.execute(
+            update(IngestionJob)
+            .where(
+                IngestionJob.candidate_id.in_(candidate_ids),
+                IngestionJob.status == IngestionStatus.failed.value,
+            )
+            .values(
+                # Resume from the last stage that produced output
+                status=_resume_status(),
+                attempts=0,
+                locked_by=None,
+                locked_at=None,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(IngestionJob.candidate_id)
+        ).scalars().all()
+        db.commit()
+        return list(rearmed)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_batch_jobs(batch_id: str) -> list[dict]:
+    """Progress fields of every job in one upload batch, in upload order (no resume text)."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                IngestionJob.candidate_id,
+                IngestionJob.stored_candidate_id,
+                IngestionJob.filename,
+                IngestionJob.status,
+                IngestionJob.attempts,
+                IngestionJob.last_error,
+                IngestionJob.stage_timings,
+                IngestionJob.updated_at,
+            )
+            .where(IngestionJob.batch_id == batch_id)
+            .order_by(IngestionJob.id)
+        ).mappings().all()
+        return [dict(row) for row in rows]
+    finally:
+        db.close()
+
+
+def get_jobs_by_candidate(candidate_ids: list[str]) -> dict[str, IngestionJob]:
+    db = SessionLocal()
+    try:
+        rows = db.query(IngestionJob).filter(IngestionJob.candidate_id.in_(candidate_ids)).all()
+        return {row.candidate_id: row for row in rows}
+    finally:
+        db.close()
+
+
+def _timing(at: datetime, elapsed_ms: Optional[float]) -> dict:
+    return {"at": at.isoformat(), "ms": round(elapsed_ms, 1) if elapsed_ms is not None else None}
+
+
+def _resume_status():
+    return case(
+        (IngestionJob.stored_candidate_id.isnot(None), IngestionStatus.persisted.value),
+        (IngestionJob.parsed_json.isnot(None), IngestionStatus.parsed.value),
+        else_=IngestionStatus.extracted.value,
+    )
+
+
+def _linked_status():
+    return case(
+        (
+            and_(
+                IngestionJob.stored_candidate_id.isnot(None),
+                IngestionJob.status.in_([IngestionStatus.embedded.value, IngestionStatus.matched.value]),
+            ),
+            IngestionStatus.embedded.value,
+        ),
+        else_=_resume_status(),
+    )
+
+
+def _update_owned(job_id: int, worker_id: str, values: dict) -> bool:
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.locked_by == worker_id)
+            .values(**values)
+        )
+        db.commit()
+        if not result.rowcount:
+            log_tool.log_warning("Ingestion: lease on job id=%s lost by worker %s" % (job_id, worker_id))
+        return bool(result.rowcount)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
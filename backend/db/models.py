@@ -126,6 +126,9 @@ class Match(Base):
     # Qualification Status
     qualification_status     = Column(String)  # e.g., "Qualified" or "Disqualified"
 
+    embedding_similarity     = Column(Float)   # mean of the category similarities
+    input_fingerprint        = Column(String)  # sha256 of candidate + job + scoring inputs
+
     created_at              = Column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -135,6 +138,8 @@ class Match(Base):
     __table_args__ = (
         # Prevent duplicate matches for same candidate + job pair
         UniqueConstraint("candidate_id", "job_id", name="uq_matches_candidate_job"),
+        # Ranked listing per job: ORDER BY final_match_percentage DESC, id DESC + keyset pagination
+        Index("ix_matches_job_score", "job_id", final_match_percentage.desc(), id.desc()),
     )
 
     def __repr__(self):
@@ -253,5 +258,110 @@ class InterviewCall(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # Latest call per (job, candidate) via DISTINCT ON without a sort step
+        Index(
+            "ix_interview_calls_job_candidate_latest",
+            "job_id", "candidate_id", created_at.desc(), id.desc(),
+        ),
+    )
+
     def __repr__(self):
         return f"<InterviewCall call_id={self.call_id} status={self.call_status}>"
+
+
+class ParseCache(Base):
+    __tablename__ = "parse_cache"
+
+    # sha256 of the whitespace-normalized extracted text
+    text_hash               = Column(String, primary_key=True)
+    # "resume" or "jd"
+    kind                    = Column(String, primary_key=True)
+    # hash of the system prompt + user message template the result was produced with
+    prompt_version          = Column(String, primary_key=True)
+
+    result                  = Column(JSONB, nullable=False)
+    hit_count               = Column(Integer, nullable=False, default=0)
+
+    created_at              = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    last_used_at            = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # LRU trimming and TTL sweeps
+        Index("ix_parse_cache_last_used_at", "last_used_at"),
+    )
+
+    def __repr__(self):
+        return f"<ParseCache kind={self.kind} hash={self.text_hash[:12]} version={self.prompt_version}>"
+
+
+class IngestionStatus(str, enum.Enum):
+    extracted = "extracted"   # text extracted at upload, waiting for the LLM
+    parsed    = "parsed"      # structured JSON stored on the job
+    persisted = "persisted"   # candidate row saved
+    embedded  = "embedded"    # Qdrant vectors + skill vocabulary updated
+    matched   = "matched"     # scored against the job (terminal)
+    failed    = "failed"      # gave up after INGESTION_MAX_ATTEMPTS (terminal)
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id                      = Column(Integer, primary_key=True)
+
+    # Upload-time candidate id; unique so a retried upload/enqueue is a no-op
+    candidate_id            = Column(String, nullable=False, unique=True)
+    job_id                  = Column(String, nullable=False, index=True)
+    s3_key                  = Column(String)
+    filename                = Column(String)
+    # Upload request this resume arrived in (progress API / SSE stream)
+    batch_id                = Column(String, index=True)
+
+    # Upload dedupe keys: sha256 of the file bytes / of the normalized extracted text
+    content_hash            = Column(String, index=True)
+    text_hash               = Column(String, index=True)
+
+    raw_text                = Column(String)
+    parsed_json             = Column(JSONB)
+    # Candidate row the resume resolved to (differs from candidate_id when the email already existed)
+    stored_candidate_id     = Column(String)
+
+    status                  = Column(String, nullable=False, default=IngestionStatus.extracted.value)
+    attempts                = Column(Integer, nullable=False, default=0)
+    last_error              = Column(String)
+    # {stage: {"at": ISO timestamp, "ms": time spent producing that stage}}
+    stage_timings           = Column(JSONB)
+
+    # Claim lease: a worker owns the row until it releases it or the lease goes stale
+    locked_by               = Column(String)
+    locked_at               = Column(DateTime(timezone=True))
+
+    created_at              = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    updated_at              = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Claim scan only touches unfinished work
+        Index(
+            "ix_ingestion_jobs_claimable", "id",
+            postgresql_where=text("status NOT IN ('matched', 'failed')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<IngestionJob id={self.id} candidate={self.candidate_id} status={self.status}>"
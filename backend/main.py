@@ -19,6 +19,8 @@ from api.routes import (
     jd_upload_router,
     resume_upload_router,
     candidates_router,
+    batches_router,
+    storage_events_router,
 )
 
 # Import so SQLAlchemy Base has all models; required before create_all
@@ -28,6 +30,9 @@ from db.database import Base, engine
 from alembic.config import Config
 from alembic import command
 
+from services.ingestion_worker import start_ingestion_workers, stop_ingestion_workers
+from utils.extraction_executor import shutdown_extraction_executor
+
 
 app = FastAPI(title="AI Recruitment API")
 
@@ -53,6 +58,18 @@ def run_migrations():
         log_tool.log_exception("❌ Failed to run database migrations", e)
 
 
+@app.on_event("startup")
+async def start_background_workers():
+    """Start the resume ingestion workers (INGESTION_WORKERS=0 to run them as a separate process)."""
+    await start_ingestion_workers()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await stop_ingestion_workers()
+    shutdown_extraction_executor()
+
+
 # ── Register API routers ─────────────────────────────────────────────────────
 app.include_router(health_router)
 app.include_router(companies_router)
@@ -64,6 +81,8 @@ app.include_router(retell_router)
 app.include_router(resumes_router)
 app.include_router(jobs_router)
 app.include_router(candidates_router)
+app.include_router(batches_router)
+app.include_router(storage_events_router)
 
 
 
@@ -1,7 +1,12 @@
+import hashlib
 import json
 import os
+from datetime import datetime, timezone
 from typing import Union
 
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from log import log_tool
 from db.database import SessionLocal
 from db.models import Candidate, Job, Match
@@ -15,6 +20,104 @@ WEIGHT_EDUCATION = 5
 WEIGHT_EXPERIENCE = 10
 WEIGHT_LOCATION = 5
 
+# Bump whenever scoring logic changes so stored matches are recomputed on the next run
+SCORING_VERSION = 1
+
+# Rows per INSERT ... ON CONFLICT statement when persisting matches
+MATCH_UPSERT_BATCH_SIZE = int(os.getenv("MATCH_UPSERT_BATCH_SIZE", "500"))
+
+# Columns refreshed when a (candidate_id, job_id) match already exists
+_MATCH_UPDATE_COLUMNS = (
+    "required_skills_score",
+    "preferred_skills_score",
+    "education_score",
+    "experience_score",
+    "location_score",
+    "final_match_percentage",
+    "matched_required_skills",
+    "missing_required_skills",
+    "matched_preferred_skills",
+    "qualification_status",
+    "embedding_similarity",
+    "input_fingerprint",
+)
+
+_SIM_KEYS = ("required_skills_sim", "preferred_skills_sim", "education_sim")
+
+
+def _location_matches(job_loc: str, candidate: Candidate) -> bool:
+    """A candidate matches when the job has no location or any of city/state/country overlaps it."""
+    if not job_loc:
+        return True
+    cand_locs = [
+        (candidate.city or "").lower().strip(),
+        (candidate.state or "").lower().strip(),
+        (candidate.country or "").lower().strip()
+    ]
+    return any(job_loc in c_loc or c_loc in job_loc for c_loc in cand_locs if c_loc)
+
+
+def _candidate_inputs(candidate: Candidate) -> dict:
+    """Every candidate field that feeds the similarity lookups or the score components."""
+    return {
+        "full_name": candidate.full_name,
+        "skills": candidate.skills,
+        "overall_experience_years": candidate.overall_experience_years,
+        "city": candidate.city,
+        "state": candidate.state,
+        "country": candidate.country,
+        "current_designation": candidate.current_designation,
+        "summary": candidate.summary,
+        "highest_degree": candidate.highest_degree,
+        "highest_degree_name": candidate.highest_degree_name,
+        "institution": candidate.institution,
+    }
+
+
+def _job_inputs(job: Job) -> dict:
+    """Every job field that feeds the similarity lookups or the score components."""
+    raw = job.raw_job_json if isinstance(job.raw_job_json, dict) else {}
+    return {
+        "title": job.title,
+        "summary": job.summary,
+        "required_skills": job.required_skills,
+        "preferred_skills": job.preferred_skills,
+        "min_required_experience_years": job.min_required_experience_years,
+        "max_required_experience_years": job.max_required_experience_years,
+        "location": job.location,
+        "education_requirements": raw.get("education_requirements"),
+    }
+
+
+def _scoring_config() -> dict:
+    from services.embedding_service import _MODEL_NAME
+
+    return {
+        "version": SCORING_VERSION,
+        "model": _MODEL_NAME,
+        "weights": [
+            WEIGHT_REQUIRED_SKILLS,
+            WEIGHT_PREFERRED_SKILLS,
+            WEIGHT_EDUCATION,
+            WEIGHT_EXPERIENCE,
+            WEIGHT_LOCATION,
+        ],
+    }
+
+
+def _match_fingerprint(candidate: Candidate, job: Job) -> str:
+    """
+    sha256 over the candidate inputs, the job inputs and the scoring config.
+    A stored match whose fingerprint still equals this value is up to date.
+    """
+    payload = json.dumps(
+        {"candidate": _candidate_inputs(candidate), "job": _job_inputs(job), "config": _scoring_config()},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class Matcher:
 
     def __init__(self):
@@ -42,7 +145,8 @@ class Matcher:
             results = []
             for job in jobs:
                 match_result = self._calculate_scores(candidate, job)
-                self._save_match(db, candidate, job, match_result)
+                match_result["candidate_id"] = candidate.s3_candidate_id
+                match_result["job_id"] = job.s3_job_id
                 results.append(match_result)
 
                 log_tool.log_info(
@@ -50,6 +154,7 @@ class Matcher:
                     % (candidate.s3_candidate_id, job.s3_job_id, match_result["match_scores"]["final_match_percentage"])
                 )
 
+            self._save_matches(db, results)
             db.commit()
             return results
 
@@ -61,8 +166,17 @@ class Matcher:
             db.close()
 
     # ── AUTO: new job vs ALL candidates ──────────────────────────────────────
-    def match_all_candidates_for_job(self, job_id: str) -> list:
+    def match_all_candidates_for_job(self, job_id: str, force: bool = False, raise_errors: bool = False) -> list:
+        """
+        Score the job's candidates and persist the results.
+
+        Incremental: only pairs whose input fingerprint differs from the stored
+        match (new resumes, edited candidates, an edited job or a scoring change)
+        are recomputed; the returned list holds just those. `force` rescores all.
 
+        Errors are logged and an empty list returned, unless `raise_errors`
+        (the ingestion queue retries on the exception instead).
+        """
         db = SessionLocal()
 
         try:
@@ -78,31 +192,50 @@ class Matcher:
                 log_tool.log_info("Auto-match: no candidates in DB yet for job id=%s." % job_id)
                 return []
 
-            results = []
-
-            for candidate in candidates:
-                match_result = self._calculate_scores(candidate, job)
+            total = len(candidates)
+            # Hashed once per candidate: used for the staleness filter and stored with the match
+            fingerprints = {c.s3_candidate_id: _match_fingerprint(c, job) for c in candidates}
+            if not force:
+                stored = dict(
+                    db.query(Match.candidate_id, Match.input_fingerprint)
+                    .filter(Match.job_id == job_id)
+                    .all()
+                )
+                candidates = [
+                    c for c in candidates
+                    if stored.get(c.s3_candidate_id) != fingerprints[c.s3_candidate_id]
+                ]
+                if not candidates:
+                    log_tool.log_info("Auto-match: all %d match(es) for job id=%s are up to date." % (total, job_id))
+                    return []
 
-                match_result["candidate_id"] = candidate.s3_candidate_id
-                match_result["job_id"] = job.s3_job_id
+            # Whole-job scoring: one bulk similarity pass, all components as arrays
+            from services.embedding_service import get_bulk_category_similarities
 
-                self._save_match(db, candidate, job, match_result)
+            sims = get_bulk_category_similarities(job, candidates)
+            results = self._score_candidates(job, candidates, sims, fingerprints)
 
-                results.append(match_result)
+            for candidate, match_result in zip(candidates, results):
 
-                log_tool.log_info(
-                    "Auto-matched candidate=%s vs job=%s → %.2f%%"
-                    % (candidate.s3_candidate_id, job.s3_job_id, match_result["match_scores"]["final_match_percentage"])
-                )
+                match_result["candidate_id"] = candidate.s3_candidate_id
+                match_result["job_id"] = job.s3_job_id
 
+            self._save_matches(db, results)
             db.commit()
 
+            log_tool.log_info(
+                "Auto-matched job=%s against %d candidate(s) in bulk mode (%d unchanged)"
+                % (job.s3_job_id, len(results), total - len(results))
+            )
+
             return results
 
         except Exception as e:
 
             db.rollback()
             log_tool.log_error("Error in match_all_candidates_for_job: %s" % e)
+            if raise_errors:
+                raise
             return []
 
         finally:
@@ -120,30 +253,37 @@ class Matcher:
             if not job:
                 return [{"error": f"Job with id={job_id} not found in database."}]
 
-            results = []
-
-            for candidate_id in candidate_ids:
-
-                candidate = db.query(Candidate).filter(Candidate.s3_candidate_id == candidate_id).first()
+            # One bulk fetch of the requested candidates, then whole-job scoring
+            found = {
+                c.s3_candidate_id: c
+                for c in db.query(Candidate).filter(Candidate.s3_candidate_id.in_(candidate_ids)).all()
+            }
+            candidates = [found[cid] for cid in dict.fromkeys(candidate_ids) if cid in found]
 
-                if not candidate:
-                    results.append({"error": f"Candidate with id={candidate_id} not found.", "candidate_id": candidate_id})
-                    continue
+            scored = {}
+            if candidates:
+                from services.embedding_service import get_bulk_category_similarities
 
-                match_result = self._calculate_scores(candidate, job)
+                sims = get_bulk_category_similarities(job, candidates)
+                for candidate, match_result in zip(candidates, self._score_candidates(job, candidates, sims)):
 
-                match_result["candidate_id"] = candidate.s3_candidate_id
-                match_result["job_id"] = job.s3_job_id
+                    match_result["candidate_id"] = candidate.s3_candidate_id
+                    match_result["job_id"] = job.s3_job_id
 
-                self._save_match(db, candidate, job, match_result)
+                    scored[candidate.s3_candidate_id] = match_result
 
-                results.append(match_result)
+                    log_tool.log_info(
+                        "Matched candidate=%s vs job=%s → %.2f%%"
+                        % (candidate.s3_candidate_id, job.s3_job_id, match_result["match_scores"]["final_match_percentage"])
+                    )
 
-                log_tool.log_info(
-                    "Matched candidate=%s vs job=%s → %.2f%%"
-                    % (candidate.s3_candidate_id, job.s3_job_id, match_result["match_scores"]["final_match_percentage"])
-                )
+            results = [
+                scored[candidate_id] if candidate_id in scored
+                else {"error": f"Candidate with id={candidate_id} not found.", "candidate_id": candidate_id}
+                for candidate_id in candidate_ids
+            ]
 
+            self._save_matches(db, list(scored.values()))
             db.commit()
 
             return results
@@ -164,16 +304,35 @@ class Matcher:
 
         sims = get_category_similarities(candidate.s3_candidate_id, job.s3_job_id)
 
-        req_sim = sims.get("required_skills_sim", 0.0)
-        pref_sim = sims.get("preferred_skills_sim", 0.0)
-        edu_sim = sims.get("education_sim", 0.0)
+        return self._score_candidates(
+            job,
+            [candidate],
+            {key: np.array([sims.get(key, 0.0)], dtype=np.float64) for key in _SIM_KEYS},
+        )[0]
+
+    # ── INTERNAL: vectorized scoring for one job vs many candidates ──────────
+    def _score_candidates(self, job: Job, candidates: list, sims: dict, fingerprints: dict = None) -> list:
+        """
+        Compute every score component for all candidates at once.
+
+        `sims` holds similarity arrays aligned with `candidates`
+        (required_skills_sim, preferred_skills_sim, education_sim).
+        `fingerprints` maps candidate id → input fingerprint when the caller
+        already computed them; missing ones are hashed here.
+        """
+        fingerprints = fingerprints or {}
+        n = len(candidates)
+
+        req_sim = np.asarray(sims.get("required_skills_sim", np.zeros(n)), dtype=np.float64)
+        pref_sim = np.asarray(sims.get("preferred_skills_sim", np.zeros(n)), dtype=np.float64)
+        edu_sim = np.asarray(sims.get("education_sim", np.zeros(n)), dtype=np.float64)
 
         embedding_sim = (req_sim + pref_sim + edu_sim) / 3.0
 
         # If the job has no preferred skills defined, shift the 20% weight to required skills!
         if not job.preferred_skills or len(job.preferred_skills) == 0:
             req_score = req_sim * (WEIGHT_REQUIRED_SKILLS + WEIGHT_PREFERRED_SKILLS)
-            pref_score = 0.0
+            pref_score = np.zeros(n)
         else:
             req_score = req_sim * WEIGHT_REQUIRED_SKILLS
             pref_score = pref_sim * WEIGHT_PREFERRED_SKILLS
@@ -181,8 +340,7 @@ class Matcher:
         edu_score = edu_sim * WEIGHT_EDUCATION
 
         # ── Experience Match
-        exp_score = 0.0
-        cand_exp = candidate.overall_experience_years or 0
+        cand_exp = np.array([c.overall_experience_years or 0 for c in candidates], dtype=np.float64)
         job_min = job.min_required_experience_years or 0
         job_max = getattr(job, "max_required_experience_years", 0) or 0
 
@@ -191,35 +349,56 @@ class Matcher:
         # 2. Equal or Above Maximum = 100%
         # 3. Between Min and Max = Fraction of max
 
-        if job_min > 0 and cand_exp < job_min:
-            exp_score = 0.0
-        elif job_max > 0:
-            if cand_exp >= job_max:
-                exp_score = float(WEIGHT_EXPERIENCE)
-            else:
-                exp_score = float(cand_exp / float(job_max)) * float(WEIGHT_EXPERIENCE)
-        elif job_min > 0:
-            if cand_exp >= job_min:
-                exp_score = float(WEIGHT_EXPERIENCE)
-            else:
-                exp_score = 0.0 # Under min is 0 based on above check
+        if job_max > 0:
+            exp_score = np.where(cand_exp >= job_max, 1.0, cand_exp / float(job_max)) * float(WEIGHT_EXPERIENCE)
         else:
-            exp_score = float(WEIGHT_EXPERIENCE)
+            exp_score = np.full(n, float(WEIGHT_EXPERIENCE))
+        if job_min > 0:
+            exp_score = np.where(cand_exp < job_min, 0.0, exp_score)
 
         # ── Location Match
-        loc_score = 0.0
         job_loc = (job.location or "").lower().strip()
+        loc_match = np.array([_location_matches(job_loc, c) for c in candidates], dtype=bool)
+        loc_score = np.where(loc_match, float(WEIGHT_LOCATION), 0.0)
 
-        cand_locs = [
-            (candidate.city or "").lower().strip(),
-            (candidate.state or "").lower().strip(),
-            (candidate.country or "").lower().strip()
-        ]
+        final = np.round(req_score + pref_score + edu_score + loc_score + exp_score, 2)
 
-        if not job_loc or any(job_loc in c_loc or c_loc in job_loc for c_loc in cand_locs if c_loc):
-            loc_score = float(WEIGHT_LOCATION)
-
-        final = round(req_score + pref_score + edu_score + loc_score + exp_score, 2)
+        # Determine qualification status based strictly on whether they met the minimum experience
+        if job_min > 0:
+            qualified = cand_exp >= job_min
+        else:
+            qualified = np.ones(n, dtype=bool)
+
+        results = []
+        for i, candidate in enumerate(candidates):
+            matched_required, missing_required, matched_preferred = self._skill_breakdown(candidate, job)
+
+            results.append({
+                "candidate_name": candidate.full_name or "Unknown",
+                "job_title": job.title,
+                "candidate_experience_years": candidate.overall_experience_years or 0,
+                "min_required_experience": job.min_required_experience_years or 0,
+                "qualification_status": "Qualified" if qualified[i] else "Disqualified",
+                "matched_required_skills": matched_required,
+                "missing_required_skills": missing_required,
+                "matched_preferred_skills": matched_preferred,
+                "embedding_similarity": round(float(embedding_sim[i]), 4),
+                "input_fingerprint": fingerprints.get(candidate.s3_candidate_id) or _match_fingerprint(candidate, job),
+                "match_scores": {
+                    "required_skills_score": round(float(req_score[i]), 2),
+                    "preferred_skills_score": round(float(pref_score[i]), 2),
+                    "education_score": round(float(edu_score[i]), 2),
+                    "experience_score": round(float(exp_score[i]), 2),
+                    "location_score": round(float(loc_score[i]), 2),
+                    "final_match_percentage": float(final[i]),
+                },
+            })
+
+        return results
+
+    # ── INTERNAL: text-based skill breakdown ─────────────────
+    @staticmethod
+    def _skill_breakdown(candidate: Candidate, job: Job) -> tuple:
 
         # ── FIX 1: SKILL EXTRACTION IMPROVED ──────────────────
         candidate_skills_list = []
@@ -238,7 +417,7 @@ class Matcher:
 
         candidate_skills_list = [str(s).strip() for s in candidate_skills_list if s]
 
-        log_tool.log_info(f"Candidate Skills Parsed: {candidate_skills_list}")
+        log_tool.log_debug(f"Candidate Skills Parsed: {candidate_skills_list}")
 
         # ── Text-based Skill Extraction ─────────────────
         matched_required = []
@@ -266,80 +445,55 @@ class Matcher:
             if skill.lower() in candidate_text:
                 matched_preferred.append(skill)
 
-        # Determine qualification status based strictly on whether they met the minimum experience
-        if job_min > 0:
-            qualification_status = "Qualified" if cand_exp >= job_min else "Disqualified"
-        else:
-            qualification_status = "Qualified"
-
-        return {
-            "candidate_name": candidate.full_name or "Unknown",
-            "job_title": job.title,
-            "candidate_experience_years": candidate.overall_experience_years or 0,
-            "min_required_experience": job.min_required_experience_years or 0,
-            "qualification_status": qualification_status,
-            "matched_required_skills": matched_required,
-            "missing_required_skills": missing_required,
-            "matched_preferred_skills": matched_preferred,
-            "embedding_similarity": round(embedding_sim, 4),
-            "match_scores": {
-                "required_skills_score": round(req_score, 2),
-                "preferred_skills_score": round(pref_score, 2),
-                "education_score": round(edu_score, 2),
-                "experience_score": round(exp_score, 2),
-                "location_score": round(loc_score, 2),
-                "final_match_percentage": final,
-            },
-        }
-
-    # ── SAVE MATCH ───────────────────────────────────────────
-    def _save_match(self, db, candidate: Candidate, job: Job, match_result: dict):
+        return matched_required, missing_required, matched_preferred
+
+    # ── SAVE MATCHES (set-based upsert) ─────────────────────
+    def _save_matches(self, db, match_results: list) -> None:
+        """
+        Persist match results with one INSERT ... ON CONFLICT (candidate_id, job_id) DO UPDATE
+        per batch, relying on the uq_matches_candidate_job constraint instead of a SELECT per row.
+        Each result must carry "candidate_id" and "job_id".
+        """
+        # A batch may not touch the same row twice; keep the last result per pair
+        rows = {}
+        for match_result in match_results:
+            rows[(match_result["candidate_id"], match_result["job_id"])] = self._match_row_values(match_result)
+        values = list(rows.values())
+
+        for start in range(0, len(values), MATCH_UPSERT_BATCH_SIZE):
+            stmt = pg_insert(Match).values(values[start:start + MATCH_UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_matches_candidate_job",
+                set_={column: stmt.excluded[column] for column in _MATCH_UPDATE_COLUMNS},
+            )
+            db.execute(stmt)
 
-        existing = (
-            db.query(Match)
-            .filter(Match.candidate_id == candidate.s3_candidate_id, Match.job_id == job.s3_job_id)
-            .first()
-        )
+    @staticmethod
+    def _match_row_values(match_result: dict) -> dict:
 
         scores = match_result["match_scores"]
 
-        if existing:
-
-            existing.required_skills_score = scores["required_skills_score"]
-            existing.preferred_skills_score = scores["preferred_skills_score"]
-            existing.education_score = scores["education_score"]
-            existing.experience_score = scores["experience_score"]
-            existing.location_score = scores["location_score"]
-            existing.final_match_percentage = scores["final_match_percentage"]
-
-            existing.matched_required_skills = match_result["matched_required_skills"]
-            existing.missing_required_skills = match_result["missing_required_skills"]
-            existing.matched_preferred_skills = match_result["matched_preferred_skills"]
-            
-            existing.qualification_status = match_result.get("qualification_status")
-
-        else:
-
-            match_row = Match(
+        return {
+            "candidate_id": match_result["candidate_id"],
+            "job_id": match_result["job_id"],
 
-                candidate_id=candidate.s3_candidate_id,
-                job_id=job.s3_job_id,
+            "candidate_name": match_result["candidate_name"],
+            "job_title": match_result["job_title"],
 
-                candidate_name=match_result["candidate_name"],
-                job_title=match_result["job_title"],
+            "required_skills_score": scores["required_skills_score"],
+            "preferred_skills_score": scores["preferred_skills_score"],
+            "education_score": scores["education_score"],
+            "experience_score": scores["experience_score"],
+            "location_score": scores["location_score"],
+            "final_match_percentage": scores["final_match_percentage"],
 
-                required_skills_score=scores["required_skills_score"],
-                preferred_skills_score=scores["preferred_skills_score"],
-                education_score=scores["education_score"],
-                experience_score=scores["experience_score"],
-                location_score=scores["location_score"],
-                final_match_percentage=scores["final_match_percentage"],
+            "matched_required_skills": match_result["matched_required_skills"],
+            "missing_required_skills": match_result["missing_required_skills"],
+            "matched_preferred_skills": match_result["matched_preferred_skills"],
 
-                matched_required_skills=match_result["matched_required_skills"],
-                missing_required_skills=match_result["missing_required_skills"],
-                matched_preferred_skills=match_result["matched_preferred_skills"],
-                
-                qualification_status=match_result.get("qualification_status"),
-            )
+            "qualification_status": match_result.get("qualification_status"),
+            "embedding_similarity": match_result.get("embedding_similarity"),
+            "input_fingerprint": match_result.get("input_fingerprint"),
 
-            db.add(match_row)
\ No newline at end of file
+            "created_at": datetime.now(timezone.utc),
+        }
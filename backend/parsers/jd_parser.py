@@ -1,10 +1,14 @@
+import asyncio
 import json
 import os
+import threading
+from typing import Optional
 
 from log import log_tool
 from prompts.job_description_prompt import JDPrompt
-from utils.gemini_client import GeminiClient
+from utils.gemini_client import AsyncGeminiClient, GeminiClient
 from utils.json_file_saver import JsonFileSaver
+from utils.parse_cache import ParseResultCache
 
 
 class JDParser:
@@ -12,12 +16,17 @@ class JDParser:
 
     def __init__(self):
         self.llm_client = GeminiClient()
+        self.async_llm_client = AsyncGeminiClient()
+        self.cache = ParseResultCache("jd", JDPrompt)
         self.output_dir = os.path.join(os.getcwd(), "jd_outputs")
 
     def parse(self, jd_text: str) -> dict:
         """
         Parses job description text into structured JSON.
 
+        Results are served from the parse cache when the same text was parsed
+        before with the current prompt, skipping the LLM call.
+
         Args:
             jd_text: The raw text of the JD.
 
@@ -29,10 +38,42 @@ class JDParser:
             return {}
 
         log_tool.log_info("Starting JD parsing...")
+        cached = self.cache.get(jd_text)
+        if cached:
+            return cached
+
         system_prompt = JDPrompt.SYSTEM_PROMPT
         user_prompt = JDPrompt.format_user_message(jd_text)
         llm_response = self.llm_client.generate_json(system_prompt, user_prompt)
+        result = self._handle_response(llm_response)
+        self._cache_result(jd_text, result)
+        return result
+
+    async def parse_async(self, jd_text: str) -> dict:
+        """Non-blocking `parse()` over the async Gemini client (same return contract)."""
+        if not jd_text:
+            log_tool.log_error("Empty JD text provided.")
+            return {}
+
+        log_tool.log_info("Starting JD parsing...")
+        cached = await asyncio.to_thread(self.cache.get, jd_text)
+        if cached:
+            return cached
 
+        system_prompt = JDPrompt.SYSTEM_PROMPT
+        user_prompt = JDPrompt.format_user_message(jd_text)
+        llm_response = await self.async_llm_client.generate_json(system_prompt, user_prompt)
+        result = self._handle_response(llm_response)
+        await asyncio.to_thread(self._cache_result, jd_text, result)
+        return result
+
+    def _cache_result(self, text: str, result: dict) -> None:
+        # Never cache failures or LLM-reported errors
+        if result and "error" not in result:
+            self.cache.put(text, result)
+
+    def _handle_response(self, llm_response) -> dict:
+        """Normalize the LLM response into the parsed dict and save it to disk."""
         parsed_jd = {}
         if isinstance(llm_response, dict):
             parsed_jd = llm_response
@@ -49,3 +90,17 @@ class JDParser:
             return parsed_jd
         log_tool.log_error("JD parsing failed or returned empty data.")
         return {}
+
+
+_parser: Optional[JDParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_jd_parser() -> JDParser:
+    """Process-wide JDParser, created on first use."""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = JDParser()
+    return _parser
@@ -1,10 +1,24 @@
+import asyncio
 import json
 import os
+import threading
+from typing import Optional
 
 from log import log_tool
 from prompts.resume_prompt import ResumePrompt
-from utils.gemini_client import GeminiClient
+from utils.gemini_client import AsyncGeminiClient, GeminiClient
 from utils.json_file_saver import JsonFileSaver
+from utils.parse_cache import ParseResultCache
+from utils.resume_preprocessor import merge_contact_fields, prepare_resume_text
+
+# Batched parsing: input-token budget per request (prompt + resumes, ~4 chars/token)
+# and a cap on resumes per request to keep the structured output bounded
+RESUME_BATCH_TOKEN_BUDGET = int(os.getenv("RESUME_BATCH_TOKEN_BUDGET", "30000"))
+RESUME_BATCH_MAX_DOCS = int(os.getenv("RESUME_BATCH_MAX_DOCS", "5"))
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
 
 
 class ResumeParser:
@@ -12,12 +26,22 @@ class ResumeParser:
 
     def __init__(self):
         self.llm_client = GeminiClient()
+        self.async_llm_client = AsyncGeminiClient()
+        self.cache = ParseResultCache("resume", ResumePrompt)
+        # Batch-prompt output is cached under its own prompt version: single
+        # parses never see it, batch parses read both
+        self.batch_cache = ParseResultCache("resume", ResumePrompt, batch=True)
         self.output_dir = os.path.join(os.getcwd(), "resume_outputs")
 
     def parse(self, resume_text: str) -> dict:
         """
         Parses resume text into structured JSON.
 
+        The text is compacted first (utils/resume_preprocessor.py); email and
+        phone found by regex fill the fields the LLM left empty. Results are served
+        from the parse cache when the same text was parsed before with the
+        current prompt, skipping the LLM call.
+
         Args:
             resume_text: The raw text of the resume.
 
@@ -29,10 +53,154 @@ class ResumeParser:
             return {}
 
         log_tool.log_info("Starting resume parsing...")
+        prepared = prepare_resume_text(resume_text)
+        cached = self.cache.get(prepared.text)
+        if cached:
+            return merge_contact_fields(cached, prepared.contacts)
+
         system_prompt = ResumePrompt.SYSTEM_PROMPT
-        user_prompt = ResumePrompt.format_user_message(resume_text)
+        user_prompt = ResumePrompt.format_user_message(prepared.text)
         llm_response = self.llm_client.generate_json(system_prompt, user_prompt)
+        result = self._handle_response(llm_response)
+        self._cache_result(prepared.text, result)
+        return merge_contact_fields(result, prepared.contacts)
+
+    async def parse_async(self, resume_text: str) -> dict:
+        """Non-blocking `parse()` over the async Gemini client (same return contract)."""
+        if not resume_text:
+            log_tool.log_error("Empty resume text provided.")
+            return {}
+
+        log_tool.log_info("Starting resume parsing...")
+        prepared = prepare_resume_text(resume_text)
+        cached = await asyncio.to_thread(self.cache.get, prepared.text)
+        if cached:
+            return merge_contact_fields(cached, prepared.contacts)
+        return merge_contact_fields(await self._llm_parse_async(prepared.text), prepared.contacts)
+
+    async def _llm_parse_async(self, resume_text: str) -> dict:
+        # resume_text is already compacted by prepare_resume_text
+        system_prompt = ResumePrompt.SYSTEM_PROMPT
+        user_prompt = ResumePrompt.format_user_message(resume_text)
+        llm_response = await self.async_llm_client.generate_json(system_prompt, user_prompt)
+        result = self._handle_response(llm_response)
+        await asyncio.to_thread(self._cache_result, resume_text, result)
+        return result
+
+    async def parse_batch_async(self, documents: dict, concurrency: int = 1) -> dict:
+        """
+        Parses several resumes with as few LLM requests as possible.
+
+        Resumes are compacted and their contact fields merged as in `parse()`.
+        Cache hits are served first; the remaining resumes are packed into
+        multi-document requests sized by RESUME_BATCH_TOKEN_BUDGET and
+        RESUME_BATCH_MAX_DOCS, whose response is keyed by candidate_id. Any
+        entry missing or invalid in a batch response is re-parsed on its own.
+
+        Args:
+            documents: {candidate_id: resume_text}
+            concurrency: Batch requests allowed in flight at once.
+
+        Returns:
+            {candidate_id: parsed resume dict}; empty dict for a failed entry.
+        """
+        results: dict = {}
+        pending: dict = {}
+        contacts: dict = {}
+        for candidate_id, text in documents.items():
+            if not text:
+                log_tool.log_error("Empty resume text provided for candidate %s." % candidate_id)
+                results[candidate_id] = {}
+                continue
+            prepared = prepare_resume_text(text)
+            contacts[candidate_id] = prepared.contacts
+            cached = await asyncio.to_thread(self.cache.get, prepared.text)
+            if not cached:
+                cached = await asyncio.to_thread(self.batch_cache.get, prepared.text)
+            if cached:
+                results[candidate_id] = cached
+            else:
+                pending[candidate_id] = prepared.text
+
+        batches = self._plan_batches(pending)
+        if batches:
+            log_tool.log_info(
+                "Batched resume parsing: %d resume(s) in %d request(s), %d from cache"
+                % (len(pending), len(batches), len(results))
+            )
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def _run(batch: dict) -> dict:
+            async with semaphore:
+                return await self._parse_batch(batch)
+
+        for parsed in await asyncio.gather(*(_run(batch) for batch in batches)):
+            results.update(parsed)
+        for candidate_id, fields in contacts.items():
+            merge_contact_fields(results.get(candidate_id), fields)
+        return results
+
+    @staticmethod
+    def _plan_batches(documents: dict) -> list:
+        """Greedily pack documents into batches that fit the token budget (a lone oversized one goes alone)."""
+        prompt_tokens = _estimate_tokens(ResumePrompt.SYSTEM_PROMPT + ResumePrompt.BATCH_SYSTEM_SUFFIX)
+        batches: list = []
+        current: dict = {}
+        current_tokens = prompt_tokens
+        for candidate_id, text in documents.items():
+            tokens = _estimate_tokens(text)
+            if current and (
+                current_tokens + tokens > RESUME_BATCH_TOKEN_BUDGET or len(current) >= RESUME_BATCH_MAX_DOCS
+            ):
+                batches.append(current)
+                current, current_tokens = {}, prompt_tokens
+            current[candidate_id] = text
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
 
+    async def _parse_batch(self, batch: dict) -> dict:
+        if len(batch) == 1:
+            (candidate_id, text), = batch.items()
+            return {candidate_id: await self._llm_parse_async(text)}
+
+        system_prompt = ResumePrompt.SYSTEM_PROMPT + ResumePrompt.BATCH_SYSTEM_SUFFIX
+        user_prompt = ResumePrompt.format_batch_user_message(batch)
+        llm_response = await self.async_llm_client.generate_json(system_prompt, user_prompt)
+        if not isinstance(llm_response, dict):
+            llm_response = {}
+
+        results = {}
+        for candidate_id, text in batch.items():
+            entry = llm_response.get(candidate_id)
+            if self._is_valid_result(entry):
+                result = self._handle_response(entry)
+                await asyncio.to_thread(self._cache_result, text, result, self.batch_cache)
+                results[candidate_id] = result
+            else:
+                log_tool.log_warning(
+                    "Batch parse returned no valid entry for candidate %s; parsing it individually." % candidate_id
+                )
+                results[candidate_id] = await self._llm_parse_async(text)
+        return results
+
+    @staticmethod
+    def _is_valid_result(entry) -> bool:
+        """A usable single-resume result: {"candidate": {...}} with at least a name or an email."""
+        if not isinstance(entry, dict) or "error" in entry:
+            return False
+        candidate = entry.get("candidate")
+        return isinstance(candidate, dict) and bool(candidate.get("email") or candidate.get("full_name"))
+
+    def _cache_result(self, text: str, result: dict, cache: ParseResultCache = None) -> None:
+        # Never cache failures or LLM-reported errors
+        if result and "error" not in result:
+            (cache or self.cache).put(text, result)
+
+    def _handle_response(self, llm_response) -> dict:
+        """Normalize the LLM response into the parsed dict and save it to disk."""
         parsed_resume = {}
         if isinstance(llm_response, dict):
             parsed_resume = llm_response
@@ -55,3 +223,17 @@ class ResumeParser:
             return parsed_resume
         log_tool.log_error("Resume parsing failed or returned empty data.")
         return {}
+
+
+_parser: Optional[ResumeParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    """Process-wide ResumeParser, created on first use."""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = ResumeParser()
+    return _parser
@@ -110,4 +110,31 @@ class ResumePrompt:
 
     @staticmethod
     def format_user_message(user_text: str) -> str:
-        return f"Extract structured candidate data from the following resume text:\n\n{user_text}"
\ No newline at end of file
+        return f"Extract structured candidate data from the following resume text:\n\n{user_text}"
+
+    BATCH_SYSTEM_SUFFIX = """
+    BATCH MODE:
+
+    The user message contains several resumes, each wrapped in
+    <resume candidate_id="..."> ... </resume> tags.
+
+    Parse every resume independently using all of the rules above.
+    Return ONE JSON object whose keys are the candidate_id values exactly as given,
+    and whose values are the JSON OUTPUT FORMAT above for that resume:
+
+    {
+      "<candidate_id>": { "candidate": { ... } },
+      "<candidate_id>": { "candidate": { ... } }
+    }
+
+    Never merge, skip or mix data between resumes. Return ONLY valid JSON.
+    """
+
+    @staticmethod
+    def format_batch_user_message(documents: dict) -> str:
+        """documents: {candidate_id: resume_text}"""
+        blocks = "\n\n".join(
+            f'<resume candidate_id="{candidate_id}">\n{text}\n</resume>'
+            for candidate_id, text in documents.items()
+        )
+        return f"Extract structured candidate data from each of the following {len(documents)} resumes:\n\n{blocks}"
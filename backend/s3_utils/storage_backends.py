@@ -0,0 +1,344 @@
+"""
+storage_backends.py — Object storage behind TenantStorageService.
+
+Backends (selected by STORAGE_BACKEND):
+  s3      Amazon S3 (default); needs S3_BUCKET_NAME and AWS_REGION_NAME
+  local   files under STORAGE_LOCAL_ROOT; writes are atomic (temp file + rename)
+  memory  process-local dict; for tests, benchmarks and offline load runs
+
+All backends take the same keys (companies/{company_id}/...). Presigned
+(direct-to-storage) uploads exist only on S3; other backends report
+supports_presigned_uploads = False.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+from log import log_tool
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3").lower()
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", os.path.join(os.getcwd(), "storage"))
+
+# Shared S3 client: HTTP connection pool size (keep >= S3_UPLOAD_CONCURRENCY plus
+# request-path traffic) and attempts per call, first try included, under adaptive
+# (client-side rate limited) retries
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "5"))
+
+
+_s3_clients: dict = {}
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client(region_name: str):
+    """Process-wide boto3 S3 client per region (boto3 clients are thread-safe)."""
+    if region_name not in _s3_clients:
+        with _s3_client_lock:
+            if region_name not in _s3_clients:
+                import boto3
+                from botocore.config import Config
+
+                _s3_clients[region_name] = boto3.client(
+                    "s3",
+                    region_name=region_name,
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"total_max_attempts": S3_MAX_ATTEMPTS, "mode": "adaptive"},
+                    ),
+                )
+    return _s3_clients[region_name]
+
+
+class StorageObjectNotFound(KeyError):
+    """The requested key does not exist."""
+
+
+class StorageBackend:
+    """Key/value object storage; keys are "/"-separated, a trailing "/" marks a folder placeholder."""
+
+    name = "base"
+    supports_presigned_uploads = False
+
+    def put_object(self, key: str, body: bytes, content_type: Optional[str] = None, metadata: Optional[dict] = None) -> None:
+        raise NotImplementedError
+
+    def get_object(self, key: str) -> tuple[bytes, dict]:
+        """(bytes, user metadata); raises StorageObjectNotFound."""
+        raise NotImplementedError
+
+    def delete_object(self, key: str) -> None:
+        """No error if the key does not exist."""
+        raise NotImplementedError
+
+    def delete_objects(self, keys: list[str]) -> int:
+        for key in keys:
+            self.delete_object(key)
+        return len(keys)
+
+    def list_objects(self, prefix: str = "") -> Iterator[tuple[str, int]]:
+        """(key, size) of every object under prefix."""
+        raise NotImplementedError
+
+    def object_url(self, key: str) -> str:
+        raise NotImplementedError
+
+    # Presigned uploads (S3 only)
+
+    def _no_presigned(self):
+        raise NotImplementedError("%s storage does not support presigned uploads" % self.name)
+
+    def presigned_put_url(self, key: str, content_type: str, metadata: dict, expires_in: int) -> str:
+        self._no_presigned()
+
+    def start_multipart_upload(self, key: str, content_type: str, metadata: dict) -> str:
+        self._no_presigned()
+
+    def presigned_part_url(self, key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        self._no_presigned()
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list[dict]) -> None:
+        self._no_presigned()
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self._no_presigned()
+
+
+class S3StorageBackend(StorageBackend):
+    name = "s3"
+    supports_presigned_uploads = True
+
+    def __init__(self, bucket_name: Optional[str] = None, region_name: Optional[str] = None):
+        self.bucket_name = bucket_name or os.getenv("S3_BUCKET_NAME")
+        self.region_name = region_name or os.getenv("AWS_REGION_NAME")
+
+        if not self.bucket_name:
+            raise ValueError("S3_BUCKET_NAME not set in environment")
+
+        if not self.region_name:
+            raise ValueError("AWS_REGION_NAME not set in environment")
+
+        self.client = get_s3_client(self.region_name)
+
+    def put_object(self, key, body, content_type=None, metadata=None):
+        params = {"Bucket": self.bucket_name, "Key": key, "Body": body}
+        if content_type:
+            params["ContentType"] = content_type
+        if metadata:
+            params["Metadata"] = metadata
+        self.client.put_object(**params)
+
+    def get_object(self, key):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            raise StorageObjectNotFound(key)
+        return obj["Body"].read(), obj.get("Metadata") or {}
+
+    def delete_object(self, key):
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def delete_objects(self, keys):
+        deleted = 0
+        # DeleteObjects takes at most 1000 keys
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                log_tool.log_error("Could not delete %s: %s" % (error.get("Key"), error.get("Message")))
+            deleted += len(chunk) - len(response.get("Errors", []))
+        return deleted
+
+    def list_objects(self, prefix=""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"], obj["Size"]
+
+    def object_url(self, key):
+        # Standard AWS URL pattern (public-ish link)
+        return f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{key}"
+
+    def presigned_put_url(self, key, content_type, metadata, expires_in):
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket_name, "Key": key, "ContentType": content_type, "Metadata": metadata},
+            ExpiresIn=expires_in,
+        )
+
+    def start_multipart_upload(self, key, content_type, metadata):
+        return self.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key, ContentType=content_type, Metadata=metadata,
+        )["UploadId"]
+
+    def presigned_part_url(self, key, upload_id, part_number, expires_in):
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": self.bucket_name, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+            ExpiresIn=expires_in,
+        )
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                    for part in sorted(parts, key=lambda part: part["part_number"])
+                ]
+            },
+        )
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Objects as files under `root`. Content type and metadata live in a sidecar
+    under root/.meta/, so listings only ever show real objects.
+    """
+
+    name = "local"
+    _META_DIR = ".meta"
+
+    def __init__(self, root: str = STORAGE_LOCAL_ROOT):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, meta: bool = False) -> Path:
+        base = self.root / self._META_DIR if meta else self.root
+        path = (base / (key + ".json" if meta else key)).resolve()
+        # Keys are tenant-controlled paths; never let one escape the root
+        if path != self.root and self.root not in path.parents:
+            raise ValueError("Invalid storage key: %s" % key)
+        return path
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".%s." % path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def put_object(self, key, body, content_type=None, metadata=None):
+        if key.endswith("/"):
+            self._path(key).mkdir(parents=True, exist_ok=True)
+            return
+        self._atomic_write(self._path(key), body)
+        meta_path = self._path(key, meta=True)
+        if content_type or metadata:
+            sidecar = {"content_type": content_type, "metadata": metadata or {}}
+            self._atomic_write(meta_path, json.dumps(sidecar).encode("utf-8"))
+        elif meta_path.exists():
+            meta_path.unlink()
+
+    def get_object(self, key):
+        path = self._path(key)
+        if not path.is_file():
+            raise StorageObjectNotFound(key)
+        body = path.read_bytes()
+        meta_path = self._path(key, meta=True)
+        metadata = json.loads(meta_path.read_text("utf-8")).get("metadata", {}) if meta_path.exists() else {}
+        return body, metadata
+
+    def delete_object(self, key):
+        for path in (self._path(key), self._path(key, meta=True)):
+            if path.is_file():
+                path.unlink()
+
+    def list_objects(self, prefix=""):
+        # Walk only the deepest directory the prefix pins down
+        start = self.root / prefix.rsplit("/", 1)[0] if "/" in prefix else self.root
+        if not start.is_dir():
+            return
+        for dirpath, dirnames, filenames in os.walk(start):
+            if Path(dirpath) == self.root and self._META_DIR in dirnames:
+                dirnames.remove(self._META_DIR)
+            for filename in filenames:
+                if filename.endswith(".tmp") and filename.startswith("."):
+                    continue
+                path = Path(dirpath) / filename
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix):
+                    yield key, path.stat().st_size
+
+    def object_url(self, key):
+        return self._path(key).as_uri()
+
+
+class MemoryStorageBackend(StorageBackend):
+    name = "memory"
+
+    def __init__(self):
+        self._objects: dict[str, tuple[bytes, Optional[str], dict]] = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, key, body, content_type=None, metadata=None):
+        with self._lock:
+            self._objects[key] = (bytes(body), content_type, dict(metadata or {}))
+
+    def get_object(self, key):
+        with self._lock:
+            if key not in self._objects:
+                raise StorageObjectNotFound(key)
+            body, _, metadata = self._objects[key]
+        return body, dict(metadata)
+
+    def delete_object(self, key):
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def list_objects(self, prefix=""):
+        with self._lock:
+            items = [(key, len(body)) for key, (body, _, _) in self._objects.items() if key.startswith(prefix)]
+        yield from sorted(items)
+
+    def object_url(self, key):
+        return f"memory://{key}"
+
+
+_BACKENDS = {
+    "s3": S3StorageBackend,
+    "local": LocalStorageBackend,
+    "memory": MemoryStorageBackend,
+}
+
+
+_memory_backend: Optional[MemoryStorageBackend] = None
+_memory_lock = threading.Lock()
+
+
+def create_storage_backend(kind: str = STORAGE_BACKEND) -> StorageBackend:
+    """
+    Backend for STORAGE_BACKEND (s3 | local | memory). The memory store is one per
+    process, so every TenantStorageService sees the same objects.
+    """
+    global _memory_backend
+    kind = kind.lower()
+    if kind not in _BACKENDS:
+        raise ValueError("Unknown STORAGE_BACKEND '%s' (expected one of: %s)" % (kind, ", ".join(_BACKENDS)))
+    if kind == "memory":
+        with _memory_lock:
+            if _memory_backend is None:
+                _memory_backend = MemoryStorageBackend()
+            return _memory_backend
+    backend = _BACKENDS[kind]()
+    log_tool.log_info("Object storage backend: %s" % backend.name)
+    return backend
@@ -1,15 +1,38 @@
+import math
 import os
 import re
+import threading
 import uuid
-import boto3
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
 from log import log_tool
+from s3_utils.storage_backends import StorageBackend, create_storage_backend
 
 # Load Environment Variables
 
 load_dotenv()
 
+# Write empty "folder/" placeholder objects when creating workspaces. S3 has no
+# folders (the layout is implied by key prefixes), so this is off by default;
+# scripts/cleanup_s3_folder_placeholders.py removes placeholders written earlier.
+S3_FOLDER_PLACEHOLDERS = os.getenv("S3_FOLDER_PLACEHOLDERS", "false").lower() in ("1", "true", "yes")
+
+# Presigned upload sessions: URL lifetime, and the part size above which a file
+# is uploaded as S3 multipart (S3 minimum part size is 5 MiB, at most 10000 parts)
+S3_PRESIGNED_URL_TTL = int(os.getenv("S3_PRESIGNED_URL_TTL", "3600"))
+S3_MULTIPART_PART_SIZE = max(int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+_S3_MAX_PARTS = 10000
+
+# Parallel object writes in upload_many (bounded by S3_MAX_POOL_CONNECTIONS on the shared client)
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "16"))
+
+# companies/{company_id}/users/{user_id}/jds/{jd_id}/resumes/{candidate_id}_{filename}
+_RESUME_KEY = re.compile(
+    r"^companies/(?P<company_id>[^/]+)/users/(?P<user_id>[^/]+)/jds/(?P<jd_id>[^/]+)/resumes/"
+    r"(?P<candidate_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_(?P<filename>[^/]+)$"
+)
+
 # ID GENERATION UTILITIES
 
 def generate_slug(name: str) -> str:
@@ -39,22 +62,36 @@ class TenantStorageService:
         - User onboarding
         - JD workspace creation
         - Resume upload path generation
-    """
+        - Presigned (multipart) upload sessions for direct browser → S3 uploads
 
-    def __init__(self):
-        self.bucket_name = os.getenv("S3_BUCKET_NAME")
-        self.region_name = os.getenv("AWS_REGION_NAME")
+    Objects go through a storage backend (S3, local disk or in-memory; see
+    s3_utils/storage_backends.py), chosen by STORAGE_BACKEND unless one is passed in.
+    """
 
-        if not self.bucket_name:
-            raise ValueError("S3_BUCKET_NAME not set in environment")
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or create_storage_backend()
 
-        if not self.region_name:
-            raise ValueError("AWS_REGION_NAME not set in environment")
+    @property
+    def supports_presigned_uploads(self) -> bool:
+        return self.backend.supports_presigned_uploads
 
-        self.s3 = boto3.client("s3", region_name=self.region_name)
+    def object_url(self, s3_key: str) -> str:
+        """
+        Link to a stored object (S3 URL, file:// path, or memory:// key)
+        """
+        return self.backend.object_url(s3_key)
 
     # INTERNAL FOLDER CREATION
 
+    def _create_folders(self, folders: list[str]):
+        """
+        Placeholder objects for a workspace layout (no-op unless S3_FOLDER_PLACEHOLDERS)
+        """
+        if not S3_FOLDER_PLACEHOLDERS:
+            return
+        for folder in folders:
+            self._create_folder(folder)
+
     def _create_folder(self, folder_path: str):
         """
         Create folder in S3 (S3 is object-based)
@@ -63,12 +100,9 @@ class TenantStorageService:
             folder_path += "/"
 
         try:
-            self.s3.put_object(
-                Bucket=self.bucket_name,
-                Key=folder_path
-            )
+            self.backend.put_object(folder_path, b"")
             log_tool.log_info(f"Created folder: {folder_path}")
-        except ClientError as e:
+        except Exception as e:
             log_tool.log_error(f"Failed creating folder {folder_path}: {str(e)}")
             raise
 
@@ -77,8 +111,8 @@ class TenantStorageService:
     def onboard_company(self, company_name: str) -> str:
         """
         Creates:
-            companies/{company_slug-shortuuid}/
-            companies/{company_slug-shortuuid}/users/
+            companies/{company_slug-shortuuid}/metadata.json
+            (+ companies/{company_slug-shortuuid}/ and users/ placeholders if S3_FOLDER_PLACEHOLDERS)
         """
 
         slug = generate_slug(company_name)
@@ -94,15 +128,13 @@ class TenantStorageService:
             f"{base_path}users/"
         ]
 
-        for folder in folders:
-            self._create_folder(folder)
+        self._create_folders(folders)
 
         # Store metadata
-        self.s3.put_object(
-            Bucket=self.bucket_name,
-            Key=f"{base_path}metadata.json",
-            Body=f'{{"company_name": "{company_name}"}}',
-            ContentType="application/json"
+        self.backend.put_object(
+            f"{base_path}metadata.json",
+            f'{{"company_name": "{company_name}"}}'.encode("utf-8"),
+            content_type="application/json",
         )
 
         log_tool.log_info(f"Company onboarded successfully: {company_id}")
@@ -112,9 +144,9 @@ class TenantStorageService:
 
     def onboard_user(self, company_id: str, email: str, name: str, phone_number: str, role: str) -> str:
         """
-        Creates:
-            companies/{company_id}/users/{role-shortuuid}/
+        Allocates the user id; its prefix
             companies/{company_id}/users/{role-shortuuid}/jds/
+        exists once the first JD is written (placeholders only if S3_FOLDER_PLACEHOLDERS)
         """
 
         short_id = generate_short_uuid()
@@ -132,8 +164,7 @@ class TenantStorageService:
             f"{base_path}jds/"
         ]
 
-        for folder in folders:
-            self._create_folder(folder)
+        self._create_folders(folders)
 
         log_tool.log_info(f"User onboarded successfully: {user_id}")
         return user_id
@@ -142,8 +173,9 @@ class TenantStorageService:
 
     def create_jd_workspace(self, company_id: str, user_id: str, role: str) -> str:
         """
-        Creates JD folder structure with readable name: jds/{role_slug}-{short_id}/
-        That folder contains: resumes/, parsed/, embeddings/ and JD metadata.
+        Creates JD workspace with readable name: jds/{role_slug}-{short_id}/
+        Only its metadata.json is written; resumes/, parsed/ and embeddings/ are key
+        prefixes under it (empty placeholders are written only if S3_FOLDER_PLACEHOLDERS).
         role: Job role/title for this JD (e.g. "Backend Engineer") — used in folder name for readability.
         """
         role_slug = generate_slug(role)
@@ -161,15 +193,13 @@ class TenantStorageService:
             f"{base_path}embeddings/"
         ]
 
-        for folder in folders:
-            self._create_folder(folder)
+        self._create_folders(folders)
 
         # JD metadata in this folder (job description can be uploaded here later)
-        self.s3.put_object(
-            Bucket=self.bucket_name,
-            Key=f"{base_path}metadata.json",
-            Body=f'{{"role": "{role}", "jd_id": "{jd_id}"}}',
-            ContentType="application/json"
+        self.backend.put_object(
+            f"{base_path}metadata.json",
+            f'{{"role": "{role}", "jd_id": "{jd_id}"}}'.encode("utf-8"),
+            content_type="application/json",
         )
 
         log_tool.log_info(f"JD workspace created: {jd_id}")
@@ -200,6 +230,22 @@ class TenantStorageService:
 
         return candidate_id, s3_key
 
+    @staticmethod
+    def parse_resume_key(s3_key: str) -> Optional[dict]:
+        """
+        Inverse of generate_resume_upload_path: {company_id, user_id, jd_id,
+        candidate_id, filename}, or None if the key is not a resume upload path.
+        """
+        match = _RESUME_KEY.match(s3_key)
+        return match.groupdict() if match else None
+
+    @staticmethod
+    def generate_jd_upload_path(company_id: str, user_id: str, jd_id: str, original_filename: str) -> str:
+        return (
+            f"companies/{company_id}/users/{user_id}/jds/{jd_id}/"
+            f"jd_{original_filename.replace(' ', '_')}"
+        )
+
     # FILE UPLOAD
 
     def upload_file(self, file_bytes: bytes, s3_key: str, content_type: str):
@@ -208,17 +254,141 @@ class TenantStorageService:
         """
 
         try:
-            self.s3.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_bytes,
-                ContentType=content_type
-            )
+            self.backend.put_object(s3_key, file_bytes, content_type=content_type)
             log_tool.log_info(f"Uploaded file to {s3_key}")
-        except ClientError as e:
+        except Exception as e:
             log_tool.log_error(f"Upload failed: {str(e)}")
             raise
 
+    def upload_many(self, files: list[tuple[bytes, str, str]], max_workers: int = S3_UPLOAD_CONCURRENCY) -> list:
+        """
+        Upload (file_bytes, s3_key, content_type) items in parallel on a thread pool.
+        Returns one entry per item, in order: None on success, the exception on failure.
+        """
+
+        def _upload(item) -> Optional[Exception]:
+            try:
+                self.upload_file(*item)
+                return None
+            except Exception as e:
+                return e
+
+        if not files:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as pool:
+            return list(pool.map(_upload, files))
+
+    def read_file(self, s3_key: str) -> tuple[bytes, dict]:
+        """
+        Download an object; returns (bytes, user metadata without the x-amz-meta- prefix)
+        """
+
+        try:
+            return self.backend.get_object(s3_key)
+        except Exception as e:
+            log_tool.log_error(f"Download failed for {s3_key}: {str(e)}")
+            raise
+
+    def delete_file(self, s3_key: str):
+        """
+        Delete an object (no error if it does not exist)
+        """
+
+        try:
+            self.backend.delete_object(s3_key)
+            log_tool.log_info(f"Deleted {s3_key}")
+        except Exception as e:
+            log_tool.log_error(f"Delete failed for {s3_key}: {str(e)}")
+            raise
+
+    # PRESIGNED UPLOAD SESSIONS
+
+    def create_upload_session(
+        self,
+        s3_key: str,
+        content_type: str,
+        size: Optional[int] = None,
+        metadata: Optional[dict] = None,
+        expires_in: int = S3_PRESIGNED_URL_TTL,
+    ) -> dict:
+        """
+        Presigned URLs for the client to upload `s3_key` straight to S3
+        (S3 backend only; check supports_presigned_uploads).
+
+        Files up to S3_MULTIPART_PART_SIZE (or of unknown size) get one presigned PUT;
+        the client must send the returned `headers` with it. Larger files get a
+        multipart upload with one presigned URL per part, finished with
+        complete_upload_session(s3_key, upload_id, parts).
+        """
+
+        metadata = metadata or {}
+        try:
+            if not size or size <= S3_MULTIPART_PART_SIZE:
+                url = self.backend.presigned_put_url(s3_key, content_type, metadata, expires_in)
+                headers = {"Content-Type": content_type}
+                headers.update({f"x-amz-meta-{k}": v for k, v in metadata.items()})
+                return {"s3_key": s3_key, "method": "PUT", "url": url, "headers": headers, "parts": []}
+
+            part_size = max(S3_MULTIPART_PART_SIZE, math.ceil(size / _S3_MAX_PARTS))
+            upload_id = self.backend.start_multipart_upload(s3_key, content_type, metadata)
+            parts = [
+                {
+                    "part_number": number,
+                    "url": self.backend.presigned_part_url(s3_key, upload_id, number, expires_in),
+                }
+                for number in range(1, math.ceil(size / part_size) + 1)
+            ]
+            log_tool.log_info(f"Started multipart upload for {s3_key} ({len(parts)} parts)")
+            return {
+                "s3_key": s3_key,
+                "method": "PUT",
+                "upload_id": upload_id,
+                "part_size": part_size,
+                "headers": {},
+                "parts": parts,
+            }
+        except Exception as e:
+            log_tool.log_error(f"Upload session failed for {s3_key}: {str(e)}")
+            raise
+
+    def complete_upload_session(self, s3_key: str, upload_id: str, parts: list[dict]):
+        """
+        Finish a multipart upload; parts: [{"part_number": int, "etag": str}] (ETag from each part PUT)
+        """
+
+        try:
+            self.backend.complete_multipart_upload(s3_key, upload_id, parts)
+            log_tool.log_info(f"Completed multipart upload for {s3_key}")
+        except Exception as e:
+            log_tool.log_error(f"Completing multipart upload failed for {s3_key}: {str(e)}")
+            raise
+
+    def abort_upload_session(self, s3_key: str, upload_id: str):
+        """
+        Abort a multipart upload and free its stored parts
+        """
+
+        try:
+            self.backend.abort_multipart_upload(s3_key, upload_id)
+            log_tool.log_info(f"Aborted multipart upload for {s3_key}")
+        except Exception as e:
+            log_tool.log_error(f"Aborting multipart upload failed for {s3_key}: {str(e)}")
+            raise
+
+
+_storage_service: Optional[TenantStorageService] = None
+_storage_service_lock = threading.Lock()
+
+
+def get_storage_service() -> TenantStorageService:
+    """Process-wide TenantStorageService (one backend / S3 client for every router and worker)."""
+    global _storage_service
+    if _storage_service is None:
+        with _storage_service_lock:
+            if _storage_service is None:
+                _storage_service = TenantStorageService()
+    return _storage_service
+
 
 # LOCAL TEST RUNNER
 
@@ -259,4 +429,4 @@ class TenantStorageService:
 #     log_tool.log_info(f"Candidate ID: {candidate_id}")
 #     log_tool.log_info(f"Resume Path: {s3_key}")
 
-#     log_tool.log_info("\n✅ Test Completed Successfully")
\ No newline at end of file
+#     log_tool.log_info("\n✅ Test Completed Successfully")
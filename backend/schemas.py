@@ -162,6 +162,7 @@ class RankedMatchesResponse(BaseModel):
     job_title: Optional[str] = None
     company_name: Optional[str] = None
     total_candidates: int
+    next_cursor: Optional[str] = None            # Pass back as ?cursor= for the next page
     candidates: List[IndividualRankedMatch]
 
 
@@ -265,18 +266,87 @@ class CompanyOnboardResponse(BaseModel):
 
 class ResumeUploadResult(BaseModel):
     filename: str
-    status: str  # "success" | "failed"
+    status: str  # "success" | "duplicate" | "failed"
     candidate_id: Optional[str] = None
     s3_key: Optional[str] = None
+    # Earlier upload of the same resume whose work was reused ("duplicate" only)
+    duplicate_of: Optional[str] = None
     error: Optional[str] = None
 
 
 class ResumeUploadResponse(BaseModel):
+    batch_id: Optional[str] = None  # poll /batches/{batch_id} or stream /batches/{batch_id}/events
     uploaded: int
     failed: int
     results: List[ResumeUploadResult]
 
 
+# ── UPLOAD SESSION SCHEMAS (presigned direct-to-S3 uploads) ─────────────────
+
+class UploadSessionFile(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None  # bytes; files above S3_MULTIPART_PART_SIZE get a multipart session
+
+
+class UploadPartUrl(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadSession(BaseModel):
+    filename: str
+    s3_key: str
+    candidate_id: Optional[str] = None
+    method: str = "PUT"
+    url: Optional[str] = None                  # single PUT upload
+    headers: Dict[str, str] = {}               # must be sent with the single PUT
+    upload_id: Optional[str] = None            # multipart upload
+    part_size: Optional[int] = None
+    parts: List[UploadPartUrl] = []
+
+
+class ResumeUploadSessionRequest(BaseModel):
+    files: List[UploadSessionFile]
+
+
+class ResumeUploadSessionResponse(BaseModel):
+    batch_id: str
+    expires_in: int
+    sessions: List[UploadSession]
+
+
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class CompletedUpload(BaseModel):
+    s3_key: str
+    upload_id: Optional[str] = None   # multipart uploads only
+    parts: List[CompletedPart] = []
+
+
+class ResumeUploadCompleteRequest(BaseModel):
+    uploads: List[CompletedUpload]
+
+
+class JDUploadSessionRequest(UploadSessionFile):
+    role: str
+    client_company: Optional[str] = None
+
+
+class JDUploadSessionResponse(BaseModel):
+    jd_id: str
+    expires_in: int
+    session: UploadSession
+
+
+class JDUploadCompleteRequest(BaseModel):
+    upload: CompletedUpload
+    client_company: Optional[str] = None
+
+
 class ProcessResumeRequest(BaseModel):
     candidate_id: str
     s3_key: str
@@ -285,6 +355,32 @@ class BulkProcessResumeRequest(BaseModel):
     candidates: List[ProcessResumeRequest]
 
 
+# ── INGESTION BATCH SCHEMAS ──────────────────────────────────────────────────
+
+class StageTiming(BaseModel):
+    at: str                      # ISO timestamp the stage completed
+    ms: Optional[float] = None   # time spent producing the stage
+
+
+class BatchCandidateStatus(BaseModel):
+    candidate_id: str
+    stored_candidate_id: Optional[str] = None
+    filename: Optional[str] = None
+    status: str                  # extracted | parsed | persisted | embedded | matched | failed
+    attempts: int = 0
+    error: Optional[str] = None
+    stage_timings: Dict[str, StageTiming] = {}
+
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    total: int
+    completed: int               # matched + failed
+    done: bool
+    counts: Dict[str, int]       # candidates per status
+    candidates: List[BatchCandidateStatus]
+
+
 # ── RETELL POST-CALL ANALYSIS CONFIG ─────────────────────────────────────────
 
 RETELL_POST_CALL_ANALYSIS_CONFIG = [
@@ -0,0 +1,86 @@
+"""
+Guard API cold-start cost: import `main` in a fresh interpreter under
+`python -X importtime` and fail (exit 1) if
+
+  - a heavy dependency that should only load on first use is imported
+    (google-genai, qdrant-client, boto3, the Retell SDK, sentence-transformers/torch), or
+  - the cumulative import time of the module exceeds --budget-ms.
+
+The forbidden-module check is deterministic; the time budget is machine
+dependent, so pick one with headroom for CI hardware.
+
+Usage (from backend/):
+    python -m scripts.check_import_time [--module main] [--budget-ms 1800] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN = (
+    "google.genai",
+    "qdrant_client",
+    "boto3",
+    "retell",
+    "sentence_transformers",
+    "torch",
+)
+
+
+def profile_imports(module: str) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("Importing '%s' failed" % module)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument("--budget-ms", type=float, default=1800.0, help="max cumulative import time")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to print")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total_ms = next((cumulative for name, _, cumulative in rows if name == args.module), 0) / 1000
+    print("import %s: %.0f ms (budget %.0f ms)" % (args.module, total_ms, args.budget_ms))
+    print("slowest (self time):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print("  %8.1f ms  %8.1f ms cumulative  %s" % (self_us / 1000, cumulative_us / 1000, name))
+
+    failures = []
+    loaded = {name for name, _, _ in rows}
+    for dependency in FORBIDDEN:
+        if dependency in loaded:
+            failures.append("'%s' is imported eagerly; import it where it is first used" % dependency)
+    if total_ms > args.budget_ms:
+        failures.append("import time %.0f ms exceeds the %.0f ms budget" % (total_ms, args.budget_ms))
+
+    for failure in failures:
+        print("FAIL: %s" % failure)
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Regression checks for utils/resume_preprocessor.py: what the pre-pass must keep
+in the text sent to the LLM and which contact fields it must extract. Exits 1
+on the first failing case.
+
+Usage (from backend/):
+    python -m scripts.check_resume_preprocessor
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.resume_preprocessor import extract_contact_fields, strip_boilerplate  # noqa: E402
+
+
+def check(name: str, condition: bool) -> None:
+    print("%-4s %s" % ("ok" if condition else "FAIL", name))
+    if not condition:
+        sys.exit(1)
+
+
+def main() -> None:
+    # Phone on a line of its own, employment years split over lines
+    resume = "John Doe\n9876543210\njohn@x.com\nExperience\nAcme Corp\n2018\n-\n2020\nEngineer"
+    stripped = strip_boilerplate(resume)
+    contacts = extract_contact_fields(resume)
+    check("unlabelled phone line is kept in the LLM text", "9876543210" in stripped)
+    check("employment years are kept in the LLM text", "2018" in stripped and "2020" in stripped)
+    check("unlabelled phone line is extracted", contacts.phones == ["9876543210"])
+    check("email is extracted", contacts.emails == ["john@x.com"])
+
+    # Digit runs that are not phones
+    contacts = extract_contact_fields("Roll No 20181234567 issued\nEmployee ID 123456789012 (active)\n2018 - 2020 2021 2022")
+    check("IDs and year ranges are not phones", contacts.phones == [])
+
+    # One number with and without its country code
+    contacts = extract_contact_fields("+91 98765 43210\nMobile: 9876543210")
+    check("country-code variants collapse to one phone", contacts.phones == ["+91 98765 43210"])
+
+    # Headers/footers repeat at page edges; a location repeated in the body is content
+    body = ["Role %d" % i for i in range(8)]
+    page = "Jane Doe - Resume\n%s\nRemote\n%s\nRemote\n%s\nConfidential\nPage %%d of 3" % (
+        "\n".join(body[:3]), "\n".join(body[3:6]), "\n".join(body[6:])
+    )
+    stripped = strip_boilerplate("\f".join(page % number for number in (1, 2, 3)))
+    check("repeated page header and footer are dropped", "Jane Doe - Resume" not in stripped and "Confidential" not in stripped)
+    check("page markers are dropped", "Page 2 of 3" not in stripped)
+    check("a line repeated in the page body is kept", stripped.count("Remote") == 6)
+    check("a single page keeps its repeated lines", strip_boilerplate("Remote\nA\nRemote\nB\nRemote").count("Remote") == 3)
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
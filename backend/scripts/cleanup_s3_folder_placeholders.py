@@ -0,0 +1,49 @@
+"""
+Delete empty "folder/" placeholder objects that TenantStorageService wrote
+before S3_FOLDER_PLACEHOLDERS was turned off. Only zero-byte keys ending in "/"
+are touched; real objects are never deleted.
+
+Usage (from backend/, dry run unless --apply):
+    python -m scripts.cleanup_s3_folder_placeholders [--prefix companies/] [--apply]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log import log_tool  # noqa: E402
+from s3_utils.tenant_onboarder import TenantStorageService, get_storage_service  # noqa: E402
+
+
+def find_placeholders(storage: TenantStorageService, prefix: str):
+    for key, size in storage.backend.list_objects(prefix):
+        if key.endswith("/") and size == 0:
+            yield key
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prefix", default="companies/", help="only scan keys under this prefix")
+    parser.add_argument("--apply", action="store_true", help="delete (default is a dry run that only lists)")
+    args = parser.parse_args()
+
+    storage = get_storage_service()
+    # Listed in full before deleting, so pagination never skips keys
+    placeholders = list(find_placeholders(storage, args.prefix))
+    found, deleted = len(placeholders), 0
+    if args.apply and placeholders:
+        deleted = storage.backend.delete_objects(placeholders)
+    elif not args.apply:
+        for key in placeholders:
+            print(key)
+
+    if args.apply:
+        log_tool.log_info("Deleted %d of %d placeholder object(s) under %s" % (deleted, found, args.prefix))
+    else:
+        log_tool.log_info("Dry run: %d placeholder object(s) under %s (re-run with --apply to delete)" % (found, args.prefix))
+
+
+if __name__ == "__main__":
+    main()
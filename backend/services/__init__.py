@@ -1,17 +1,26 @@
-from services.parse_resume_service import ParseResumeService
-from services.parse_jd_service import ParseJDService
-from services.matching_service import MatchingService
-from services.embedding_service import (
-    upsert_candidate_vector,
-    upsert_job_vector,
-    get_category_similarities,
-)
+# Exports resolve on first access, so importing any services.* module does not
+# load every service (and google-genai / qdrant-client with them).
+import importlib
 
-__all__ = [
-    "ParseResumeService",
-    "ParseJDService",
-    "MatchingService",
-    "upsert_candidate_vector",
-    "upsert_job_vector",
-    "get_category_similarities",
-]
+_EXPORTS = {
+    "ParseResumeService": "services.parse_resume_service",
+    "ParseJDService": "services.parse_jd_service",
+    "MatchingService": "services.matching_service",
+    "upsert_candidate_vector": "services.embedding_service",
+    "upsert_job_vector": "services.embedding_service",
+    "get_category_similarities": "services.embedding_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,92 @@
+"""
+Ingestion batch progress: status snapshots and the Server-Sent Events stream.
+
+Both read the `ingestion_jobs` rows of one upload batch, so progress is visible
+no matter which API process or worker is doing the work.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from typing import AsyncIterator, Optional
+
+from db.ingestion_repository import TERMINAL_STATUSES, get_batch_jobs
+
+BATCH_EVENTS_POLL_INTERVAL = float(os.getenv("BATCH_EVENTS_POLL_INTERVAL", "1"))
+BATCH_EVENTS_MAX_SECONDS = int(os.getenv("BATCH_EVENTS_MAX_SECONDS", "1800"))
+
+
+def _candidate_status(row: dict) -> dict:
+    return {
+        "candidate_id": row["candidate_id"],
+        "stored_candidate_id": row["stored_candidate_id"],
+        "filename": row["filename"],
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "error": row["last_error"],
+        "stage_timings": row["stage_timings"] or {},
+    }
+
+
+def _summary(batch_id: str, candidates: list[dict]) -> dict:
+    counts = Counter(c["status"] for c in candidates)
+    completed = sum(counts[s] for s in TERMINAL_STATUSES)
+    return {
+        "batch_id": batch_id,
+        "total": len(candidates),
+        "completed": completed,
+        "done": completed == len(candidates),
+        "counts": dict(counts),
+    }
+
+
+def get_batch_status(batch_id: str) -> Optional[dict]:
+    """Snapshot of a batch, or None if no such batch exists."""
+    rows = get_batch_jobs(batch_id)
+    if not rows:
+        return None
+    candidates = [_candidate_status(row) for row in rows]
+    return dict(_summary(batch_id, candidates), candidates=candidates)
+
+
+def _sse(event: str, data: dict) -> str:
+    return "event: %s\ndata: %s\n\n" % (event, json.dumps(data, default=str))
+
+
+async def stream_batch_events(batch_id: str) -> AsyncIterator[str]:
+    """
+    SSE stream for one batch:
+      - `stage`    : a candidate reached a new stage (with its stage timings)
+      - `progress` : batch counters, after every change
+      - `complete` : every candidate is matched or failed; the stream then ends
+    A comment line is sent on quiet polls to keep proxies from closing the connection.
+    """
+    last_status: dict[str, str] = {}
+    deadline = time.monotonic() + BATCH_EVENTS_MAX_SECONDS
+
+    while time.monotonic() < deadline:
+        rows = await asyncio.to_thread(get_batch_jobs, batch_id)
+        candidates = [_candidate_status(row) for row in rows]
+
+        changed = False
+        for candidate in candidates:
+            if last_status.get(candidate["candidate_id"]) != candidate["status"]:
+                last_status[candidate["candidate_id"]] = candidate["status"]
+                changed = True
+                yield _sse("stage", candidate)
+
+        summary = _summary(batch_id, candidates)
+        if changed:
+            yield _sse("progress", summary)
+        else:
+            yield ": keep-alive\n\n"
+
+        if candidates and summary["done"]:
+            yield _sse("complete", summary)
+            return
+
+        await asyncio.sleep(BATCH_EVENTS_POLL_INTERVAL)
+
+    yield _sse("timeout", {"batch_id": batch_id})
@@ -3,27 +3,37 @@ embedding_service.py — Consolidated logic for text embeddings and vector stora
 
 Handles:
 1. SentenceTransformer singleton loading.
-2. Text building for candidates and jobs.
-3. Upserting vectors to Qdrant.
-4. Semantic similarity calculations.
+2. Content-addressed embedding cache (memory LRU + on-disk SQLite).
+3. Text building for candidates and jobs.
+4. Upserting vectors to Qdrant.
+5. Semantic similarity calculations.
 """
 
 from __future__ import annotations
 
-from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
+import numpy as np
+from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue, MatchAny, FilterSelector
 from log import log_tool
 from utils.qdrant_client_wrapper import (
     get_qdrant_client,
     COLLECTION_CANDIDATES,
     COLLECTION_JOBS,
+    COLLECTION_CANDIDATE_SKILLS,
+    COLLECTION_JOB_SKILLS,
+    VECTOR_SIZE,
+    QDRANT_RETRIEVE_CHUNK_SIZE,
+    QDRANT_SCROLL_LIMIT,
 )
+from utils.embedding_cache import EmbeddingCache, normalize_text
 
 # ─── Embedding Model Logic (Singleton) ────────────────────────────────────────
 
 import uuid
 
 _model = None
+_cache: EmbeddingCache | None = None
 _MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 64
 
 def _str_to_uuid(text_id: str) -> str:
     """Convert any string ID into a deterministic UUID for Qdrant."""
@@ -41,119 +51,55 @@ def _get_model():
             raise
     return _model
 
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache for the active model."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(_MODEL_NAME)
+    return _cache
+
 def embed(text: str) -> list[float]:
     """Embed a text string and return a 384-dimensional float list."""
-    model = _get_model()
     log_tool.log_debug("Embedding text (length=%d chars)..." % len(text))
-    vector = model.encode(text, convert_to_numpy=True).tolist()
+    vector = embed_many([text])[0].tolist()
     log_tool.log_debug("Embedding generated (384-d vector created).")
     return vector
 
-# ─── Text Builders ────────────────────────────────────────────────────────────
-
-def _cand_skills(candidate) -> str:
-    parts = []
-    if isinstance(candidate.skills, dict):
-        for skill_list in candidate.skills.values():
-            if isinstance(skill_list, list):
-                parts.extend(skill_list)
-    return " ".join(parts)
-
-def _cand_education(candidate) -> str:
-    return f"{candidate.highest_degree or ''} {candidate.highest_degree_name or ''} {candidate.institution or ''}".strip()
-
-def _job_req_skills(job) -> str:
-    return " ".join(job.required_skills) if isinstance(job.required_skills, list) else ""
-
-def _job_pref_skills(job) -> str:
-    return " ".join(job.preferred_skills) if isinstance(job.preferred_skills, list) else ""
-
-def _job_education(job) -> str:
-    if job.raw_job_json and isinstance(job.raw_job_json, dict):
-        return str(job.raw_job_json.get('education_requirements', ''))
-    return ""
-
-def _job_role(job) -> str:
-    parts = []
-    if job.title: parts.append(job.title)
-    if job.summary: parts.append(job.summary)
-    return " ".join(parts)
-
-# ─── Vector Operations ─────────────────────────────────────────────────────────
-
-def upsert_candidate_vector(candidate_id: str, candidate) -> None:
-    """Embed candidate profile and upsert to Qdrant."""
-    try:
-        # Named vectors mapping
-        vectors = {}
-        
-        req_skills_text = _cand_skills(candidate)
-        if req_skills_text.strip():
-            vectors["skills"] = embed(req_skills_text)
-            
-        edu_text = _cand_education(candidate)
-        if edu_text.strip():
-            vectors["education"] = embed(edu_text)
-
-        if not vectors:
-            log_tool.log_warning("Candidate id=%s has no text to embed — skipping." % candidate_id)
-            return
-
-        client = get_qdrant_client()
-        
-        # Build payload with metadata
-        payload = {"candidate_id": candidate_id}
-        if candidate.raw_resume_json:
-            payload_data = candidate.raw_resume_json
-            if isinstance(payload_data, dict) and "candidate" in payload_data:
-                 payload.update(payload_data["candidate"])
-            elif isinstance(payload_data, dict):
-                 payload.update(payload_data)
-        
-        log_tool.log_debug(f"Upserting candidate {candidate_id} to Qdrant with named vectors and payload keys.")
-
-        client.upsert(
-            collection_name=COLLECTION_CANDIDATES,
-            points=[PointStruct(id=_str_to_uuid(candidate_id), vector=vectors, payload=payload)],
-        )
-        log_tool.log_info("Qdrant: upserted candidate vector id=%s with full metadata" % candidate_id)
-    except Exception as e:
-        log_tool.log_warning("Qdrant upsert failed for candidate id=%s: %s" % (candidate_id, e))
-
-def upsert_job_vector(job_id: str, job) -> None:
-    """Embed job description and upsert to Qdrant."""
-    try:
-        vectors = {}
-        
-        req_text = _job_req_skills(job)
-        if req_text.strip(): vectors["required_skills"] = embed(req_text)
-            
-        pref_text = _job_pref_skills(job)
-        if pref_text.strip(): vectors["preferred_skills"] = embed(pref_text)
-            
-        edu_text = _job_education(job)
-        if edu_text.strip(): vectors["education"] = embed(edu_text)
-            
-        role_text = _job_role(job)
-        if role_text.strip(): vectors["role"] = embed(role_text)
-
-        if not vectors:
-            log_tool.log_warning("Job id=%s has no text to embed — skipping." % job_id)
-            return
-
-        client = get_qdrant_client()
-        payload = {"job_id": job_id}
-        if job.raw_job_json:
-            payload.update(job.raw_job_json)
+def embed_many(texts: list[str]) -> np.ndarray:
+    """
+    Embed a list of strings, serving repeats from the embedding cache and
+    encoding all misses in one batched model call.
 
-        client.upsert(
-            collection_name=COLLECTION_JOBS,
-            points=[PointStruct(id=_str_to_uuid(job_id), vector=vectors, payload=payload)],
+    Returns an (n, 384) float32 matrix of L2-normalized rows, so cosine
+    similarity between two rows is a plain dot product.
+    """
+    if not texts:
+        return np.zeros((0, VECTOR_SIZE), dtype=np.float32)
+
+    cache = get_embedding_cache()
+    cached = cache.get_many(texts)
+
+    # Encode each distinct missing text once
+    missing = list(dict.fromkeys(normalize_text(t) for t, v in zip(texts, cached) if v is None))
+    fresh: dict[str, np.ndarray] = {}
+    if missing:
+        model = _get_model()
+        log_tool.log_debug("Embedding %d uncached texts in one batch..." % len(missing))
+        matrix = model.encode(
+            missing,
+            batch_size=EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
         )
-        log_tool.log_info("Qdrant: upserted job vector id=%s with full metadata" % job_id)
-    except Exception as e:
-        log_tool.log_warning("Qdrant upsert failed for job id=%s: %s" % (job_id, e))
+        matrix = np.asarray(matrix, dtype=np.float32)
+        cache.put_many(missing, matrix)
+        fresh = dict(zip(missing, matrix))
 
+    return np.stack([
+        v if v is not None else fresh[normalize_text(t)]
+        for t, v in zip(texts, cached)
+    ]).astype(np.float32, copy=False)
 
 def calc_sim(v1: list[float], v2: list[float]) -> float:
     """Compute cosine similarity between two float vectors."""
@@ -168,50 +114,80 @@ def calc_sim(v1: list[float], v2: list[float]) -> float:
     if norm_v1 == 0 or norm_v2 == 0: return 0.0
     return max(0.0, min(1.0, float(dot_product / (norm_v1 * norm_v2))))
 
+def _max_sim_score(jd_matrix: np.ndarray, cand_matrix: np.ndarray) -> float:
+    """
+    Average over JD rows of the best cosine similarity against any candidate row.
+    Both matrices must hold L2-normalized rows (as returned by embed_many).
+    """
+    if jd_matrix.size == 0 or cand_matrix.size == 0:
+        return 0.0
+    sims = np.clip(jd_matrix @ cand_matrix.T, 0.0, 1.0)
+    return float(sims.max(axis=1).mean())
+
 def _score_list_similarity(jd_items: list[str], cand_items: list[str]) -> float:
     """
     Granular matching: For each item in JD, find the best semantic match in candidate list.
     Returns average of maximum similarities.
+
+    Vectors come from the precomputed skill vocabulary (a matrix gather), so the
+    embedding model is only touched for skills never seen before.
     """
-    if not jd_items or not cand_items:
-        return 0.0
-    
-    # 1. Deduplicate and clean
-    jd_items = list(set([str(s).strip().lower() for s in jd_items if s]))
-    cand_items = list(set([str(s).strip().lower() for s in cand_items if s]))
-    
     if not jd_items or not cand_items:
         return 0.0
 
-    # 2. Embed all (MiniLM is fast enough for ~50 strings on the fly)
-    jd_vectors = [embed(s) for s in jd_items]
-    cand_vectors = [embed(s) for s in cand_items]
-    
-    # 3. For each JD requirement, find its 'soulmate' in candidate list
-    total_max_sim = 0.0
-    for j_vec in jd_vectors:
-        best_for_this_req = max([calc_sim(j_vec, c_vec) for c_vec in cand_vectors])
-        total_max_sim += best_for_this_req
-        
-    return total_max_sim / len(jd_items)
+    from services.skill_vocabulary import get_skill_vocabulary
+    vocabulary = get_skill_vocabulary()
+
+    # Deduplicate/clean and gather rows; row-wise max finds each requirement's 'soulmate'
+    return _max_sim_score(vocabulary.lookup(jd_items), vocabulary.lookup(cand_items))
+
+def _batch_max_sim_scores(jd_matrix: np.ndarray, cand_matrices: list[np.ndarray]) -> np.ndarray:
+    """
+    Vectorized _max_sim_score for one JD matrix against many candidates.
+
+    All candidate rows are stacked into one matrix so a single matmul produces
+    every similarity; per-candidate row-wise maxima come from a segmented reduce.
+    Candidates without vectors score 0.
+    """
+    scores = np.zeros(len(cand_matrices), dtype=np.float32)
+    if jd_matrix.size == 0 or not cand_matrices:
+        return scores
+    sizes = np.array([m.shape[0] for m in cand_matrices], dtype=np.int64)
+    nonempty = np.flatnonzero(sizes)
+    if nonempty.size == 0:
+        return scores
+
+    stacked = np.concatenate([cand_matrices[i] for i in nonempty])
+    sims = np.clip(jd_matrix @ stacked.T, 0.0, 1.0)
+    starts = np.concatenate(([0], np.cumsum(sizes[nonempty])[:-1]))
+    scores[nonempty] = np.maximum.reduceat(sims, starts, axis=1).mean(axis=0)
+    return scores
 
 # ─── Text Builders ────────────────────────────────────────────────────────────
 
-def _cand_skills(candidate) -> str:
-    parts = []
-    # Try both 'skills' and user custom field names
-    skills_data = getattr(candidate, "skills", None) or getattr(candidate, "key_skills", None)
-    
+def flatten_skills(skills_data) -> list[str]:
+    """Flatten a skills payload (dict of lists, list, or str) into a list of strings."""
+    parts: list[str] = []
     if isinstance(skills_data, dict):
-        for skill_list in skills_data.values():
-            if isinstance(skill_list, list):
-                parts.extend(skill_list)
-            elif isinstance(skill_list, str):
-                parts.append(skill_list)
+        for sub in skills_data.values():
+            if isinstance(sub, list):
+                parts.extend(str(s) for s in sub if s)
+            elif isinstance(sub, str) and sub:
+                parts.append(sub)
     elif isinstance(skills_data, list):
-        parts.extend(skills_data)
-        
-    return " ".join(parts)
+        parts.extend(str(s) for s in skills_data if s)
+    elif isinstance(skills_data, str) and skills_data:
+        parts.append(skills_data)
+    return parts
+
+def clean_skills(items) -> list[str]:
+    """Normalize and deduplicate a skill list (order preserved)."""
+    return list(dict.fromkeys(normalize_text(s) for s in items if s and str(s).strip()))
+
+def _cand_skills(candidate) -> list[str]:
+    # Try both 'skills' and user custom field names
+    skills_data = getattr(candidate, "skills", None) or getattr(candidate, "key_skills", None)
+    return flatten_skills(skills_data)
 
 def _cand_education(candidate) -> str:
     return f"{candidate.highest_degree or ''} {candidate.highest_degree_name or ''} {candidate.institution or ''}".strip()
@@ -239,76 +215,162 @@ def _job_role(job) -> str:
 
 # ─── Vector Operations ─────────────────────────────────────────────────────────
 
+def _replace_skill_points(client, collection: str, owner_field: str, owner_id: str, skills_by_kind: dict) -> int:
+    """
+    Replace an owner's per-skill vectors in a companion collection.
+    One point per (owner, kind, skill); stale skills from a previous upsert are removed first.
+    """
+    owner_filter = Filter(must=[FieldCondition(key=owner_field, match=MatchValue(value=owner_id))])
+    client.delete(collection_name=collection, points_selector=FilterSelector(filter=owner_filter))
+
+    points = []
+    for kind, skills in skills_by_kind.items():
+        cleaned = clean_skills(skills)
+        if not cleaned:
+            continue
+        matrix = embed_many(cleaned)
+        for skill, vector in zip(cleaned, matrix):
+            points.append(PointStruct(
+                id=_str_to_uuid(f"{owner_id}:{kind}:{skill}"),
+                vector=vector.tolist(),
+                payload={owner_field: owner_id, "kind": kind, "skill": skill},
+            ))
+
+    if points:
+        client.upsert(collection_name=collection, points=points)
+    return len(points)
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), max(1, size)):
+        yield items[i:i + size]
+
+def _fetch_skill_vectors_bulk(
+    client, collection: str, owner_field: str, owner_ids: list[str], chunk_size: int = QDRANT_RETRIEVE_CHUNK_SIZE
+) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Read stored per-skill vectors for many owners, grouped by owner id then kind.
+    Owners are filtered `chunk_size` ids at a time; owners with nothing stored are absent.
+    """
+    grouped: dict[str, dict[str, list]] = {}
+    for chunk in _chunks(list(dict.fromkeys(owner_ids)), chunk_size):
+        owner_filter = Filter(must=[FieldCondition(key=owner_field, match=MatchAny(any=chunk))])
+        offset = None
+        while True:
+            records, offset = client.scroll(
+                collection_name=collection,
+                scroll_filter=owner_filter,
+                limit=QDRANT_SCROLL_LIMIT,
+                offset=offset,
+                with_payload=[owner_field, "kind"],
+                with_vectors=True,
+            )
+            for record in records:
+                payload = record.payload or {}
+                grouped.setdefault(payload.get(owner_field), {}).setdefault(payload.get("kind"), []).append(record.vector)
+            if offset is None:
+                break
+    return {
+        owner: {kind: np.asarray(vectors, dtype=np.float32) for kind, vectors in kinds.items()}
+        for owner, kinds in grouped.items()
+    }
+
+def _fetch_skill_vectors(client, collection: str, owner_field: str, owner_id: str) -> dict[str, np.ndarray]:
+    """Read an owner's stored per-skill vectors, grouped by kind. Empty dict if none are stored."""
+    return _fetch_skill_vectors_bulk(client, collection, owner_field, [owner_id]).get(owner_id, {})
+
+def _retrieve_named_vectors(
+    client, collection: str, ids: list[str], vector_name: str, chunk_size: int = QDRANT_RETRIEVE_CHUNK_SIZE
+) -> dict[str, np.ndarray]:
+    """Fetch one named vector for many points with chunked multi-id retrieve calls."""
+    by_uuid = {_str_to_uuid(i): i for i in ids}
+    found: dict[str, np.ndarray] = {}
+    for chunk in _chunks(list(by_uuid), chunk_size):
+        records = client.retrieve(
+            collection_name=collection, ids=chunk, with_vectors=[vector_name], with_payload=False
+        )
+        for record in records:
+            vector = record.vector.get(vector_name) if isinstance(record.vector, dict) else None
+            if vector:
+                found[by_uuid[str(record.id)]] = np.asarray(vector, dtype=np.float32)
+    return found
+
 def upsert_candidate_vector(candidate_id: str, candidate) -> None:
-    """Embed candidate profile and upsert to Qdrant."""
+    """Embed candidate profile and upsert to Qdrant (education vector + one vector per skill)."""
     try:
         # Named vectors mapping
         vectors = {}
-        
-        req_skills_text = _cand_skills(candidate)
-        if req_skills_text.strip():
-            vectors["skills"] = embed(req_skills_text)
-            
+
+        skill_list = _cand_skills(candidate)
+
         edu_text = _cand_education(candidate)
         if edu_text.strip():
             vectors["education"] = embed(edu_text)
 
-        if not vectors:
+        if not vectors and not skill_list:
             log_tool.log_warning("Candidate id=%s has no text to embed — skipping." % candidate_id)
             return
 
         client = get_qdrant_client()
-        
-        # Build payload with metadata
-        payload = {"candidate_id": candidate_id}
-        if candidate.raw_resume_json:
-            payload_data = candidate.raw_resume_json
-            if isinstance(payload_data, dict) and "candidate" in payload_data:
-                 payload.update(payload_data["candidate"])
-            elif isinstance(payload_data, dict):
-                 payload.update(payload_data)
-        
-        log_tool.log_debug(f"Upserting candidate {candidate_id} to Qdrant with named vectors and payload keys.")
 
-        client.upsert(
-            collection_name=COLLECTION_CANDIDATES,
-            points=[PointStruct(id=_str_to_uuid(candidate_id), vector=vectors, payload=payload)],
+        if vectors:
+            # Build payload with metadata
+            payload = {"candidate_id": candidate_id}
+            if candidate.raw_resume_json:
+                payload_data = candidate.raw_resume_json
+                if isinstance(payload_data, dict) and "candidate" in payload_data:
+                     payload.update(payload_data["candidate"])
+                elif isinstance(payload_data, dict):
+                     payload.update(payload_data)
+
+            log_tool.log_debug(f"Upserting candidate {candidate_id} to Qdrant with named vectors and payload keys.")
+
+            client.upsert(
+                collection_name=COLLECTION_CANDIDATES,
+                points=[PointStruct(id=_str_to_uuid(candidate_id), vector=vectors, payload=payload)],
+            )
+
+        n_skills = _replace_skill_points(
+            client, COLLECTION_CANDIDATE_SKILLS, "candidate_id", candidate_id, {"skills": skill_list}
         )
-        log_tool.log_info("Qdrant: upserted candidate vector id=%s with full metadata" % candidate_id)
+        log_tool.log_info("Qdrant: upserted candidate vector id=%s with full metadata and %d skill vectors" % (candidate_id, n_skills))
     except Exception as e:
         log_tool.log_warning("Qdrant upsert failed for candidate id=%s: %s" % (candidate_id, e))
 
 def upsert_job_vector(job_id: str, job) -> None:
-    """Embed job description and upsert to Qdrant."""
+    """Embed job description and upsert to Qdrant (education/role vectors + one vector per skill)."""
     try:
         vectors = {}
-        
+
         req_list = _job_req_skills(job)
-        if req_list: vectors["required_skills"] = embed(" ".join(req_list))
-            
         pref_list = _job_pref_skills(job)
-        if pref_list: vectors["preferred_skills"] = embed(" ".join(pref_list))
-            
+
         edu_text = _job_education(job)
         if edu_text.strip(): vectors["education"] = embed(edu_text)
             
         role_text = _job_role(job)
         if role_text.strip(): vectors["role"] = embed(role_text)
 
-        if not vectors:
+        if not vectors and not req_list and not pref_list:
             log_tool.log_warning("Job id=%s has no text to embed — skipping." % job_id)
             return
 
         client = get_qdrant_client()
-        payload = {"job_id": job_id}
-        if job.raw_job_json:
-            payload.update(job.raw_job_json)
 
-        client.upsert(
-            collection_name=COLLECTION_JOBS,
-            points=[PointStruct(id=_str_to_uuid(job_id), vector=vectors, payload=payload)],
+        if vectors:
+            payload = {"job_id": job_id}
+            if job.raw_job_json:
+                payload.update(job.raw_job_json)
+
+            client.upsert(
+                collection_name=COLLECTION_JOBS,
+                points=[PointStruct(id=_str_to_uuid(job_id), vector=vectors, payload=payload)],
+            )
+
+        n_skills = _replace_skill_points(
+            client, COLLECTION_JOB_SKILLS, "job_id", job_id,
+            {"required_skills": req_list, "preferred_skills": pref_list},
         )
-        log_tool.log_info("Qdrant: upserted job vector id=%s with full metadata" % job_id)
+        log_tool.log_info("Qdrant: upserted job vector id=%s with full metadata and %d skill vectors" % (job_id, n_skills))
     except Exception as e:
         log_tool.log_warning("Qdrant upsert failed for job id=%s: %s" % (job_id, e))
 
@@ -375,11 +437,20 @@ def get_category_similarities(candidate_id: str, job_id: str) -> dict:
         if not job_preferred and job.preferred_skills:
             job_preferred = job.preferred_skills
 
-        # 5. Perform Matching
-        log_tool.log_info(f"Granular Matching: Cand={len(candidate_skill_list)} skills, Job={len(job_required)} reqs")
-        
-        req_sim = _score_list_similarity(job_required, candidate_skill_list)
-        pref_sim = _score_list_similarity(job_preferred, candidate_skill_list)
+        # 5. Perform Matching (stored per-skill vectors first, vocabulary lookup for older records)
+        cand_skill_vectors = _fetch_skill_vectors(client, COLLECTION_CANDIDATE_SKILLS, "candidate_id", candidate_id)
+        job_skill_vectors = _fetch_skill_vectors(client, COLLECTION_JOB_SKILLS, "job_id", job_id)
+
+        if cand_skill_vectors and job_skill_vectors:
+            log_tool.log_info(f"Granular Matching (stored vectors): Cand={len(cand_skill_vectors.get('skills', []))} skills, Job={len(job_skill_vectors.get('required_skills', []))} reqs")
+            empty = np.zeros((0, VECTOR_SIZE), dtype=np.float32)
+            cand_matrix = cand_skill_vectors.get("skills", empty)
+            req_sim = _max_sim_score(job_skill_vectors.get("required_skills", empty), cand_matrix)
+            pref_sim = _max_sim_score(job_skill_vectors.get("preferred_skills", empty), cand_matrix)
+        else:
+            log_tool.log_info(f"Granular Matching: Cand={len(candidate_skill_list)} skills, Job={len(job_required)} reqs")
+            req_sim = _score_list_similarity(job_required, candidate_skill_list)
+            pref_sim = _score_list_similarity(job_preferred, candidate_skill_list)
         
         # 6. Education Matching (Robust: Vector -> On-the-fly Embedding)
         edu_sim = 0.0
@@ -414,3 +485,86 @@ def get_category_similarities(candidate_id: str, job_id: str) -> dict:
         return default_sims
     finally:
         if db: db.close()
+
+def get_bulk_category_similarities(job, candidates: list, chunk_size: int = QDRANT_RETRIEVE_CHUNK_SIZE) -> dict[str, np.ndarray]:
+    """
+    Vectorized get_category_similarities for one job against many candidates.
+
+    Vector-store round trips are fixed per job rather than per candidate: the job
+    is read once, and candidate skill/education vectors are fetched with chunked
+    multi-id requests (`chunk_size` ids per request). Records without stored
+    vectors fall back to the skill vocabulary and one batched embed call.
+
+    Returns arrays aligned with `candidates` under the same keys as get_category_similarities.
+    """
+    from services.skill_vocabulary import get_skill_vocabulary
+
+    n = len(candidates)
+    empty = np.zeros((0, VECTOR_SIZE), dtype=np.float32)
+    cand_ids = [c.s3_candidate_id for c in candidates]
+
+    # 1. Stored vectors from Qdrant (job once, candidates in chunks)
+    job_skill_vectors: dict[str, np.ndarray] = {}
+    cand_skill_vectors: dict[str, dict[str, np.ndarray]] = {}
+    job_edu_vector = None
+    cand_edu_vectors: dict[str, np.ndarray] = {}
+    try:
+        client = get_qdrant_client()
+        job_skill_vectors = _fetch_skill_vectors(client, COLLECTION_JOB_SKILLS, "job_id", job.s3_job_id)
+        job_edu_vector = _retrieve_named_vectors(client, COLLECTION_JOBS, [job.s3_job_id], "education").get(job.s3_job_id)
+        cand_skill_vectors = _fetch_skill_vectors_bulk(client, COLLECTION_CANDIDATE_SKILLS, "candidate_id", cand_ids, chunk_size)
+        cand_edu_vectors = _retrieve_named_vectors(client, COLLECTION_CANDIDATES, cand_ids, "education", chunk_size)
+    except Exception as e:
+        log_tool.log_warning("Bulk Qdrant retrieval failed for job=%s, using local vectors: %s" % (job.s3_job_id, e))
+
+    # 2. Skill matrices (stored vectors first, vocabulary for records ingested before per-skill storage)
+    vocabulary = get_skill_vocabulary()
+    missing_cands = [i for i, cid in enumerate(cand_ids) if cid not in cand_skill_vectors]
+    fallback_skills = {i: _cand_skills(candidates[i]) for i in missing_cands}
+    if job_skill_vectors:
+        job_req_matrix = job_skill_vectors.get("required_skills", empty)
+        job_pref_matrix = job_skill_vectors.get("preferred_skills", empty)
+        vocabulary.add([s for skills in fallback_skills.values() for s in skills])
+    else:
+        job_required = _job_req_skills(job)
+        job_preferred = _job_pref_skills(job)
+        vocabulary.add(job_required + job_preferred + [s for skills in fallback_skills.values() for s in skills])
+        job_req_matrix = vocabulary.lookup(job_required)
+        job_pref_matrix = vocabulary.lookup(job_preferred)
+
+    cand_matrices = [
+        vocabulary.lookup(fallback_skills[i]) if i in fallback_skills
+        else cand_skill_vectors[cid].get("skills", empty)
+        for i, cid in enumerate(cand_ids)
+    ]
+    req_sim = _batch_max_sim_scores(job_req_matrix, cand_matrices)
+    pref_sim = _batch_max_sim_scores(job_pref_matrix, cand_matrices)
+
+    # 3. Education: stored vectors, one batched embed for the rest, then a matrix-vector product
+    edu_sim = np.zeros(n, dtype=np.float32)
+    if job_edu_vector is None:
+        job_edu_text = _job_education(job)
+        if job_edu_text.strip():
+            job_edu_vector = embed_many([job_edu_text])[0]
+    if job_edu_vector is not None:
+        cand_edu_texts = {i: _cand_education(candidates[i]) for i, cid in enumerate(cand_ids) if cid not in cand_edu_vectors}
+        to_embed = [i for i, text in cand_edu_texts.items() if text.strip()]
+        embedded = dict(zip(to_embed, embed_many([cand_edu_texts[i] for i in to_embed])))
+        rows = [i for i in range(n) if cand_ids[i] in cand_edu_vectors or i in embedded]
+        if rows:
+            cand_edu_matrix = np.stack([
+                cand_edu_vectors[cand_ids[i]] if cand_ids[i] in cand_edu_vectors else embedded[i]
+                for i in rows
+            ])
+            edu_sim[rows] = np.clip(cand_edu_matrix @ job_edu_vector, 0.0, 1.0)
+
+    log_tool.log_info(
+        f"Bulk granular matching: job={job.s3_job_id} candidates={n} "
+        f"(stored skill vectors for {n - len(missing_cands)}, stored education vectors for {len(cand_edu_vectors)})"
+    )
+
+    return {
+        "required_skills_sim": np.round(req_sim.astype(np.float64), 4),
+        "preferred_skills_sim": np.round(pref_sim.astype(np.float64), 4),
+        "education_sim": np.round(edu_sim.astype(np.float64), 4),
+    }
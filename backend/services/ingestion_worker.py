@@ -0,0 +1,280 @@
+"""
+ingestion_worker.py — Background workers that drain the resume ingestion queue.
+
+Each claimed batch is advanced stage by stage, committing after every stage so a
+crash resumes from the last completed one:
+
+    extracted → parsed     batched LLM parsing (ResumeParser.parse_batch_async)
+    parsed    → persisted  parsed JSONs to S3 (in parallel) + candidate row (no embedding yet)
+    persisted → embedded   Qdrant vectors + skill vocabulary
+    embedded  → matched    incremental match per job (one engine run per job in the batch)
+
+Every stage is idempotent (upserts keyed by candidate/email), so a retried or
+reclaimed job never duplicates work downstream.
+
+Config:
+  INGESTION_WORKERS            : worker loops started inside the API process (0 = none)
+  INGESTION_BATCH_SIZE         : jobs claimed per iteration
+  INGESTION_POLL_INTERVAL      : seconds between empty polls
+  INGESTION_PARSE_CONCURRENCY  : batched LLM requests in flight per worker
+
+Run standalone workers with:  python -m services.ingestion_worker
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+from log import log_tool
+from db.candidate_job_repository import (
+    attach_candidates_to_job,
+    embed_candidate,
+    matched_candidate_ids,
+    save_candidate_from_resume,
+)
+from db.ingestion_repository import advance_job, claim_jobs, fail_job, release_jobs
+from db.models import IngestionStatus
+from utils.parse_cache import text_hash
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "1"))
+INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "20"))
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", "2"))
+INGESTION_PARSE_CONCURRENCY = int(os.getenv("INGESTION_PARSE_CONCURRENCY", "4"))
+
+# Wakes in-process workers as soon as something is enqueued (other processes just poll)
+_wakeup: Optional[asyncio.Event] = None
+_stop: Optional[asyncio.Event] = None
+_tasks: list[asyncio.Task] = []
+
+
+def notify_ingestion_workers() -> None:
+    """Wake the in-process workers; safe to call from the event loop thread only."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+class IngestionWorker:
+    """One claim → process → release loop; run several for more throughput."""
+
+    def __init__(self, worker_id: Optional[str] = None, storage=None, matcher=None):
+        self.worker_id = worker_id or "%s:%d:%s" % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:6])
+        self._storage = storage
+        self._matcher = matcher
+
+    # Lazy so importing the worker doesn't need S3 / Gemini credentials
+    @property
+    def storage(self):
+        if self._storage is None:
+            from s3_utils.tenant_onboarder import get_storage_service
+            self._storage = get_storage_service()
+        return self._storage
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            from match_engine.candidate_job_matcher import Matcher
+            self._matcher = Matcher()
+        return self._matcher
+
+    async def run(self, stop: asyncio.Event) -> None:
+        log_tool.log_info("Ingestion worker %s started" % self.worker_id)
+        while not stop.is_set():
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                log_tool.log_exception("Ingestion worker %s iteration failed" % self.worker_id, e)
+                handled = 0
+            if handled:
+                continue
+            await self._idle(stop)
+        log_tool.log_info("Ingestion worker %s stopped" % self.worker_id)
+
+    async def _idle(self, stop: asyncio.Event) -> None:
+        waiters = [asyncio.ensure_future(stop.wait())]
+        if _wakeup is not None:
+            waiters.append(asyncio.ensure_future(_wakeup.wait()))
+        _, pending = await asyncio.wait(waiters, timeout=INGESTION_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            waiter.cancel()
+        if _wakeup is not None:
+            _wakeup.clear()
+
+    async def run_once(self) -> int:
+        """Claim one batch and push every job in it as far as it will go. Returns jobs claimed."""
+        rows = await asyncio.to_thread(claim_jobs, self.worker_id, INGESTION_BATCH_SIZE)
+        if not rows:
+            return 0
+        try:
+            await self._parse(rows)
+            await self._upload_parsed(rows)
+            await self._per_row(rows, IngestionStatus.parsed, IngestionStatus.persisted, self._persist)
+            await self._per_row(rows, IngestionStatus.persisted, IngestionStatus.embedded, self._embed)
+            await self._match(rows)
+        finally:
+            unfinished = [row["id"] for row in rows if row["status"] not in (IngestionStatus.matched.value, None)]
+            await asyncio.to_thread(release_jobs, unfinished, self.worker_id)
+        return len(rows)
+
+    # ── Stages ───────────────────────────────────────────────────────────────
+
+    async def _parse(self, rows: list[dict]) -> None:
+        todo = [row for row in rows if row["status"] == IngestionStatus.extracted.value]
+        if not todo:
+            return
+        from parsers.resume_parser import get_resume_parser
+
+        # Identical resume text (e.g. one resume linked to several JDs) is parsed once,
+        # under the candidate_id of its first row
+        hashes = {row["id"]: text_hash(row["raw_text"] or "") for row in todo}
+        first_by_text = {}
+        for row in todo:
+            first_by_text.setdefault(hashes[row["id"]], row)
+        started = time.perf_counter()
+        parsed = await get_resume_parser().parse_batch_async(
+            {row["candidate_id"]: row["raw_text"] for row in first_by_text.values()},
+            concurrency=INGESTION_PARSE_CONCURRENCY,
+        )
+        # Resumes share batched requests, so each records the whole batch's wall time
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for row in todo:
+            result = parsed.get(first_by_text[hashes[row["id"]]]["candidate_id"])
+            if result:
+                await self._advance(row, IngestionStatus.parsed, elapsed_ms, parsed_json=result)
+            else:
+                await self._fail(row, "LLM parsing returned empty data")
+
+    async def _upload_parsed(self, rows: list[dict]) -> None:
+        """The batch's parsed JSONs go to S3 in parallel (one upload_many call) ahead of the persist stage."""
+        todo = [(row, self._parsed_json_key(row)) for row in rows if row["status"] == IngestionStatus.parsed.value]
+        todo = [(row, json_key) for row, json_key in todo if json_key]
+        if not todo:
+            return
+        errors = await asyncio.to_thread(
+            self.storage.upload_many,
+            [(json.dumps(row["parsed_json"]).encode("utf-8"), json_key, "application/json") for row, json_key in todo],
+        )
+        for (row, _), error in zip(todo, errors):
+            if error is not None:
+                log_tool.log_error("Uploading parsed JSON failed for candidate '%s': %s" % (row["candidate_id"], error))
+                await self._fail(row, str(error))
+
+    async def _per_row(self, rows: list[dict], current: IngestionStatus, target: IngestionStatus, stage) -> None:
+        for row in rows:
+            if row["status"] != current.value:
+                continue
+            started = time.perf_counter()
+            try:
+                outputs = await asyncio.to_thread(stage, row)
+            except Exception as e:
+                log_tool.log_exception("Ingestion %s → %s failed for candidate '%s'" % (current.value, target.value, row["candidate_id"]), e)
+                await self._fail(row, str(e))
+                continue
+            await self._advance(row, target, (time.perf_counter() - started) * 1000, **(outputs or {}))
+
+    async def _match(self, rows: list[dict]) -> None:
+        by_job = defaultdict(list)
+        for row in rows:
+            if row["status"] == IngestionStatus.embedded.value:
+                by_job[row["job_id"]].append(row)
+        for job_id, job_rows in by_job.items():
+            started = time.perf_counter()
+            candidate_ids = [self._stored_id(row) for row in job_rows]
+            try:
+                # A duplicate linked to this JD skipped persist, so its stored candidate is
+                # still mapped to the earlier JD: move it here first, or matching skips it
+                await asyncio.to_thread(attach_candidates_to_job, candidate_ids, job_id)
+                # Incremental: only the pairs whose inputs changed (i.e. these new resumes) are rescored
+                await asyncio.to_thread(self.matcher.match_all_candidates_for_job, job_id, raise_errors=True)
+                matched = await asyncio.to_thread(matched_candidate_ids, job_id, candidate_ids)
+            except Exception as e:
+                log_tool.log_exception("Ingestion matching failed for job id=%s" % job_id, e)
+                for row in job_rows:
+                    await self._fail(row, str(e))
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for row in job_rows:
+                # Only a stored match row counts as matched
+                if self._stored_id(row) in matched:
+                    await self._advance(row, IngestionStatus.matched, elapsed_ms)
+                else:
+                    await self._fail(row, "No match was stored for job id=%s" % job_id)
+
+    @staticmethod
+    def _stored_id(row: dict) -> str:
+        return row["stored_candidate_id"] or row["candidate_id"]
+
+    @staticmethod
+    def _parsed_json_key(row: dict) -> Optional[str]:
+        # Store JSON to S3 next to the resume (derive path dynamically to decouple endpoint)
+        s3_key = row["s3_key"] or ""
+        if "resumes/" not in s3_key:
+            return None
+        return s3_key.split("resumes/")[0] + f"parsed/{row['candidate_id']}_parsed.json"
+
+    @staticmethod
+    def _persist(row: dict) -> dict:
+        # Parsed JSON is already in S3 (_upload_parsed)
+        candidate = save_candidate_from_resume(
+            parsed_resume=row["parsed_json"],
+            s3_link=row["s3_key"],
+            s3_candidate_id=row["candidate_id"],
+            s3_job_id=row["job_id"],
+            embed=False,
+        )
+        return {"stored_candidate_id": candidate.s3_candidate_id}
+
+    @staticmethod
+    def _embed(row: dict) -> None:
+        embed_candidate(row["stored_candidate_id"] or row["candidate_id"])
+
+    # ── Bookkeeping ──────────────────────────────────────────────────────────
+
+    async def _advance(self, row: dict, status: IngestionStatus, elapsed_ms: float = None, **fields) -> None:
+        owned = await asyncio.to_thread(advance_job, row["id"], self.worker_id, status.value, elapsed_ms, **fields)
+        # Lost lease: another worker reclaimed the job, stop touching it
+        row["status"] = status.value if owned else None
+        row.update(fields)
+
+    async def _fail(self, row: dict, error: str) -> None:
+        await asyncio.to_thread(fail_job, row["id"], self.worker_id, error, row["attempts"])
+        row["status"] = None
+
+
+async def start_ingestion_workers(count: int = INGESTION_WORKERS) -> None:
+    """Start `count` worker loops on the running event loop (FastAPI startup)."""
+    global _wakeup, _stop
+    if count <= 0 or _tasks:
+        return
+    _wakeup = asyncio.Event()
+    _stop = asyncio.Event()
+    for _ in range(count):
+        _tasks.append(asyncio.create_task(IngestionWorker().run(_stop)))
+    log_tool.log_info("Started %d ingestion worker(s)" % count)
+
+
+async def stop_ingestion_workers() -> None:
+    """Signal the loops to finish their current batch and wait for them (FastAPI shutdown)."""
+    if not _tasks:
+        return
+    _stop.set()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    count = max(INGESTION_WORKERS, 1)
+    workers = [IngestionWorker() for _ in range(count)]
+    try:
+        await asyncio.gather(*(worker.run(stop) for worker in workers))
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -3,7 +3,7 @@ from typing import Optional
 from log import log_tool
 
 from db.candidate_job_repository import save_job_from_jd
-from parsers.jd_parser import JDParser
+from parsers.jd_parser import get_jd_parser
 from utils.text_extractor import TextExtractor
 
 
@@ -19,7 +19,7 @@ class JDIngestService:
     def __init__(self) -> None:
         # Reuse the same helpers as ParseJDService but without matching.
         self._text_extractor = TextExtractor
-        self._jd_parser = JDParser()
+        self._jd_parser = get_jd_parser()
 
     def run(
         self,
@@ -2,7 +2,11 @@
 Matching use cases: match candidates to job by IDs; get ranked matches for a job.
 """
 
+import base64
+import json
+
 from fastapi import HTTPException
+from sqlalchemy import select, func, tuple_
 
 from db.database import SessionLocal
 from db.models import Candidate as CandidateModel, Job as JobModel, Match as MatchModel, InterviewCall as InterviewCallModel
@@ -49,18 +53,74 @@ class MatchingService:
             "results": final_results,
         }
 
+    @staticmethod
+    def _latest_calls_subquery(job_id: str):
+        """
+        Latest interview call per candidate for a job, in one pass:
+        SELECT DISTINCT ON (candidate_id) ... ORDER BY candidate_id, created_at DESC, id DESC.
+        Served by ix_interview_calls_job_candidate_latest.
+        """
+        return (
+            select(InterviewCallModel.candidate_id, InterviewCallModel.call_id)
+            .where(InterviewCallModel.job_id == job_id)
+            .distinct(InterviewCallModel.candidate_id)
+            .order_by(
+                InterviewCallModel.candidate_id,
+                InterviewCallModel.created_at.desc(),
+                InterviewCallModel.id.desc(),
+            )
+            .subquery("latest_calls")
+        )
+
+    @staticmethod
+    def _cursor_filters(job_id: str, min_score: float, status: str) -> list:
+        """The query a cursor belongs to; status compares case-insensitively, like the filter."""
+        return [job_id, min_score, status.lower() if status is not None else None]
+
+    @staticmethod
+    def _encode_cursor(score: float, match_id: int, rank: int, filters: list) -> str:
+        """Opaque keyset cursor: position after the last row of a page, and the filters it was taken under."""
+        raw = json.dumps({"s": score, "i": match_id, "r": rank, "f": filters}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, filters: list) -> tuple:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            position = float(data["s"]), int(data["i"]), int(data["r"])
+            cursor_filters = data["f"]
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        # A position (and rank) under other filters would skip or repeat rows
+        if cursor_filters != filters:
+            raise HTTPException(
+                status_code=400, detail="Cursor was issued for a different job_id, min_score or status; start again without it."
+            )
+        return position
+
     def get_ranked_matches_for_job(
         self, 
         job_id: str, 
         min_score: float = None, 
         top_n: int = None, 
         status: str = None,
-        refresh: bool = False
+        refresh: bool = False,
+        cursor: str = None,
     ) -> dict:
         """
-        Retrieves job details, matches candidates, and sorts the results.
-        If filters are provided, it slices down the final array before returning.
+        Retrieves job details, matches candidates if needed, and returns one page of
+        ranked results.
+
+        Filtering (min_score, status), ordering by final_match_percentage and the
+        page limit (top_n) all run in PostgreSQL on the
+        ix_matches_job_score index. Pagination is keyset-based: pass the
+        returned `next_cursor` back as `cursor` to get the following page.
         """
+        from log import log_tool
+
+        filters = self._cursor_filters(job_id, min_score, status)
+        after = self._decode_cursor(cursor, filters) if cursor else None
+
         db = SessionLocal()
         job_title = None
         company_name = None
@@ -72,126 +132,97 @@ class MatchingService:
                 )
             job_title = job.title
             company_name = job.company_name
-            candidates = db.query(CandidateModel).filter(CandidateModel.s3_job_id == job_id).all()
-            if not candidates:
+            has_candidates = db.query(
+                db.query(CandidateModel).filter(CandidateModel.s3_job_id == job_id).exists()
+            ).scalar()
+            if not has_candidates:
                 raise HTTPException(
                     status_code=404, detail=f"No candidates found mapped to job id={job_id} in the database."
                 )
+            has_matches = db.query(
+                db.query(MatchModel).filter(MatchModel.job_id == job_id).exists()
+            ).scalar()
         finally:
             db.close()
 
-        # Try to fetch from database first to avoid expensive re-calculations
+        # Only run the engine when nothing is stored yet or a refresh is requested;
+        # a refresh rescores every candidate, not only those whose fingerprint changed
+        if refresh or not has_matches:
+            log_tool.log_info(f"Running matching engine for job_id={job_id} (refresh={refresh})")
+            match_results = self._matcher.match_all_candidates_for_job(job_id, force=refresh)
+            if not match_results and not has_matches:
+                raise HTTPException(
+                    status_code=404, detail="Matching produced no results."
+                )
+        else:
+            log_tool.log_info(f"Using existing matches from DB for job_id={job_id}")
+
+        # --- RANKING, FILTERING AND PAGINATION (SQL side) ---
         db = SessionLocal()
-        match_results = []
         try:
-            # Join with Candidate to get the actual experience years if available
-            # Also try to find the latest call_id for this candidate/job
-            existing_matches = (
-                db.query(MatchModel, CandidateModel.overall_experience_years)
+            # Join with Candidate to get the actual experience years if available,
+            # and with the latest call per candidate in the same query
+            latest_calls = self._latest_calls_subquery(job_id)
+            query = (
+                db.query(MatchModel, CandidateModel.overall_experience_years, latest_calls.c.call_id)
                 .join(CandidateModel, MatchModel.candidate_id == CandidateModel.s3_candidate_id)
-                .filter(MatchModel.job_id == job_id)
-                .all()
+                .outerjoin(latest_calls, latest_calls.c.candidate_id == MatchModel.candidate_id)
+                .filter(MatchModel.job_id == job_id, MatchModel.final_match_percentage.isnot(None))
             )
+            if min_score is not None:
+                query = query.filter(MatchModel.final_match_percentage >= min_score)
+            if status is not None:
+                query = query.filter(func.lower(MatchModel.qualification_status) == status.lower())
+            if after is not None:
+                query = query.filter(
+                    tuple_(MatchModel.final_match_percentage, MatchModel.id) < tuple_(after[0], after[1])
+                )
+            query = query.order_by(MatchModel.final_match_percentage.desc(), MatchModel.id.desc())
 
-            if existing_matches and not refresh:
-                from log import log_tool
-                log_tool.log_info(f"Using {len(existing_matches)} existing matches from DB for job_id={job_id}")
-                for m, exp_years in existing_matches:
-                    # Find last call ID if exists
-                    last_call = db.query(InterviewCallModel).filter(
-                        InterviewCallModel.candidate_id == m.candidate_id,
-                        InterviewCallModel.job_id == m.job_id
-                    ).order_by(InterviewCallModel.created_at.desc(), InterviewCallModel.id.desc()).first()
-                    
-                    match_results.append({
-                        "candidate_id": m.candidate_id,
-                        "candidate_name": m.candidate_name,
-                        "qualification_status": m.qualification_status,
-                        "candidate_experience_years": exp_years or 0.0,
-                        "latest_call_id": last_call.call_id if last_call else None,
-                        "embedding_similarity": 0.0,
-                        "match_scores": {
-                            "required_skills_score": m.required_skills_score,
-                            "preferred_skills_score": m.preferred_skills_score,
-                            "education_score": m.education_score,
-                            "experience_score": m.experience_score,
-                            "location_score": m.location_score,
-                            "final_match_percentage": m.final_match_percentage,
-                        },
-                        "matched_required_skills": m.matched_required_skills or [],
-                        "missing_required_skills": m.missing_required_skills or [],
-                        "matched_preferred_skills": m.matched_preferred_skills or [],
-                    })
+            page_size = top_n if top_n is not None and top_n > 0 else None
+            if page_size is not None:
+                # One extra row tells us whether another page exists
+                query = query.limit(page_size + 1)
+            rows = query.all()
         finally:
             db.close()
 
-        if not match_results:
-            # Running matching engine if no matches found or refresh requested
-            from log import log_tool
-            log_tool.log_info(f"Running matching engine for job_id={job_id} (refresh={refresh})")
-            match_results = self._matcher.match_all_candidates_for_job(job_id)
-            if not match_results:
-                raise HTTPException(
-                    status_code=404, detail="Matching produced no results."
-                )
-
-        # --- RE-RANKING AND FILTERING PROCESS ---
-        from log import log_tool
-        log_tool.log_info(f"Starting Re-ranking process for job_id={job_id}...")
-
-        # 1. Apply any dynamic filters requested by the frontend
-        filtered_candidates = []
-        for match in match_results:
-            if min_score is not None and match["match_scores"]["final_match_percentage"] < min_score:
-                continue
-            if status is not None and match.get("qualification_status", "").lower() != status.lower():
-                continue
-            
-            # Ensure latest_call_id is present even for matches from the engine (re-checking DB)
-            if "latest_call_id" not in match:
-                db_sub = SessionLocal()
-                try:
-                    last_call = db_sub.query(InterviewCallModel).filter(
-                        InterviewCallModel.candidate_id == match["candidate_id"],
-                        InterviewCallModel.job_id == job_id
-                    ).order_by(InterviewCallModel.created_at.desc(), InterviewCallModel.id.desc()).first()
-                    match["latest_call_id"] = last_call.call_id if last_call else None
-                finally:
-                    db_sub.close()
-
-            filtered_candidates.append(match)
-
-        # 2. Sort remaining candidates by score descending
-        re_ranked_candidates = sorted(
-            filtered_candidates,
-            key=lambda m: m["match_scores"]["final_match_percentage"],
-            reverse=True,
-        )
-
-        # 3. Trim to top exactly N if requested
-        if top_n is not None and top_n > 0:
-            re_ranked_candidates = re_ranked_candidates[:top_n]
+        rank_offset = after[2] if after is not None else 0
+        next_cursor = None
+        if page_size is not None and len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1][0]
+            next_cursor = self._encode_cursor(last.final_match_percentage, last.id, rank_offset + len(rows), filters)
 
-        log_tool.log_info(f"Re-ranking complete. Found {len(re_ranked_candidates)} candidates matching criteria.")
+        log_tool.log_info(f"Ranking complete. Returning {len(rows)} candidates matching criteria for job_id={job_id}.")
 
         return {
             "job_id": job_id,
             "job_title": job_title,
             "company_name": company_name,
-            "total_candidates": len(re_ranked_candidates),
+            "total_candidates": len(rows),
+            "next_cursor": next_cursor,
             "candidates": [
                 {
-                    "rank": idx + 1,
-                    "candidate_id": candidate_match.get("candidate_id"),
-                    "candidate_name": candidate_match["candidate_name"],
-                    "qualification_status": candidate_match.get("qualification_status"),
-                    "experience_years": candidate_match.get("candidate_experience_years"),
-                    "embedding_similarity": candidate_match.get("embedding_similarity", 0.0),
-                    "match_scores": candidate_match["match_scores"],
-                    "matched_required_skills": candidate_match["matched_required_skills"],
-                    "missing_required_skills": candidate_match["missing_required_skills"],
-                    "matched_preferred_skills": candidate_match["matched_preferred_skills"],
+                    "rank": rank_offset + idx + 1,
+                    "candidate_id": m.candidate_id,
+                    "candidate_name": m.candidate_name,
+                    "qualification_status": m.qualification_status,
+                    "experience_years": exp_years or 0.0,
+                    "embedding_similarity": m.embedding_similarity or 0.0,
+                    "match_scores": {
+                        "required_skills_score": m.required_skills_score,
+                        "preferred_skills_score": m.preferred_skills_score,
+                        "education_score": m.education_score,
+                        "experience_score": m.experience_score,
+                        "location_score": m.location_score,
+                        "final_match_percentage": m.final_match_percentage,
+                    },
+                    "matched_required_skills": m.matched_required_skills or [],
+                    "missing_required_skills": m.missing_required_skills or [],
+                    "matched_preferred_skills": m.matched_preferred_skills or [],
+                    "latest_call_id": last_call_id,
                 }
-                for idx, candidate_match in enumerate(re_ranked_candidates)
+                for idx, (m, exp_years, last_call_id) in enumerate(rows)
             ],
         }
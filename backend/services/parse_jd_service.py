@@ -8,7 +8,7 @@ from log import log_tool
 
 from db.candidate_job_repository import save_job_from_jd
 from match_engine.candidate_job_matcher import Matcher
-from parsers.jd_parser import JDParser
+from parsers.jd_parser import get_jd_parser
 from utils.text_extractor import TextExtractor
 
 
@@ -17,7 +17,7 @@ class ParseJDService:
 
     def __init__(self):
         self._text_extractor = TextExtractor
-        self._jd_parser = JDParser()
+        self._jd_parser = get_jd_parser()
         self._matcher = Matcher()
 
     def run(self, file_bytes: bytes, filename: str, company_name: Optional[str] = None, client_company: Optional[str] = None, s3_link: Optional[str] = None, s3_job_id: Optional[str] = None) -> dict:
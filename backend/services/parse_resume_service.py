@@ -5,7 +5,7 @@ Parse Resume use case: extract text from file → parse via LLM → save candida
 from log import log_tool
 
 from db.candidate_job_repository import save_candidate_from_resume
-from parsers.resume_parser import ResumeParser
+from parsers.resume_parser import get_resume_parser
 from utils.text_extractor import TextExtractor
 
 
@@ -14,7 +14,7 @@ class ParseResumeService:
 
     def __init__(self):
         self._text_extractor = TextExtractor
-        self._resume_parser = ResumeParser()
+        self._resume_parser = get_resume_parser()
 
     def run(self, file_bytes: bytes, filename: str, s3_link: str = None) -> dict:
         """
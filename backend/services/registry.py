@@ -0,0 +1,91 @@
+"""
+registry.py — Lazily built, process-wide service instances.
+
+Routers ask for services by name instead of constructing them at import time,
+so importing `main` builds no Gemini / boto3 / Retell clients and does not load
+google-genai, qdrant-client or the Retell SDK. Each service (and everything its
+module imports) is created on first use, then shared by every caller.
+
+    from services.registry import lazy_service
+
+    _matching_service = lazy_service("matching")    # nothing imported or built yet
+    _matching_service.get_ranked_matches(job_id)    # built here, once per process
+
+Factories are "module:attribute" paths, so registering one imports nothing.
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Callable, Union
+
+from log import log_tool
+
+_factories: dict[str, Union[str, Callable[[], Any]]] = {
+    "storage": "s3_utils.tenant_onboarder:get_storage_service",
+    "parse_resume": "services.parse_resume_service:ParseResumeService",
+    "parse_jd": "services.parse_jd_service:ParseJDService",
+    "jd_ingest": "services.jd_ingest_service:JDIngestService",
+    "matching": "services.matching_service:MatchingService",
+    "resume_intake": "services.resume_intake_service:ResumeIntakeService",
+    "retell": "services.retell_service:RetellService",
+}
+_instances: dict[str, Any] = {}
+# Re-entrant: a factory may itself ask for another service
+_lock = threading.RLock()
+
+
+def register_service(name: str, factory: Union[str, Callable[[], Any]]) -> None:
+    """Add or replace a factory (a callable or "module:attribute"); drops any built instance."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get_service(name: str) -> Any:
+    """The shared instance of `name`, built on the first call."""
+    if name not in _instances:
+        with _lock:
+            if name not in _instances:
+                if name not in _factories:
+                    raise KeyError("Unknown service '%s'" % name)
+                factory = _factories[name]
+                if isinstance(factory, str):
+                    module_name, attr = factory.split(":")
+                    factory = getattr(importlib.import_module(module_name), attr)
+                started = time.perf_counter()
+                _instances[name] = factory()
+                log_tool.log_info("Service '%s' ready in %.0f ms" % (name, (time.perf_counter() - started) * 1000))
+    return _instances[name]
+
+
+def reset_services() -> None:
+    """Forget built instances (the next get_service builds them again)."""
+    with _lock:
+        _instances.clear()
+
+
+class _LazyService:
+    """Stands in for a service at module level; the first attribute access builds it."""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(get_service(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(get_service(self._name), attr, value)
+
+    def __repr__(self) -> str:
+        state = "ready" if self._name in _instances else "not built"
+        return "<lazy service '%s' (%s)>" % (self._name, state)
+
+
+def lazy_service(name: str) -> Any:
+    """Module-level handle on a registered service; nothing is built until it is used."""
+    if name not in _factories:
+        raise KeyError("Unknown service '%s'" % name)
+    return _LazyService(name)
@@ -0,0 +1,177 @@
+"""
+resume_intake_service.py — Turn an uploaded resume file into an ingestion job.
+
+Shared by both upload paths:
+  - multipart form uploads (bytes arrive through the API, stored to S3 here)
+  - presigned direct-to-S3 uploads (the object is already in S3 and is read
+    back by key, from the upload-session completion call or an S3 event)
+
+For each file: dedupe on file bytes, extract text on the process pool, dedupe
+on text, then enqueue for the ingestion workers (or link the earlier upload to
+this JD). Results are plain dicts shaped like schemas.ResumeUploadResult.
+
+Config:
+  RESUME_UPLOAD_DEDUPE : reuse earlier uploads of the same resume within a company
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import Optional
+
+from log import log_tool
+from db.ingestion_repository import enqueue_resume, find_duplicate, link_duplicate
+from utils.parse_cache import text_hash
+from utils.text_extractor import TextExtractor
+
+RESUME_UPLOAD_DEDUPE = os.getenv("RESUME_UPLOAD_DEDUPE", "true").lower() in ("1", "true", "yes")
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+async def _timed_extract(content: bytes, filename: str) -> tuple[str, float]:
+    """Extract on the process pool; returns (text, elapsed ms) for the stage timings."""
+    started = time.perf_counter()
+    raw_text = await TextExtractor.extract_text_async(content, filename)
+    return raw_text, (time.perf_counter() - started) * 1000
+
+
+class ResumeIntakeService:
+    """Dedupe → extract → enqueue for one resume file."""
+
+    def __init__(self, storage=None):
+        if storage is None:
+            from services.registry import lazy_service
+            storage = lazy_service("storage")
+        self.storage = storage
+
+    async def ingest_upload(
+        self,
+        company_id: str,
+        user_id: str,
+        jd_id: str,
+        filename: str,
+        content: bytes,
+        content_type: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        file_hash: Optional[str] = None,
+    ) -> dict:
+        """A file received through the API: stored to S3 here unless it is a duplicate."""
+
+        async def _store() -> tuple[str, str]:
+            candidate_id, s3_key = self.storage.generate_resume_upload_path(
+                company_id=company_id,
+                user_id=user_id,
+                jd_id=jd_id,
+                original_filename=filename,
+            )
+            await asyncio.to_thread(
+                self.storage.upload_file, content, s3_key, content_type or "application/octet-stream"
+            )
+            return candidate_id, s3_key
+
+        return await self._ingest(company_id, jd_id, filename, content, file_hash, batch_id, _store)
+
+    async def ingest_object(self, s3_key: str, batch_id: Optional[str] = None) -> dict:
+        """
+        A resume already uploaded to S3 under a generate_resume_upload_path key
+        (presigned upload). Idempotent: an object that was already queued is
+        reported as such and not queued again.
+        """
+        key = self.storage.parse_resume_key(s3_key)
+        if key is None:
+            return {"filename": s3_key.rsplit("/", 1)[-1], "status": "failed", "error": "Not a resume upload key."}
+        filename = key["filename"]
+        try:
+            content, metadata = await asyncio.to_thread(self.storage.read_file, s3_key)
+        except Exception as e:
+            log_tool.log_exception(f"Reading uploaded resume '{s3_key}' failed", e)
+            return {"filename": filename, "status": "failed", "error": str(e)}
+
+        async def _store() -> tuple[str, str]:
+            return key["candidate_id"], s3_key
+
+        return await self._ingest(
+            key["company_id"], key["jd_id"], filename, content, None,
+            batch_id or metadata.get("batch-id"), _store, uploaded_key=s3_key,
+        )
+
+    async def _ingest(
+        self,
+        company_id: str,
+        jd_id: str,
+        filename: str,
+        content: bytes,
+        file_hash: Optional[str],
+        batch_id: Optional[str],
+        store,
+        uploaded_key: Optional[str] = None,
+    ) -> dict:
+        key_prefix = f"companies/{company_id}/"
+        file_hash = file_hash or content_hash(content)
+        try:
+            source = await self._find_duplicate(key_prefix, content_hash=file_hash)
+            if source:
+                return await self._link(source, jd_id, filename, batch_id, uploaded_key)
+
+            raw_text, extract_ms = await _timed_extract(content, filename)
+            if not raw_text.strip():
+                raise ValueError(f"Could not extract any readable text from '{filename}'. It may be an unsupported image/scan or corrupted file.")
+
+            # Different file, same resume (e.g. re-exported PDF)
+            resume_text_hash = text_hash(raw_text)
+            source = await self._find_duplicate(key_prefix, text_hash=resume_text_hash)
+            if source:
+                return await self._link(source, jd_id, filename, batch_id, uploaded_key)
+
+            candidate_id, s3_key = await store()
+            await asyncio.to_thread(
+                enqueue_resume, candidate_id, jd_id, raw_text,
+                s3_key=s3_key, filename=filename, batch_id=batch_id, extract_ms=extract_ms,
+                content_hash=file_hash, text_hash=resume_text_hash,
+            )
+            log_tool.log_info(f"Queued '{filename}' for ingestion as candidate {candidate_id}")
+            return {"candidate_id": candidate_id, "s3_key": s3_key, "filename": filename, "status": "success"}
+        except Exception as e:
+            log_tool.log_exception(f"Resume upload failed for '{filename}'", e)
+            return {"filename": filename, "status": "failed", "error": str(e)}
+
+    @staticmethod
+    async def _find_duplicate(key_prefix: str, **hashes) -> Optional[dict]:
+        if not RESUME_UPLOAD_DEDUPE:
+            return None
+        return await asyncio.to_thread(find_duplicate, key_prefix, **hashes)
+
+    async def _link(
+        self, source: dict, jd_id: str, filename: str, batch_id: Optional[str], uploaded_key: Optional[str],
+    ) -> dict:
+        if uploaded_key and source["s3_key"] == uploaded_key:
+            # This very object was queued already (completion call and S3 event both fired)
+            return {"candidate_id": source["candidate_id"], "s3_key": uploaded_key, "filename": filename, "status": "success"}
+
+        existing_id = source["stored_candidate_id"] or source["candidate_id"]
+        candidate_id = source["candidate_id"]
+        if source["job_id"] != jd_id:
+            # Same resume, new JD: only the stages it hasn't been through yet (usually just matching) run
+            candidate_id = str(uuid.uuid4())
+            await asyncio.to_thread(
+                link_duplicate, source["id"], candidate_id, jd_id, filename=filename, batch_id=batch_id,
+            )
+        if uploaded_key:
+            # The duplicate object is never referenced; the linked job reuses the original's
+            try:
+                await asyncio.to_thread(self.storage.delete_file, uploaded_key)
+            except Exception as e:
+                log_tool.log_warning(f"Could not delete duplicate upload '{uploaded_key}': {e}")
+        log_tool.log_info(f"'{filename}' duplicates candidate {existing_id}; linked to JD {jd_id} as {candidate_id}")
+        return {
+            "candidate_id": candidate_id,
+            "s3_key": source["s3_key"],
+            "filename": filename,
+            "status": "duplicate",
+            "duplicate_of": existing_id,
+        }
@@ -0,0 +1,144 @@
+"""
+skill_vocabulary.py — Global skill vocabulary with a precomputed embedding table.
+
+Every distinct skill string seen on a Job (required/preferred) or a Candidate
+is embedded once and stored as a row of one contiguous float32 matrix, with a
+string → row index. Granular skill matching then becomes index lookups plus a
+matrix gather, so request-time matching does not need the embedding model.
+
+The table is built lazily from PostgreSQL on first use and kept up to date by
+the candidate/job repository as new records are saved.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from log import log_tool
+from services.embedding_service import embed_many, flatten_skills, clean_skills
+from utils.embedding_cache import normalize_text
+from utils.qdrant_client_wrapper import VECTOR_SIZE
+
+_INITIAL_CAPACITY = 1024
+
+
+class SkillVocabulary:
+    """
+    Append-only embedding table: `matrix[index[skill]]` is the unit vector for `skill`.
+
+    Thread-safe for concurrent readers and writers; rows are never moved
+    once assigned, the backing array only grows by doubling.
+    """
+
+    def __init__(self, dim: int = VECTOR_SIZE):
+        self.dim = dim
+        self._matrix = np.zeros((_INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._index: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, skill: str) -> bool:
+        return normalize_text(skill) in self._index
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the populated rows."""
+        return self._matrix[:len(self._index)]
+
+    def add(self, skills) -> int:
+        """Embed and append any skills not yet in the vocabulary. Returns the number added."""
+        cleaned = clean_skills(skills)
+        new = [s for s in cleaned if s not in self._index]
+        if not new:
+            return 0
+
+        # Embed outside the lock; embed_many is served from the embedding cache when warm.
+        vectors = embed_many(new)
+
+        with self._lock:
+            added = 0
+            for skill, vector in zip(new, vectors):
+                if skill in self._index:
+                    continue
+                row = len(self._index)
+                if row >= self._matrix.shape[0]:
+                    grown = np.zeros((self._matrix.shape[0] * 2, self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix[:row]
+                    self._matrix = grown
+                self._matrix[row] = vector
+                self._index[skill] = row
+                added += 1
+        return added
+
+    def lookup(self, skills) -> np.ndarray:
+        """
+        Return the (n, dim) matrix of unit vectors for the given skills.
+        Unknown skills are added first (falling back to the model only on a cache miss).
+        """
+        cleaned = clean_skills(skills)
+        if not cleaned:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if any(s not in self._index for s in cleaned):
+            self.add(cleaned)
+        with self._lock:
+            rows = np.fromiter((self._index[s] for s in cleaned), dtype=np.int64, count=len(cleaned))
+            return self._matrix[rows]
+
+    def load_from_db(self) -> int:
+        """Seed the vocabulary from every Job and Candidate skill list in PostgreSQL."""
+        from db.database import SessionLocal
+        from db.models import Candidate, Job
+
+        db = SessionLocal()
+        try:
+            skills: list[str] = []
+            for required, preferred in db.query(Job.required_skills, Job.preferred_skills).all():
+                skills.extend(flatten_skills(required))
+                skills.extend(flatten_skills(preferred))
+            for (cand_skills,) in db.query(Candidate.skills).all():
+                skills.extend(flatten_skills(cand_skills))
+        finally:
+            db.close()
+
+        added = self.add(skills)
+        log_tool.log_info("Skill vocabulary: loaded %d skills from DB" % added)
+        return added
+
+
+_vocabulary: SkillVocabulary | None = None
+_vocabulary_lock = threading.Lock()
+
+
+def get_skill_vocabulary() -> SkillVocabulary:
+    """Return the process-wide skill vocabulary, seeding it from the DB on first use."""
+    global _vocabulary
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                vocabulary = SkillVocabulary()
+                try:
+                    vocabulary.load_from_db()
+                except Exception as e:
+                    log_tool.log_warning("Skill vocabulary: DB seed failed, starting empty: %s" % e)
+                _vocabulary = vocabulary
+    return _vocabulary
+
+
+def register_skills(skills) -> None:
+    """
+    Make newly ingested skills available to the matcher.
+
+    Embeds them now (warming the embedding cache) and appends them to the
+    vocabulary if it is already loaded; otherwise the lazy DB seed picks them up.
+    """
+    cleaned = clean_skills(skills)
+    if not cleaned:
+        return
+    if _vocabulary is not None:
+        _vocabulary.add(cleaned)
+    else:
+        embed_many(cleaned)
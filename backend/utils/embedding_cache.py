@@ -0,0 +1,180 @@
+"""
+embedding_cache.py — Content-addressed cache for text embeddings.
+
+Keys are sha256(model name + normalized text), so the same skill string
+embedded by the same model is only ever computed once.
+
+Two tiers:
+  - memory : bounded LRU of float32 vectors (per process)
+  - disk   : SQLite table that survives restarts and is shared by workers
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from log import log_tool
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.getcwd(), "cache", "embeddings.sqlite3"),
+)
+
+# SQLite limits the number of bound parameters per statement.
+_SQL_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace and lower-case.
+    all-MiniLM-L6-v2 uses an uncased tokenizer, so case never changes the vector.
+    """
+    return " ".join(str(text).split()).lower()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache with hit/miss counters.
+
+    Thread-safe: a single lock guards the LRU and the SQLite connection.
+    """
+
+    def __init__(self, model_name: str, max_items: int = EMBEDDING_CACHE_SIZE, path: Optional[str] = EMBEDDING_CACHE_PATH):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.path = path
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            self._open_disk_tier(path)
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+
+    def _open_disk_tier(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+            log_tool.log_info("Embedding cache: disk tier at %s" % path)
+        except Exception as e:
+            log_tool.log_warning("Embedding cache: disk tier disabled (%s)" % e)
+            self._conn = None
+
+    def _disk_get(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        if self._conn is None or not keys:
+            return found
+        try:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[i:i + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN (%s)" % placeholders, chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            log_tool.log_warning("Embedding cache: disk read failed: %s" % e)
+        return found
+
+    def _disk_put(self, items: dict[str, np.ndarray]) -> None:
+        if self._conn is None or not items:
+            return
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                [(k, self.model_name, int(v.shape[0]), v.astype(np.float32).tobytes()) for k, v in items.items()],
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            log_tool.log_warning("Embedding cache: disk write failed: %s" % e)
+
+    # ── Memory tier ──────────────────────────────────────────────────────────
+
+    def _memory_put(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    def key_for(self, text: str) -> str:
+        """Content address for a text under this cache's model."""
+        payload = "%s\x00%s" % (self.model_name, normalize_text(text))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """Look up each text; returns a vector or None per input, in order."""
+        keys = [self.key_for(t) for t in texts]
+        results: list[Optional[np.ndarray]] = [None] * len(keys)
+
+        with self._lock:
+            pending: dict[str, list[int]] = {}
+            for idx, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[idx] = vector
+                else:
+                    pending.setdefault(key, []).append(idx)
+
+            if pending:
+                from_disk = self._disk_get(list(pending))
+                for key, positions in pending.items():
+                    vector = from_disk.get(key)
+                    if vector is None:
+                        self.misses += len(positions)
+                        continue
+                    self.disk_hits += len(positions)
+                    self._memory_put(key, vector)
+                    for idx in positions:
+                        results[idx] = vector
+
+        return results
+
+    def put_many(self, texts: list[str], vectors: np.ndarray) -> None:
+        """Store freshly computed vectors in both tiers."""
+        items = {self.key_for(t): np.asarray(v, dtype=np.float32) for t, v in zip(texts, vectors)}
+        with self._lock:
+            for key, vector in items.items():
+                self._memory_put(key, vector)
+            self._disk_put(items)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current memory-tier size."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "memory_capacity": self.max_items,
+                "disk_enabled": self._conn is not None,
+            }
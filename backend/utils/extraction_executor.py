@@ -0,0 +1,189 @@
+"""
+extraction_executor.py — Process pool for CPU-bound document text extraction.
+
+pypdf / python-docx parsing is pure Python and holds the GIL, so running it in
+the API process stalls the event loop and uses one core. The executor runs
+TextExtractor in worker processes instead:
+
+  - one task per document, or for PDFs longer than EXTRACTION_PDF_SPLIT_PAGES,
+    one task per page range so a single large PDF spreads across workers
+  - every file is bounded by EXTRACTION_TIMEOUT seconds, enforced inside the
+    worker (SIGALRM at the file's deadline, and page-range tasks that start
+    after it are skipped), so a hostile file cannot hold a pool slot; a worker
+    that still has not returned shortly after the deadline (stuck in native
+    code) gets the pool terminated and recreated. A timed-out file yields ""
+    like any other extraction failure
+
+Config:
+  EXTRACTION_WORKERS          : pool size (default: CPU count)
+  EXTRACTION_TIMEOUT          : seconds per file (default 60)
+  EXTRACTION_PDF_SPLIT_PAGES  : pages per task when splitting a PDF (default 10)
+  EXTRACTION_MAX_PAGES        : pages read per PDF (see utils/text_extractor.py)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from log import log_tool
+from utils.text_extractor import EXTRACTION_MAX_PAGES, TextExtractor
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "60"))
+EXTRACTION_PDF_SPLIT_PAGES = int(os.getenv("EXTRACTION_PDF_SPLIT_PAGES", "10"))
+
+# Extra wait past the deadline for a worker's own alarm to fire before the pool is killed
+_TIMEOUT_GRACE = 5.0
+
+
+# ── Worker-side entry points (module level so they pickle) ─────────────────
+
+class ExtractionDeadlineExceeded(BaseException):
+    """
+    Raised inside a worker when the file's EXTRACTION_TIMEOUT is up. A
+    BaseException so the extractors' `except Exception` fallbacks (and pypdf's)
+    cannot swallow it and carry on with the next page.
+    """
+
+
+def _on_deadline(signum, frame):
+    raise ExtractionDeadlineExceeded("text extraction deadline exceeded")
+
+
+def _run_until(deadline: float, fn, *args):
+    """Run fn in the worker, interrupted by SIGALRM at `deadline` (epoch seconds)."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        # Queued behind other work until the file's time was up
+        raise ExtractionDeadlineExceeded("text extraction deadline passed before the task started")
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+    previous = signal.signal(signal.SIGALRM, _on_deadline)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_document(deadline: float, file_bytes: bytes, filename: str) -> str:
+    return _run_until(deadline, TextExtractor.extract_text, file_bytes, filename)
+
+
+def _extract_pdf_range(deadline: float, file_bytes: bytes, start: int, stop: int) -> str:
+    return _run_until(deadline, TextExtractor._read_pdf_pages, file_bytes, start, stop)
+
+
+def _count_pdf_pages(deadline: float, file_bytes: bytes) -> int:
+    return _run_until(deadline, TextExtractor.pdf_page_count, file_bytes)
+
+
+class ExtractionExecutor:
+    """Async front-end over a lazily started ProcessPoolExecutor."""
+
+    def __init__(
+        self,
+        max_workers: int = EXTRACTION_WORKERS,
+        timeout: float = EXTRACTION_TIMEOUT,
+        split_pages: int = EXTRACTION_PDF_SPLIT_PAGES,
+    ):
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        self.split_pages = max(split_pages, 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: never fork a process that holds DB/HTTP connections and threads
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    log_tool.log_info("Extraction pool started with %d worker(s)" % self.max_workers)
+        return self._pool
+
+    async def _submit(self, fn, *args):
+        return await asyncio.wrap_future(self.pool.submit(fn, *args))
+
+    async def extract(self, file_bytes: bytes, filename: str) -> str:
+        """Extract text off the event loop; "" on failure or timeout (same contract as TextExtractor)."""
+        deadline = time.time() + self.timeout
+        try:
+            # Cancelling on timeout also cancels this file's page-range tasks that have not started
+            return await asyncio.wait_for(
+                self._extract(deadline, file_bytes, filename), timeout=self.timeout + _TIMEOUT_GRACE
+            )
+        except ExtractionDeadlineExceeded:
+            log_tool.log_error("Text extraction timed out after %.0fs for '%s'" % (self.timeout, filename))
+        except asyncio.TimeoutError:
+            # The worker ignored its alarm (stuck in native code): only killing it frees the slot
+            log_tool.log_error("Text extraction of '%s' did not stop at its deadline; restarting the pool" % filename)
+            self.terminate()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM on a hostile PDF); start a fresh pool for the next file
+            log_tool.log_error("Text extraction pool crashed on '%s': %s" % (filename, e))
+            self.shutdown()
+        except Exception as e:
+            log_tool.log_error("Text extraction failed for '%s': %s" % (filename, e))
+        return ""
+
+    async def _extract(self, deadline: float, file_bytes: bytes, filename: str) -> str:
+        if not filename.lower().endswith(".pdf"):
+            return await self._submit(_extract_document, deadline, file_bytes, filename)
+
+        pages = min(await self._submit(_count_pdf_pages, deadline, file_bytes), EXTRACTION_MAX_PAGES)
+        if pages <= self.split_pages:
+            return await self._submit(_extract_pdf_range, deadline, file_bytes, 0, pages)
+
+        # Large PDF: page ranges in parallel, reassembled in order
+        ranges = [(start, min(start + self.split_pages, pages)) for start in range(0, pages, self.split_pages)]
+        parts = await asyncio.gather(
+            *(self._submit(_extract_pdf_range, deadline, file_bytes, start, stop) for start, stop in ranges)
+        )
+        return "\f".join(parts)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def terminate(self) -> None:
+        """Kill the workers (running tasks included); the next file starts a fresh pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[ExtractionExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_extraction_executor() -> ExtractionExecutor:
+    """Process-wide extraction executor."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ExtractionExecutor()
+    return _executor
+
+
+def shutdown_extraction_executor() -> None:
+    if _executor is not None:
+        _executor.shutdown()
@@ -1,64 +1,164 @@
+import asyncio
 import json
 import os
+import random
+import re
+import threading
+import time
+from typing import Optional
 
 from dotenv import load_dotenv
 from google import genai
 
 from log import log_tool
+from utils.rate_limiter import get_rate_limiter
 
 load_dotenv()
 
+# Attempts per request on 429/5xx, the base waits for each, and the cap on any single wait
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_RATE_LIMIT_BACKOFF = float(os.getenv("GEMINI_RATE_LIMIT_BACKOFF", "10"))
+GEMINI_SERVER_ERROR_BACKOFF = float(os.getenv("GEMINI_SERVER_ERROR_BACKOFF", "1"))
+GEMINI_MAX_BACKOFF = float(os.getenv("GEMINI_MAX_BACKOFF", "60"))
 
-class GeminiClient:
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s")
+
+_RATE_LIMIT_ERROR = {
+    "error": "Rate limit exceeded. Please try again in a minute or switch to a faster model like gemini-2.5-flash."
+}
+
+_client: Optional[genai.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_genai_client() -> genai.Client:
     """
-    Client for interacting with Google's Gemini LLM using the new google-genai SDK.
+    Process-wide google-genai client. Its HTTP connections (sync and `.aio`)
+    are reused by every GeminiClient / AsyncGeminiClient.
     """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    log_tool.log_error("API key for Gemini is missing.")
+                    raise ValueError("Use .env file or export GEMINI_API_KEY/GOOGLE_API_KEY to proceed.")
+                _client = genai.Client(api_key=api_key)
+    return _client
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, "code", None) == 429 or "429" in str(error) or "Quota exceeded" in str(error)
+
+
+def _is_server_error(error: Exception) -> bool:
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Server-suggested retry delay if present, else exponential backoff with full
+    jitter so concurrent workers don't retry in lockstep.
+    """
+    match = _RETRY_DELAY_RE.search(str(error))
+    if match:
+        return float(match.group(1))
+    base = GEMINI_RATE_LIMIT_BACKOFF if _is_rate_limit_error(error) else GEMINI_SERVER_ERROR_BACKOFF
+    return random.uniform(0, min(GEMINI_MAX_BACKOFF, base * (2 ** attempt)))
+
+
+class GeminiMetrics:
+    """Thread-safe per-model counters: calls, failures, retries, latency and token usage."""
 
     def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
-            log_tool.log_error("API key for Gemini is missing.")
-            raise ValueError("Use .env file or export GEMINI_API_KEY/GOOGLE_API_KEY to proceed.")
+        self._lock = threading.Lock()
+        self._models: dict[str, dict] = {}
+
+    def _entry(self, model: str) -> dict:
+        return self._models.setdefault(model, {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+        })
+
+    def record_call(self, model: str, latency_ms: float, response=None, failed: bool = False) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = getattr(usage, "candidates_token_count", None) or 0
+        with self._lock:
+            entry = self._entry(model)
+            entry["calls"] += 1
+            entry["failures"] += int(failed)
+            entry["total_latency_ms"] += latency_ms
+            entry["max_latency_ms"] = max(entry["max_latency_ms"], latency_ms)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["output_tokens"] += output_tokens
+        log_tool.log_debug(
+            "Gemini %s: %.0fms prompt_tokens=%d output_tokens=%d%s"
+            % (model, latency_ms, prompt_tokens, output_tokens, " (failed)" if failed else "")
+        )
 
-        self.client = genai.Client(api_key=self.api_key)
+    def record_retry(self, model: str) -> None:
+        with self._lock:
+            self._entry(model)["retries"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                model: dict(entry, avg_latency_ms=round(entry["total_latency_ms"] / entry["calls"], 1) if entry["calls"] else 0.0)
+                for model, entry in self._models.items()
+            }
+
+
+gemini_metrics = GeminiMetrics()
+
+
+class _GeminiBase:
+    """Shared setup and response handling for the sync and async clients."""
+
+    def __init__(self):
+        self.client = get_genai_client()
         self.model_name = os.getenv("GEMINI_MODEL", "gemini-2.5-flash").strip()
+        self.rate_limiter = get_rate_limiter(self.model_name)
         log_tool.log_info("Using Gemini Model: %s" % self.model_name)
 
-    def generate_json(self, system_prompt: str, user_prompt: str) -> dict:
-        """
-        Sends a request to Gemini and returns the parsed JSON response.
+    @staticmethod
+    def _config(system_prompt: str) -> dict:
+        return {
+            "system_instruction": system_prompt,
+            "response_mime_type": "application/json",
+        }
 
-        Args:
-            system_prompt: High-level instructions (e.g., "You are a parser...")
-            user_prompt: The specific content to process.
+    def _decode(self, response) -> dict:
+        json_text = self._strip_markdown_fences(response.text)
+        return json.loads(json_text)
 
-        Returns:
-            dict: Parsed JSON data. Empty dict on error or rate limit.
-        """
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=user_prompt,
-                config={
-                    "system_instruction": system_prompt,
-                    "response_mime_type": "application/json",
-                },
-            )
-
-            response_text = response.text
-            json_text = self._strip_markdown_fences(response_text)
-            return json.loads(json_text)
+    def _backoff_for(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `error`, or None if it is not retryable."""
+        if not (_is_rate_limit_error(error) or _is_server_error(error)):
+            log_tool.log_error("Gemini API Error: %s" % error)
+            return None
 
-        except Exception as e:
-            log_tool.log_error("Gemini API Error: %s" % e)
-            if "429" in str(e) or "Quota exceeded" in str(e):
-                log_tool.log_warning(
-                    "Rate limit hit for model %s. You might be on a free tier." % self.model_name
-                )
-                return {
-                    "error": "Rate limit exceeded. Please try again in a minute or switch to a faster model like gemini-2.5-flash."
-                }
-            return {}
+        delay = _retry_delay(error, attempt)
+        log_tool.log_warning(
+            "Gemini %s error for model %s (attempt %d/%d). Backing off %.1fs."
+            % (getattr(error, "code", "429"), self.model_name, attempt + 1, GEMINI_MAX_RETRIES, delay)
+        )
+        gemini_metrics.record_retry(self.model_name)
+        if _is_rate_limit_error(error):
+            # Quota is per model, so every caller sharing the bucket backs off together
+            self.rate_limiter.pause(delay)
+        return delay
+
+    def _exhausted(self, error: Exception) -> dict:
+        log_tool.log_error("Gemini API Error: retries exhausted for model %s: %s" % (self.model_name, error))
+        return dict(_RATE_LIMIT_ERROR) if _is_rate_limit_error(error) else {}
 
     @staticmethod
     def _strip_markdown_fences(json_string: str) -> str:
@@ -71,6 +171,51 @@ class GeminiClient:
             json_string = json_string.strip().rstrip("`").strip()
         return json_string.strip()
 
+
+class GeminiClient(_GeminiBase):
+    """
+    Client for interacting with Google's Gemini LLM using the new google-genai SDK.
+    """
+
+    def generate_json(self, system_prompt: str, user_prompt: str) -> dict:
+        """
+        Sends a request to Gemini and returns the parsed JSON response.
+
+        Paced by the model's shared token bucket; 429 and 5xx responses are
+        retried with jittered exponential backoff (429 also pauses the bucket).
+
+        Args:
+            system_prompt: High-level instructions (e.g., "You are a parser...")
+            user_prompt: The specific content to process.
+
+        Returns:
+            dict: Parsed JSON data. Empty dict on error or rate limit.
+        """
+        last_error = None
+        for attempt in range(GEMINI_MAX_RETRIES):
+            self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=user_prompt,
+                    config=self._config(system_prompt),
+                )
+                gemini_metrics.record_call(self.model_name, (time.perf_counter() - started) * 1000, response)
+                return self._decode(response)
+
+            except Exception as e:
+                if not isinstance(e, json.JSONDecodeError):
+                    gemini_metrics.record_call(self.model_name, (time.perf_counter() - started) * 1000, failed=True)
+                delay = self._backoff_for(e, attempt)
+                if delay is None:
+                    return {}
+                last_error = e
+                if not _is_rate_limit_error(e):
+                    time.sleep(delay)
+
+        return self._exhausted(last_error)
+
     def list_available_models(self) -> list[str]:
         """
         Lists all available Gemini models.
@@ -85,3 +230,37 @@ class GeminiClient:
             log_tool.log_error(f"Error listing models: {e}")
             return []
 
+
+
+class AsyncGeminiClient(_GeminiBase):
+    """
+    Non-blocking Gemini client built on the SDK's `client.aio` surface.
+    Shares the process-wide genai client, rate limiter and metrics with GeminiClient.
+    """
+
+    async def generate_json(self, system_prompt: str, user_prompt: str) -> dict:
+        """Async counterpart of GeminiClient.generate_json (same retries and return contract)."""
+        last_error = None
+        for attempt in range(GEMINI_MAX_RETRIES):
+            await self.rate_limiter.acquire_async()
+            started = time.perf_counter()
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=user_prompt,
+                    config=self._config(system_prompt),
+                )
+                gemini_metrics.record_call(self.model_name, (time.perf_counter() - started) * 1000, response)
+                return self._decode(response)
+
+            except Exception as e:
+                if not isinstance(e, json.JSONDecodeError):
+                    gemini_metrics.record_call(self.model_name, (time.perf_counter() - started) * 1000, failed=True)
+                delay = self._backoff_for(e, attempt)
+                if delay is None:
+                    return {}
+                last_error = e
+                if not _is_rate_limit_error(e):
+                    await asyncio.sleep(delay)
+
+        return self._exhausted(last_error)
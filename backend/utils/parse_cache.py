@@ -0,0 +1,164 @@
+"""
+parse_cache.py — Persistent cache of LLM parse results (PostgreSQL `parse_cache` table).
+
+Keys are (sha256 of the whitespace-normalized extracted text, document kind,
+prompt version). The prompt version hashes the system prompt and the user
+message template, so editing a prompt invalidates its entries automatically.
+Results of a multi-document (batch) prompt get their own version, which also
+hashes the batch suffix and wrapper, so they are never served to a
+single-document parse.
+
+Eviction:
+  - entries older than PARSE_CACHE_TTL_DAYS are ignored and swept
+  - beyond PARSE_CACHE_MAX_ROWS, the least recently used entries are dropped
+The sweep runs every PARSE_CACHE_EVICT_EVERY writes.
+
+Cache failures are logged and never fail a parse.
+"""
+
+import hashlib
+import itertools
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from log import log_tool
+from db.database import SessionLocal
+from db.models import ParseCache
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PARSE_CACHE_TTL_DAYS = int(os.getenv("PARSE_CACHE_TTL_DAYS", "90"))
+PARSE_CACHE_MAX_ROWS = int(os.getenv("PARSE_CACHE_MAX_ROWS", "20000"))
+PARSE_CACHE_EVICT_EVERY = int(os.getenv("PARSE_CACHE_EVICT_EVERY", "200"))
+
+
+def normalize_document_text(text: str) -> str:
+    """Collapse whitespace only; case and punctuation matter to the parser."""
+    return " ".join(str(text).split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_document_text(text).encode("utf-8")).hexdigest()
+
+
+def prompt_version(prompt_cls, batch: bool = False) -> str:
+    """
+    Short hash of a prompt class's system prompt and user message template;
+    with `batch`, of its batch system suffix and batch message template too.
+    """
+    payload = "%s\x00%s" % (prompt_cls.SYSTEM_PROMPT, prompt_cls.format_user_message(""))
+    if batch:
+        payload += "\x00%s\x00%s" % (
+            prompt_cls.BATCH_SYSTEM_SUFFIX, prompt_cls.format_batch_user_message({"": ""}),
+        )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseResultCache:
+    """
+    Parse results for one document kind and prompt, e.g. ParseResultCache("resume", ResumePrompt).
+    `batch=True` keys results produced by the prompt's multi-document variant.
+    """
+
+    _writes = itertools.count(1)
+
+    def __init__(self, kind: str, prompt_cls, enabled: bool = PARSE_CACHE_ENABLED, batch: bool = False):
+        self.kind = kind
+        self.prompt_version = prompt_version(prompt_cls, batch=batch)
+        self.enabled = enabled
+
+    def get(self, text: str) -> Optional[dict]:
+        """Cached result for this text, or None. A hit refreshes the entry's LRU timestamp."""
+        if not self.enabled or not text:
+            return None
+        key = text_hash(text)
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                update(ParseCache)
+                .where(
+                    ParseCache.text_hash == key,
+                    ParseCache.kind == self.kind,
+                    ParseCache.prompt_version == self.prompt_version,
+                    ParseCache.created_at >= now - timedelta(days=PARSE_CACHE_TTL_DAYS),
+                )
+                .values(last_used_at=now, hit_count=ParseCache.hit_count + 1)
+                .returning(ParseCache.result)
+            ).first()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            log_tool.log_warning("Parse cache read failed (%s): %s" % (self.kind, e))
+            return None
+        finally:
+            db.close()
+
+        if row is None:
+            return None
+        log_tool.log_info("Parse cache hit: kind=%s hash=%s" % (self.kind, key[:12]))
+        return row[0]
+
+    def put(self, text: str, result: dict) -> None:
+        """Store (or refresh) the parse result for this text."""
+        if not self.enabled or not text or not result:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(ParseCache).values(
+            text_hash=text_hash(text),
+            kind=self.kind,
+            prompt_version=self.prompt_version,
+            result=result,
+            hit_count=0,
+            created_at=now,
+            last_used_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["text_hash", "kind", "prompt_version"],
+            set_={"result": stmt.excluded.result, "created_at": now, "last_used_at": now},
+        )
+        db = SessionLocal()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            log_tool.log_warning("Parse cache write failed (%s): %s" % (self.kind, e))
+            return
+        finally:
+            db.close()
+
+        if next(self._writes) % max(PARSE_CACHE_EVICT_EVERY, 1) == 0:
+            evict_parse_cache()
+
+
+def evict_parse_cache() -> int:
+    """Drop expired entries, then trim the table to PARSE_CACHE_MAX_ROWS by LRU. Returns rows removed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=PARSE_CACHE_TTL_DAYS)
+    db = SessionLocal()
+    try:
+        removed = db.execute(delete(ParseCache).where(ParseCache.created_at < cutoff)).rowcount or 0
+
+        # last_used_at of the newest row that falls outside the keep window
+        boundary = db.execute(
+            select(ParseCache.last_used_at)
+            .order_by(ParseCache.last_used_at.desc())
+            .offset(PARSE_CACHE_MAX_ROWS)
+            .limit(1)
+        ).scalar()
+        if boundary is not None:
+            removed += db.execute(delete(ParseCache).where(ParseCache.last_used_at <= boundary)).rowcount or 0
+
+        db.commit()
+        if removed:
+            log_tool.log_info("Parse cache: evicted %d entr%s" % (removed, "y" if removed == 1 else "ies"))
+        return removed
+    except Exception as e:
+        db.rollback()
+        log_tool.log_warning("Parse cache eviction failed: %s" % e)
+        return 0
+    finally:
+        db.close()
@@ -2,8 +2,10 @@
 qdrant_client_wrapper.py — Singleton Qdrant client + collection bootstrap.
 
 Collections created on first use:
-  - candidates  : 384-d cosine vectors  (one point per candidate)
-  - jobs        : 384-d cosine vectors  (one point per job)
+  - candidates  : 384-d cosine "education" vector (one point per candidate)
+  - jobs        : 384-d cosine "education" / "role" vectors (one point per job)
+  - candidate_skills / job_skills : 384-d cosine vectors (one point per skill,
+    grouped by owner id and kind) used for granular max-sim scoring
 """
 
 import os
@@ -27,9 +29,15 @@ QDRANT_MODE    = str(os.getenv("QDRANT_MODE", "server")).lower()
 QDRANT_URL     = os.getenv("QDRANT_URL", "http://localhost:6333")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", None)
 
+# Request sizing for bulk reads during matching
+QDRANT_RETRIEVE_CHUNK_SIZE = int(os.getenv("QDRANT_RETRIEVE_CHUNK_SIZE", "256"))  # ids per retrieve/scroll filter
+QDRANT_SCROLL_LIMIT        = int(os.getenv("QDRANT_SCROLL_LIMIT", "1024"))        # points per scroll page
+
 VECTOR_SIZE = 384        # all-MiniLM-L6-v2 output dimension
 COLLECTION_CANDIDATES = "candidates_v2"
 COLLECTION_JOBS = "jobs_v2"
+COLLECTION_CANDIDATE_SKILLS = "candidate_skills_v1"
+COLLECTION_JOB_SKILLS = "job_skills_v1"
 
 _client: QdrantClient | None = None
 
@@ -52,20 +60,19 @@ def get_qdrant_client() -> QdrantClient:
 
 
 def _ensure_collections(client: QdrantClient) -> None:
-    """Create 'candidates' and 'jobs' collections and indices if they don't exist yet."""
+    """Create the candidate/job collections, their per-skill companions and indices if they don't exist yet."""
     existing = {c.name for c in client.get_collections().collections}
 
     for name in (COLLECTION_CANDIDATES, COLLECTION_JOBS):
         if name not in existing:
+            # Skills live in the per-skill collections below, so only the
+            # whole-text vectors are named here
             if name == COLLECTION_CANDIDATES:
                 vectors_config = {
-                    "skills": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
                     "education": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
                 }
             else:
                 vectors_config = {
-                    "required_skills": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
-                    "preferred_skills": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
                     "education": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
                     "role": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
                 }
@@ -78,6 +85,15 @@ def _ensure_collections(client: QdrantClient) -> None:
         else:
             log_tool.log_info("Qdrant: collection '%s' already exists." % name)
 
+    # Per-skill companion collections: one unnamed vector per (owner, kind, skill)
+    for name in (COLLECTION_CANDIDATE_SKILLS, COLLECTION_JOB_SKILLS):
+        if name not in existing:
+            client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+            )
+            log_tool.log_info("Qdrant: created per-skill collection '%s'" % name)
+
     # ── CREATE PAYLOAD INDICES ──
     try:
         client.create_payload_index(
@@ -90,6 +106,17 @@ def _ensure_collections(client: QdrantClient) -> None:
             field_name="job_id",
             field_schema=PayloadSchemaType.KEYWORD,
         )
+        for name, owner_field in ((COLLECTION_CANDIDATE_SKILLS, "candidate_id"), (COLLECTION_JOB_SKILLS, "job_id")):
+            client.create_payload_index(
+                collection_name=name,
+                field_name=owner_field,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+            client.create_payload_index(
+                collection_name=name,
+                field_name="kind",
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
         log_tool.log_info("Qdrant: ensured payload indices exist for filtered searches.")
     except Exception as e:
         log_tool.log_warning("Qdrant: could not ensure payload indices: %s" % e)
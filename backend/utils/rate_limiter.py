@@ -0,0 +1,116 @@
+"""
+rate_limiter.py — Process-wide token-bucket limiters for LLM requests.
+
+One bucket per Gemini model, shared by every GeminiClient/parser in the
+process, so concurrent workers pace themselves against the model's RPM
+quota instead of sleeping a fixed amount between calls.
+
+Config:
+  GEMINI_RPM         : default requests per minute for any model (default 10)
+  GEMINI_RPM_LIMITS  : per-model overrides, e.g. "gemini-2.5-flash=15,gemini-2.5-pro=5"
+  GEMINI_RPM_BURST   : bucket capacity, i.e. calls allowed back to back (default 1)
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from log import log_tool
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "10"))
+GEMINI_RPM_BURST = int(os.getenv("GEMINI_RPM_BURST", "1"))
+
+
+def _parse_limits(raw: str) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        model, rpm = item.split("=", 1)
+        try:
+            limits[model.strip()] = float(rpm)
+        except ValueError:
+            log_tool.log_warning("Ignoring invalid GEMINI_RPM_LIMITS entry: %s" % item)
+    return limits
+
+
+GEMINI_RPM_LIMITS = _parse_limits(os.getenv("GEMINI_RPM_LIMITS", ""))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate_per_minute`.
+
+    `acquire()` blocks until a token is available (`acquire_async()` awaits
+    instead, for the async Gemini client); `pause(seconds)` stops all
+    callers for a while (used when the API answers 429).
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = max(rate_per_minute, 0.0) / 60.0  # tokens per second
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if possible; otherwise return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0  # unlimited
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """Awaitable `acquire()`: waits on the event loop instead of blocking a thread."""
+        waited = 0.0
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (never shortens an existing pause)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_name: str) -> TokenBucket:
+    """Return the shared bucket for a Gemini model, creating it on first use."""
+    limiter = _limiters.get(model_name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model_name)
+            if limiter is None:
+                rpm = GEMINI_RPM_LIMITS.get(model_name, GEMINI_RPM)
+                limiter = TokenBucket(rpm, GEMINI_RPM_BURST)
+                _limiters[model_name] = limiter
+                log_tool.log_info("Rate limiter for %s: %.1f RPM (burst %d)" % (model_name, rpm, limiter.capacity))
+    return limiter
@@ -0,0 +1,172 @@
+"""
+resume_preprocessor.py — Deterministic pre-pass over extracted resume text.
+
+Runs before the LLM so the prompt carries only the resume itself:
+  - email / phone are pulled with compiled regexes and merged back into the
+    parse result, only where the LLM left the field empty
+  - page furniture is dropped from the top and bottom of each page (pages are
+    separated by form feeds, as TextExtractor emits them for PDFs): page
+    markers ("Page 2 of 3") and lines repeated there on most pages (headers,
+    footers); whitespace is collapsed
+  - the text is cut at a line boundary to RESUME_PROMPT_TOKEN_BUDGET
+
+Config:
+  RESUME_PREPROCESS_ENABLED   : turn the pre-pass off (text goes to the LLM as extracted)
+  RESUME_PROMPT_TOKEN_BUDGET  : max resume tokens sent to the LLM (~4 chars/token)
+"""
+
+import os
+import re
+from collections import Counter
+from typing import NamedTuple
+
+RESUME_PREPROCESS_ENABLED = os.getenv("RESUME_PREPROCESS_ENABLED", "true").lower() in ("1", "true", "yes")
+RESUME_PROMPT_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Page furniture is looked for only in this many non-blank lines at the top and
+# bottom of each page; lines repeated elsewhere (a city, an employer) are content
+_PAGE_BREAK = "\f"
+_PAGE_EDGE_LINES = 3
+_REPEATED_LINE_MAX_CHARS = 120
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE = re.compile(r"(?<![\w+])\+?\(?\d[\d \t().-]{7,18}\d(?!\w)")
+# A digit run is taken as a phone only when formatted like one, labelled as one or
+# alone on its line, so IDs, roll numbers and dates inside sentences are not
+_PHONE_LABEL = re.compile(r"\b(?:phone|mobile|mob|cell|tel|telephone|contact|whatsapp|ph)\b", re.IGNORECASE)
+_PHONE_GROUPS = re.compile(r"[\s().-]+")
+_YEAR = re.compile(r"^(?:19|20)\d\d$")
+# Page markers only: "Page 2", "Page 2 of 3", "2 of 3", "2/3" or a bare 1-3 digit number
+# (longer digit-only lines are phones, years, IDs)
+_PAGE_NUMBER = re.compile(r"^(?:page\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?|\d{1,3}\s*(?:of|/)\s*\d{1,3}|\d{1,3})$", re.IGNORECASE)
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v\u00a0]+")
+
+
+class ContactFields(NamedTuple):
+    emails: list
+    phones: list
+
+
+class PreparedResume(NamedTuple):
+    text: str
+    contacts: ContactFields
+
+
+def _unique(values) -> list:
+    return list(dict.fromkeys(values))
+
+
+def _is_phone(match: re.Match, text: str) -> bool:
+    raw = match.group(0).strip()
+    if not 10 <= sum(ch.isdigit() for ch in raw) <= 15:
+        return False
+    groups = [group for group in _PHONE_GROUPS.split(raw.lstrip("+")) if group]
+    if sum(bool(_YEAR.match(group)) for group in groups) >= 2:
+        return False  # "2018 - 2020 2021": year ranges
+    if raw.startswith("+") or "(" in raw or len(groups) > 1:
+        return True
+    # A bare digit run needs a label on its line ("Mobile: 9876543210") or a line of its own
+    line_start = text.rfind("\n", 0, match.start()) + 1
+    line_end = text.find("\n", match.end())
+    line = text[line_start:line_end if line_end != -1 else len(text)]
+    return line.strip() == raw or bool(_PHONE_LABEL.search(text, line_start, match.start()))
+
+
+def extract_contact_fields(text: str) -> ContactFields:
+    emails = _unique(match.lower() for match in _EMAIL.findall(text))
+    phones = []
+    for match in _PHONE.finditer(text):
+        phone = " ".join(match.group(0).split())
+        # One number written with and without its country code counts once
+        if _is_phone(match, text) and not any(same_phone(phone, seen) for seen in phones):
+            phones.append(phone)
+    return ContactFields(emails=emails, phones=phones)
+
+
+def _edge_indexes(lines: list) -> list:
+    """Indexes of the first and last _PAGE_EDGE_LINES non-blank lines of a page."""
+    content = [i for i, line in enumerate(lines) if line]
+    return sorted(set(content[:_PAGE_EDGE_LINES] + content[-_PAGE_EDGE_LINES:]))
+
+
+def _page_furniture(pages: list) -> set:
+    """Lowercased lines found at the edges of at least half the pages (and at least two)."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update({lines[i].lower() for i in _edge_indexes(lines) if len(lines[i]) <= _REPEATED_LINE_MAX_CHARS})
+    needed = max(2, (len(pages) + 1) // 2)
+    return {line for line, count in counts.items() if count >= needed}
+
+
+def strip_boilerplate(text: str) -> str:
+    """Collapse whitespace; drop page markers and repeated headers/footers at page edges."""
+    pages = [
+        [_INLINE_WHITESPACE.sub(" ", line).strip() for line in page.splitlines()]
+        for page in text.split(_PAGE_BREAK)
+    ]
+    furniture = _page_furniture(pages)
+
+    kept = []
+    for lines in pages:
+        edges = set(_edge_indexes(lines))
+        for i, line in enumerate(lines):
+            if not line:
+                # Keep one blank line between sections
+                if kept and kept[-1]:
+                    kept.append("")
+                continue
+            if i in edges and (_PAGE_NUMBER.match(line) or line.lower() in furniture):
+                continue
+            kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def truncate_to_budget(text: str, max_tokens: int = RESUME_PROMPT_TOKEN_BUDGET) -> str:
+    """Cut to roughly `max_tokens` (~4 chars/token), at the last line break that fits."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[: cut if cut > max_chars // 2 else max_chars].rstrip()
+
+
+def prepare_resume_text(text: str) -> PreparedResume:
+    """Contact fields from the full text, and the compact text to send to the LLM."""
+    contacts = extract_contact_fields(text)
+    if not RESUME_PREPROCESS_ENABLED:
+        return PreparedResume(text=text, contacts=contacts)
+    return PreparedResume(text=truncate_to_budget(strip_boilerplate(text)), contacts=contacts)
+
+
+def _digits(value) -> str:
+    return "".join(ch for ch in str(value or "") if ch.isdigit())
+
+
+def same_phone(a, b) -> bool:
+    """Same number, with or without a country code / trunk prefix on either side."""
+    a, b = _digits(a), _digits(b)
+    if min(len(a), len(b)) < 7:
+        return False
+    return a.endswith(b) or b.endswith(a)
+
+
+def merge_contact_fields(parsed_resume: dict, contacts: ContactFields) -> dict:
+    """
+    Fill email / phone the LLM left empty from the regex pass. A value the LLM
+    returned is never replaced: the first regex email in a resume may be a
+    referee's, and a phone may be written with or without a country code.
+    """
+    if not parsed_resume or "error" in parsed_resume:
+        return parsed_resume
+    candidate = parsed_resume.get("candidate", parsed_resume)
+    if not isinstance(candidate, dict):
+        return parsed_resume
+
+    if contacts.emails and not str(candidate.get("email") or "").strip():
+        candidate["email"] = contacts.emails[0]
+
+    if contacts.phones and not _digits(candidate.get("phone_number")):
+        candidate["phone_number"] = contacts.phones[0]
+    return parsed_resume
@@ -1,12 +1,38 @@
 import io
+import os
+import re
+from typing import Iterator
 
 from log import log_tool
 from pypdf import PdfReader
 
+# Pages read from any one PDF; resumes/JDs past this are almost always scans or appendices
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "50"))
+
+# Legacy .doc text runs: shorter runs are almost always binary noise. 8-bit runs
+# need to be longer since random bytes are printable ASCII far more often.
+_DOC_MIN_RUN = 4
+_DOC_ASCII_MIN_RUN = 8
+_DOC_ASCII_RUN = re.compile(rb"[\x20-\x7e\t\n\r]{%d,}" % _DOC_ASCII_MIN_RUN)
+# UTF-16-LE code units for ASCII and Latin-1 letters (high byte 0x00)
+_DOC_UTF16_RUN = re.compile(rb"(?:[\x20-\x7e\xa0-\xff\t\n\r]\x00){%d,}" % _DOC_MIN_RUN)
+_WHITESPACE = re.compile(r"\s+")
+
+
 class TextExtractor:
     """
     Utility to extract text from various file formats.
+
+    `extract_text` runs in the calling thread; `extract_text_async` runs on the
+    process-pool extraction executor (see utils/extraction_executor.py).
     """
+
+    @staticmethod
+    async def extract_text_async(file_bytes: bytes, filename: str) -> str:
+        """`extract_text` on the extraction process pool, without blocking the event loop."""
+        from utils.extraction_executor import get_extraction_executor
+
+        return await get_extraction_executor().extract(file_bytes, filename)
     
     @staticmethod
     def extract_text(file_bytes: bytes, filename: str) -> str:
@@ -34,16 +60,30 @@ class TextExtractor:
 
     @staticmethod
     def _read_pdf(file_bytes: bytes) -> str:
+        return TextExtractor._read_pdf_pages(file_bytes, 0, EXTRACTION_MAX_PAGES)
+
+    @staticmethod
+    def _read_pdf_pages(file_bytes: bytes, start: int, stop: int) -> str:
+        """Text of pages [start, stop) (clamped to the document), separated by form feeds."""
         try:
             reader = PdfReader(io.BytesIO(file_bytes))
             text = []
-            for page in reader.pages:
+            for page in reader.pages[start:stop]:
                 text.append(page.extract_text() or "")
-            return "\n".join(text)
+            # Form feed marks page boundaries (resume_preprocessor strips headers/footers there)
+            return "\f".join(text)
         except Exception as e:
             log_tool.log_error("Error reading PDF: %s" % e)
             return ""
 
+    @staticmethod
+    def pdf_page_count(file_bytes: bytes) -> int:
+        try:
+            return len(PdfReader(io.BytesIO(file_bytes)).pages)
+        except Exception as e:
+            log_tool.log_error("Error reading PDF: %s" % e)
+            return 0
+
     @staticmethod
     def _read_txt(file_bytes: bytes) -> str:
         try:
@@ -54,28 +94,37 @@ class TextExtractor:
 
     @staticmethod
     def _read_doc(file_bytes: bytes) -> str:
+        """
+        Heuristic text for legacy Word (.doc) files, which store body text as
+        8-bit or UTF-16-LE runs inside an OLE container. Runs are found with
+        byte regexes (no per-character Python work or full-file decodes) and
+        repeated runs - the same text stored in several OLE streams - are emitted once.
+        """
         try:
-            import string
-            import re
-            
-            # Legacy .doc files store text typically in utf-16-le chunks.
-            # Convert to printable ASCII safely to pass to LLM.
-            decoded_ascii = file_bytes.decode('ascii', errors='ignore')
-            decoded_utf16 = file_bytes.decode('utf-16-le', errors='ignore')
-            
-            valid_chars = set(string.printable)
-            ascii_text = "".join(c for c in decoded_ascii if c in valid_chars)
-            utf16_text = "".join(c for c in decoded_utf16 if c in valid_chars)
-            
-            # Clean up excessive whitespace and combine
-            text = ascii_text + " \n " + utf16_text
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            return text
+            seen = set()
+            lines = []
+            for run in TextExtractor._doc_text_runs(file_bytes):
+                if run not in seen:
+                    seen.add(run)
+                    lines.append(run)
+            return "\n".join(lines)
         except Exception as e:
             log_tool.log_error("Error reading DOC heuristic: %s" % e)
             return ""
 
+    @staticmethod
+    def _doc_text_runs(file_bytes: bytes) -> Iterator[str]:
+        """Whitespace-normalised printable runs, UTF-16 first (Word's native encoding), then 8-bit."""
+        view = memoryview(file_bytes)
+        for match in _DOC_UTF16_RUN.finditer(view):
+            run = _WHITESPACE.sub(" ", match.group().decode("utf-16-le")).strip()
+            if len(run) >= _DOC_MIN_RUN:
+                yield run
+        for match in _DOC_ASCII_RUN.finditer(view):
+            run = _WHITESPACE.sub(" ", match.group().decode("ascii")).strip()
+            if len(run) >= _DOC_ASCII_MIN_RUN:
+                yield run
+
     @staticmethod
     def _read_docx(file_bytes: bytes) -> str:
         try:
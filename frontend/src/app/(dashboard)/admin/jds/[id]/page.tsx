@@ -17,6 +17,10 @@ import { toast } from 'react-hot-toast';
 import { Input } from '@/components/ui/input';
 import { retellApi } from '@/services/retell.api';
 
+// Polling of /api/resumes/process while the ingestion workers finish
+const PROCESS_POLL_INTERVAL_MS = 3000;
+const PROCESS_MAX_POLLS = 40;
+
 export default function JDDetailPage() {
     const params = useParams();
     const router = useRouter();
@@ -122,7 +126,8 @@ export default function JDDetailPage() {
 
             const uploadData = await uploadRes.json();
             const successful = (uploadData.results || [])
-                .filter((r: any) => r.status === 'success')
+                // A duplicate is linked to this JD under its own candidate_id and matched like a new upload
+                .filter((r: any) => r.status === 'success' || r.status === 'duplicate')
                 .map((r: any) => ({
                     candidate_id: r.candidate_id,
                     s3_key: r.s3_key,
@@ -145,25 +150,45 @@ export default function JDDetailPage() {
         if (pendingCandidates.length === 0) return;
         setProcessing(true);
         try {
-            const processRes = await fetch('/api/resumes/process', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    jdId: id,
-                    candidates: pendingCandidates.map(c => ({
-                        candidate_id: c.candidate_id,
-                        s3_key: c.s3_key
-                    })),
-                }),
-            });
-
-            if (!processRes.ok) throw new Error('Processing failed');
+            // Resumes are parsed and matched by background workers; poll until
+            // every one is matched or failed (or we stop waiting)
+            let remaining = pendingCandidates;
+            let failedCount = 0;
+            for (let attempt = 0; remaining.length > 0 && attempt < PROCESS_MAX_POLLS; attempt++) {
+                if (attempt > 0) await new Promise(resolve => setTimeout(resolve, PROCESS_POLL_INTERVAL_MS));
+
+                const processRes = await fetch('/api/resumes/process', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        jdId: id,
+                        candidates: remaining.map(c => ({
+                            candidate_id: c.candidate_id,
+                            s3_key: c.s3_key
+                        })),
+                    }),
+                });
+
+                if (!processRes.ok) throw new Error('Processing failed');
+
+                const processData = await processRes.json();
+                setResults((prev: any) => ({ ...prev, ...(processData.match_data || {}) }));
+                if (Object.keys(processData.match_data || {}).length > 0) setShowResults(true);
+
+                const stillPending = new Set((processData.pending_candidates || []).map((p: any) => p.candidate_id));
+                failedCount += (processData.failed_candidates || []).length;
+                remaining = remaining.filter(c => stillPending.has(c.candidate_id));
+            }
 
-            const processData = await processRes.json();
-            setResults((prev: any) => ({ ...prev, ...(processData.match_data || {}) }));
-            setPendingCandidates([]);
+            setPendingCandidates(remaining);
             setShowResults(true);
-            toast.success("Analysis complete");
+            if (remaining.length > 0) {
+                toast(`${remaining.length} resume(s) still processing. Run analysis again shortly.`);
+            } else if (failedCount > 0) {
+                toast.error(`${failedCount} resume(s) failed to process`);
+            } else {
+                toast.success("Analysis complete");
+            }
         } catch (error) {
             toast.error("Processing failed");
         } finally {